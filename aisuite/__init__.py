@@ -1 +1,15 @@
 from .client import Client
+from .provider import ProviderFactory
+from .scheduler import Scheduler, RequestShedError
+from .adaptive import AdaptiveLimiter
+from .rate_limiter import RateLimiter
+from .cache import ResponseCache
+from .state import MemoryStateBackend, SQLiteStateBackend
+from .hedging import Hedge
+from .cascade import Cascade
+from .cassette import Cassette
+from .images import ImagePreprocessor
+from .structured import StructuredOutputError
+from .map_reduce import MapReduce
+from .semantic_cache import SemanticCache
+from .profiling import SlowCallProfiler
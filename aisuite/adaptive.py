@@ -0,0 +1,182 @@
+"""Adaptive per-provider concurrency limits (additive increase, multiplicative decrease)."""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from .provider import is_rate_limit_error
+from .scheduler import RequestShedError
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 256
+
+# Weight of the latest call when updating the baseline latency.
+_LATENCY_SMOOTHING = 0.1
+
+# Successful calls observed before latency spikes are acted on.
+_WARMUP_CALLS = 5
+
+
+class _Lane:
+    """Concurrency limit, calls in flight and latency baseline for one provider."""
+
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.active = 0
+        self.condition = None
+        self.latency = None
+        self.calls = 0
+        self.last_decrease = float("-inf")
+
+
+class AdaptiveLimiter:
+    """
+    Finds each provider's available concurrency while requests are running.
+
+    Every call holds one of its provider's slots. Calls that complete in time while
+    the limit is in use raise the limit additively, by about one per limit's worth of
+    calls. A throttling error (HTTP 429, Bedrock ThrottlingException) or a call
+    slower than latency_factor times the provider's average latency cuts the limit
+    multiplicatively. Only calls started after the last cut can cut it again, so a
+    burst of 429s from one window of requests counts once.
+
+    Example:
+        limiter = AdaptiveLimiter(initial=8, max_limit=128)
+        client = Client(adaptive_limiter=limiter)
+        ...
+        limiter.stats("aws")  # {"limit": 23, "active": 19, "latency": 1.8}
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+    ):
+        """
+        Args:
+            initial (int): Concurrency limit of a provider before any feedback.
+            min_limit (int): The limit is never cut below this.
+            max_limit (int): The limit never grows beyond this.
+            increase (float): Amount the limit grows per limit's worth of healthy calls.
+            decrease (float): Factor the limit is multiplied by on throttling.
+            latency_factor (float): A call slower than this multiple of the provider's
+                average latency counts as a latency spike. None ignores latency.
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1.")
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, provider_key, func):
+        """Return func wrapped so every call runs inside an adaptive slot."""
+
+        def limited(*args, **kwargs):
+            with self.slot(provider_key):
+                return func(*args, **kwargs)
+
+        return limited
+
+    @contextmanager
+    def slot(self, provider_key, timed: bool = True, timeout: float = None):
+        """
+        Hold one of the provider's slots for the duration of the block, and adjust
+        the limit from the outcome and duration of the block.
+
+        Args:
+            timed (bool): Whether the block's duration is a call latency. Streams,
+                whose duration depends on the length of the output, pass False so
+                only their errors are taken into account.
+            timeout (float): Seconds to wait for a slot before the call is shed with
+                a RequestShedError. None waits indefinitely.
+        """
+        lane, start, saturated = self._acquire(provider_key, timeout)
+        try:
+            yield
+        except BaseException as error:
+            self._release(lane, start, saturated, error, timed)
+            raise
+        else:
+            self._release(lane, start, saturated, None, timed)
+
+    def stats(self, provider_key):
+        """Return the current limit, calls in flight and average latency of a provider."""
+        with self._lock:
+            lane = self._lane(provider_key)
+            return {
+                "limit": int(lane.limit),
+                "active": lane.active,
+                "latency": lane.latency,
+            }
+
+    def _lane(self, provider_key):
+        lane = self._lanes.get(provider_key)
+        if lane is None:
+            lane = self._lanes[provider_key] = _Lane(self.initial)
+            lane.condition = threading.Condition(self._lock)
+        return lane
+
+    def _acquire(self, provider_key, timeout=None):
+        with self._lock:
+            lane = self._lane(provider_key)
+            saturated = lane.active >= int(lane.limit)
+            if not lane.condition.wait_for(
+                lambda: lane.active < int(lane.limit), timeout
+            ):
+                raise RequestShedError(
+                    f"Request shed: no adaptive slot for '{provider_key}' within {timeout}s."
+                )
+            lane.active += 1
+            # The limit is only raised by calls that found it in use; otherwise a
+            # lightly loaded provider would grow its limit without evidence.
+            saturated = saturated or lane.active >= int(lane.limit)
+            return lane, time.monotonic(), saturated
+
+    def _release(self, lane, start, saturated, error, timed):
+        now = time.monotonic()
+        with self._lock:
+            lane.active -= 1
+            if error is not None and is_rate_limit_error(error):
+                self._cut(lane, start, now)
+            elif error is None:
+                if timed and self._record_latency(lane, now - start):
+                    self._cut(lane, start, now)
+                elif saturated:
+                    lane.limit = min(
+                        self.max_limit, lane.limit + self.increase / lane.limit
+                    )
+            lane.condition.notify_all()
+
+    def _record_latency(self, lane, duration):
+        """Update the latency baseline and return whether the call was a spike."""
+        spike = (
+            self.latency_factor is not None
+            and lane.calls >= _WARMUP_CALLS
+            and duration > self.latency_factor * lane.latency
+        )
+        # Spikes enter the average too, so a lasting shift in latency becomes the
+        # new baseline instead of holding the limit down.
+        lane.calls += 1
+        if lane.latency is None:
+            lane.latency = duration
+        else:
+            lane.latency += _LATENCY_SMOOTHING * (duration - lane.latency)
+        return spike
+
+    def _cut(self, lane, start, now):
+        # Calls that were already in flight when the limit was cut report the same
+        # overload; they must not cut it again.
+        if start < lane.last_decrease:
+            return
+        lane.limit = max(self.min_limit, lane.limit * self.decrease)
+        lane.last_decrease = now
@@ -0,0 +1,87 @@
+"""Exact-match cache for chat completion responses."""
+
+import hashlib
+import json
+import pickle
+import threading
+
+from .state import MemoryStateBackend
+
+
+class ResponseCache:
+    """
+    Caches chat completion responses keyed by model, messages and request arguments.
+
+    With a SQLiteStateBackend, every process using the same database file shares the
+    cached responses. Responses are stored pickled, so the database must only be
+    writable by trusted processes.
+
+    Example:
+        cache = ResponseCache(backend=SQLiteStateBackend("/tmp/aisuite-state.db"), ttl=3600)
+        client = Client(cache=cache)
+    """
+
+    def __init__(self, backend=None, ttl: float = None):
+        """
+        Args:
+            backend: A state backend. Defaults to a per-process MemoryStateBackend.
+            ttl (float): Seconds a cached response stays valid. None keeps it forever.
+        """
+        self.backend = backend or MemoryStateBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model, messages, kwargs, options=None):
+        """
+        Return a stable key for a request.
+
+        Of the client options (see Request.options), those that change the response
+        are part of the key (see key_options). Scheduling options such as priority
+        are not, so they share cached responses.
+        """
+        request = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "kwargs": kwargs,
+                **key_options(options),
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached response for the key, or None."""
+        value = self.backend.cache_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(value)
+
+    def set(self, key, response):
+        self.backend.cache_set(key, pickle.dumps(response), self.ttl)
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups in this process that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def key_options(options):
+    """
+    Return the client options of a request that change its response, for cache keys:
+    consensus, and the backup model of a hedge.
+    """
+    options = options or {}
+    hedge = options.get("hedge")
+    return {
+        "consensus": options.get("consensus"),
+        "backup": hedge.backup if hedge is not None else None,
+    }
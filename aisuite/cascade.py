@@ -0,0 +1,120 @@
+"""Model cascades: try fast, cheap models first and escalate when an answer is rejected."""
+
+import collections
+import json
+import threading
+
+from .provider import is_provider_error
+
+
+class Cascade:
+    """
+    An ordered list of models tried one after another until a validator accepts an answer.
+
+    Pass a Cascade as the model of a chat completion call:
+
+        cascade = Cascade(
+            ["groq:llama3-8b-8192", "openai:gpt-4o-mini", "openai:gpt-4o"],
+            validator={"type": "object", "required": ["answer"]},
+        )
+        response = client.chat.completions.create(model=cascade, messages=messages)
+
+    A tier whose answer is rejected, or whose call fails with a provider error (see
+    is_provider_error), escalates to the next tier. Other errors, such as a bad
+    argument or a missing API key, are raised at once.
+    If no tier is accepted, the last tier's response is returned (or its error raised).
+    The cascade counts which tier served each call in `served` and rejections in
+    `rejected`; `on_result` can record every call individually.
+    """
+
+    def __init__(
+        self,
+        models: list,
+        validator=None,
+        min_confidence: float = None,
+        on_result=None,
+    ):
+        """
+        Args:
+            models (list): 'provider:model' strings, cheapest/fastest first.
+            validator (callable or dict): Decides whether a response is accepted.
+                - A callable receives the response and returns a bool, or a confidence
+                  score when min_confidence is set.
+                - A dict is a JSON schema that the message content must satisfy
+                  (requires the jsonschema package).
+            min_confidence (float): Accept responses whose validator score is at least this.
+            on_result (callable): Called with (model, tier, response) for every call.
+        """
+        if not models:
+            raise ValueError("A cascade needs at least one model.")
+        self.models = list(models)
+        self.validator = (
+            json_schema_validator(validator)
+            if isinstance(validator, dict)
+            else validator
+        )
+        self.min_confidence = min_confidence
+        self.on_result = on_result
+        self.served = collections.Counter()
+        self.rejected = collections.Counter()
+        self._lock = threading.Lock()
+
+    def accepts(self, response):
+        """Return True if the response is good enough to stop the cascade."""
+        if self.validator is None:
+            return True
+        result = self.validator(response)
+        if self.min_confidence is not None:
+            return result is not None and result >= self.min_confidence
+        return bool(result)
+
+    def run(self, create, messages, **kwargs):
+        """
+        Run the cascade.
+
+        Args:
+            create (callable): Creates a chat completion for a 'provider:model' string.
+            messages (list): The chat history.
+            kwargs (dict): Extra arguments for every tier.
+        """
+        last_tier = len(self.models) - 1
+        for tier, model in enumerate(self.models):
+            try:
+                response = create(model, messages, **kwargs)
+            except Exception as error:
+                if tier == last_tier or not is_provider_error(error):
+                    raise
+                self._count(self.rejected, model)
+                continue
+
+            if tier == last_tier or self.accepts(response):
+                self._count(self.served, model)
+                if self.on_result is not None:
+                    self.on_result(model, tier, response)
+                return response
+            self._count(self.rejected, model)
+
+    def _count(self, counter, model):
+        with self._lock:
+            counter[model] += 1
+
+
+def json_schema_validator(schema):
+    """Return a validator that accepts responses whose content is JSON matching the schema."""
+    try:
+        import jsonschema
+    except ImportError:
+        raise ImportError(
+            "JSON schema validation requires the jsonschema package. Install it with `pip install jsonschema`."
+        )
+
+    validator = jsonschema.Draft202012Validator(schema)
+
+    def validate(response):
+        try:
+            content = json.loads(response.choices[0].message.content)
+        except (TypeError, ValueError):
+            return False
+        return validator.is_valid(content)
+
+    return validate
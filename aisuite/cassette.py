@@ -0,0 +1,215 @@
+"""Record provider HTTP traffic to a cassette file and replay it offline.
+
+Recording and replay happen at the httpx transport layer, which every HTTP based
+provider and the httpx based SDK providers (OpenAI, Groq, Anthropic, Mistral) route
+requests through when given a `transport`:
+
+    cassette = Cassette()
+    client = Client(transport=cassette.recorder())
+    ...  # run real traffic
+    cassette.save("traffic.cassette")
+
+    cassette = Cassette.load("traffic.cassette")
+    client = Client(transport=cassette.player(speed=1.0))
+
+Streamed responses are recorded chunk by chunk with their arrival times, so replay
+reproduces time to first byte and inter-chunk gaps, optionally scaled.
+"""
+
+import base64
+import gzip
+import hashlib
+import itertools
+import json
+import threading
+import time
+
+import httpx
+
+CASSETTE_VERSION = 1
+
+
+class CassetteError(Exception):
+    """Raised when a replayed request has no recorded interaction."""
+
+
+class Cassette:
+    """A list of recorded request/response interactions."""
+
+    def __init__(self, interactions: list = None):
+        self.interactions = interactions or []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Load a cassette written by save()."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise CassetteError(
+                    f"Unsupported cassette version {header.get('version')}."
+                )
+            return cls([json.loads(line) for line in f])
+
+    def save(self, path):
+        """Write the cassette as gzip-compressed JSON lines."""
+        with self._lock:
+            interactions = list(self.interactions)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+            for interaction in interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    def recorder(self, transport: httpx.BaseTransport = None):
+        """Return a transport that sends requests and records them into this cassette."""
+        return RecordingTransport(self, transport)
+
+    def player(self, speed: float = 1.0, match_body: bool = True):
+        """Return a transport that serves recorded responses without network access."""
+        return ReplayTransport(self, speed=speed, match_body=match_body)
+
+    def add(self, interaction):
+        with self._lock:
+            self.interactions.append(interaction)
+
+
+def _body_digest(request):
+    return hashlib.sha256(request.read()).hexdigest()
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    def __init__(self, stream, start, on_close):
+        self._stream = stream
+        self._start = start
+        self._on_close = on_close
+        self._chunks = []
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._chunks.append((time.monotonic() - self._start, chunk))
+            yield chunk
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._on_close(self._chunks)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Sends requests through the wrapped transport and records each interaction."""
+
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        start = time.monotonic()
+        response = self.transport.handle_request(request)
+        latency = time.monotonic() - start
+
+        def record(chunks):
+            self.cassette.add(
+                {
+                    "method": request.method,
+                    "url": str(request.url),
+                    "body_sha256": _body_digest(request),
+                    "status": response.status_code,
+                    "headers": response.headers.multi_items(),
+                    "latency": latency,
+                    "chunks": [
+                        [offset, base64.b64encode(chunk).decode("ascii")]
+                        for offset, chunk in chunks
+                    ],
+                }
+            )
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, start, record),
+            extensions=response.extensions,
+        )
+
+    def close(self):
+        self.transport.close()
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, chunks, start, speed):
+        self._chunks = chunks
+        self._start = start
+        self._speed = speed
+
+    def __iter__(self):
+        for offset, chunk in self._chunks:
+            if self._speed:
+                delay = offset / self._speed - (time.monotonic() - self._start)
+                if delay > 0:
+                    time.sleep(delay)
+            yield base64.b64decode(chunk)
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    Serves recorded responses at their recorded timing divided by speed.
+
+    Requests are matched by method, URL and body. With match_body=False, or when no
+    recording has the same body, any recording of the same method and URL is used, so
+    a cassette can serve load tests whose payloads differ from the recorded ones.
+    Repeated requests cycle through all matching recordings.
+    """
+
+    def __init__(self, cassette, speed: float = 1.0, match_body: bool = True):
+        """
+        Args:
+            cassette (Cassette): The recorded interactions.
+            speed (float): Playback speed; 2.0 halves every delay. 0 or None disables delays.
+            match_body (bool): Prefer recordings whose request body matches exactly.
+        """
+        self.speed = speed
+        self.match_body = match_body
+        self._lock = threading.Lock()
+        self._by_body = {}
+        self._by_url = {}
+        for interaction in cassette.interactions:
+            url_key = (interaction["method"], interaction["url"])
+            body_key = url_key + (interaction["body_sha256"],)
+            self._by_body.setdefault(body_key, []).append(interaction)
+            self._by_url.setdefault(url_key, []).append(interaction)
+        self._cycles = {}
+
+    def handle_request(self, request):
+        start = time.monotonic()
+        interaction = self._next_interaction(request)
+
+        if self.speed:
+            delay = interaction["latency"] / self.speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        return httpx.Response(
+            status_code=interaction["status"],
+            headers=interaction["headers"],
+            stream=_ReplayStream(interaction["chunks"], start, self.speed),
+        )
+
+    def _next_interaction(self, request):
+        url_key = (request.method, str(request.url))
+        candidates = None
+        key = url_key
+        if self.match_body:
+            key = url_key + (_body_digest(request),)
+            candidates = self._by_body.get(key)
+        if not candidates:
+            key = url_key
+            candidates = self._by_url.get(url_key)
+        if not candidates:
+            raise CassetteError(
+                f"No recorded interaction for {request.method} {request.url}."
+            )
+        with self._lock:
+            cycle = self._cycles.get(key)
+            if cycle is None:
+                cycle = self._cycles[key] = itertools.cycle(candidates)
+            return next(cycle)
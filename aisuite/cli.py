@@ -0,0 +1,200 @@
+"""Command line entry point: `aisuite serve` and `aisuite compare`."""
+
+import argparse
+import json
+
+from .cache import ResponseCache
+from .client import Client
+from .compare import DEFAULT_PROVIDER_LIMIT, compare
+from .rate_limiter import RateLimiter
+from .scheduler import Scheduler
+from .server import DEFAULT_HOST, DEFAULT_MAX_WORKERS, DEFAULT_PORT, serve
+from .state import MemoryStateBackend, SQLiteStateBackend
+
+
+def _key_values(pairs, value_type):
+    values = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        if not value:
+            raise argparse.ArgumentTypeError(f"Expected provider=value, got {pair!r}.")
+        values[key] = value_type(value)
+    return values
+
+
+def _provider_configs(path):
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_prompts(path):
+    """
+    Read prompts from a file.
+
+    A .jsonl file holds one prompt per line: a string, a list of messages, or an
+    object with "messages" or "prompt". Any other file holds one prompt per line.
+    """
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if not path.endswith(".jsonl"):
+                prompts.append(line)
+                continue
+            prompt = json.loads(line)
+            if isinstance(prompt, dict):
+                prompt = prompt.get("messages") or prompt["prompt"]
+            prompts.append(prompt)
+    return prompts
+
+
+def build_client(args):
+    """Create the Client described by the `serve` arguments."""
+    provider_configs = _provider_configs(args.config)
+    backend = SQLiteStateBackend(args.state) if args.state else MemoryStateBackend()
+    rate_limits = _key_values(args.rate_limit, float)
+    concurrency = _key_values(args.concurrency, int)
+    return Client(
+        provider_configs,
+        scheduler=Scheduler(concurrency) if concurrency else None,
+        rate_limiter=RateLimiter(rate_limits, backend=backend) if rate_limits else None,
+        cache=ResponseCache(backend, ttl=args.cache_ttl) if args.cache else None,
+        share_providers=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="aisuite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser(
+        "serve", help="Run an OpenAI-compatible gateway in front of all providers."
+    )
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument(
+        "--config", help="JSON file mapping provider keys to provider configs."
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="Threads available for concurrent provider calls.",
+    )
+    serve_parser.add_argument(
+        "--concurrency",
+        action="append",
+        metavar="PROVIDER=N",
+        help="Limit concurrent requests to a provider. Repeatable.",
+    )
+    serve_parser.add_argument(
+        "--rate-limit",
+        action="append",
+        metavar="PROVIDER=RPM",
+        help="Limit requests per minute to a provider. Repeatable.",
+    )
+    serve_parser.add_argument(
+        "--cache", action="store_true", help="Cache identical requests."
+    )
+    serve_parser.add_argument(
+        "--cache-ttl", type=float, help="Seconds a cached response stays valid."
+    )
+    serve_parser.add_argument(
+        "--state",
+        help="SQLite file for rate limits and cache shared with other processes.",
+    )
+    serve_parser.add_argument(
+        "--allow-remote-images",
+        action="store_true",
+        help="Accept http(s) image URLs, which the gateway may fetch.",
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="Send every prompt to every model and report latency and usage."
+    )
+    compare_parser.add_argument(
+        "--models", nargs="+", required=True, metavar="PROVIDER:MODEL"
+    )
+    compare_parser.add_argument(
+        "--prompts",
+        required=True,
+        help="Text file with one prompt per line, or a .jsonl file of prompts.",
+    )
+    compare_parser.add_argument(
+        "--output", help="Write all results to a .csv or .parquet file."
+    )
+    compare_parser.add_argument(
+        "--config", help="JSON file mapping provider keys to provider configs."
+    )
+    compare_parser.add_argument(
+        "--limit",
+        action="append",
+        metavar="PROVIDER=N",
+        help=f"Concurrent requests per provider (default {DEFAULT_PROVIDER_LIMIT}). Repeatable.",
+    )
+    compare_parser.add_argument("--workers", type=int, default=32)
+    compare_parser.add_argument("--repeats", type=int, default=1)
+    compare_parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Do not stream, so TTFT is not measured.",
+    )
+    compare_parser.add_argument("--temperature", type=float)
+    compare_parser.add_argument("--max-tokens", type=int)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        run_compare(args)
+    elif args.command == "serve":
+        serve(
+            build_client(args),
+            host=args.host,
+            port=args.port,
+            max_workers=args.workers,
+            allow_remote_images=args.allow_remote_images,
+        )
+
+
+def run_compare(args):
+    kwargs = {}
+    if args.temperature is not None:
+        kwargs["temperature"] = args.temperature
+    if args.max_tokens is not None:
+        kwargs["max_tokens"] = args.max_tokens
+
+    result = compare(
+        Client(_provider_configs(args.config)),
+        args.models,
+        load_prompts(args.prompts),
+        limits=_key_values(args.limit, int),
+        max_workers=args.workers,
+        repeats=args.repeats,
+        stream=not args.no_stream,
+        **kwargs,
+    )
+    if args.output:
+        if args.output.endswith(".parquet"):
+            result.to_parquet(args.output)
+        else:
+            result.to_csv(args.output)
+
+    def fmt(value):
+        return "-" if value is None else f"{value:.3f}"
+
+    print(
+        f"{'model':40} {'calls':>6} {'errors':>6} {'p50 s':>8} {'p95 s':>8} {'ttft p50':>9}"
+    )
+    for row in result.summary():
+        print(
+            f"{row['model']:40} {row['calls']:>6} {row['errors']:>6} "
+            f"{fmt(row['latency_p50']):>8} {fmt(row['latency_p95']):>8} "
+            f"{fmt(row['ttft_p50']):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
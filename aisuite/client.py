@@ -1,8 +1,40 @@
-from .provider import ProviderFactory
+import asyncio
+import contextlib
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .cascade import Cascade
+from .middleware import Request, compile_async_chain, compile_chain
+from .profiling import SlowCallProfiler
+from .provider import Provider, ProviderFactory, usage_from
+from . import sampling, structured
+
+# Upper bound on the number of embedding batches sent to a provider at once.
+DEFAULT_EMBEDDINGS_MAX_WORKERS = 8
+
+# Upper bound on the number of models warmed up at once.
+DEFAULT_WARMUP_MAX_WORKERS = 8
 
 
 class Client:
-    def __init__(self, provider_configs: dict = {}):
+    def __init__(
+        self,
+        provider_configs: dict = {},
+        scheduler=None,
+        rate_limiter=None,
+        cache=None,
+        transport=None,
+        share_providers: bool = False,
+        image_preprocessor=None,
+        semantic_cache=None,
+        adaptive_limiter=None,
+        middlewares: list = None,
+        profiler=None,
+    ):
         """
         Initialize the client with provider configurations.
         Use the ProviderFactory to create provider instances.
@@ -20,19 +52,68 @@ class Client:
                         "aws_region": "us-west-2"
                     }
                 }
+            scheduler (Scheduler): Optional scheduler that applies per-provider concurrency
+                limits, priorities and queue deadlines to chat completion calls.
+            rate_limiter (RateLimiter): Optional per-provider request rate limits.
+            cache (ResponseCache): Optional cache for chat completion responses.
+                rate_limiter and cache can share state between processes through a
+                SQLiteStateBackend.
+            transport (httpx.BaseTransport): Optional httpx transport given to every
+                provider that sends requests through httpx, unless its config sets
+                its own. Used to record and replay traffic with a Cassette.
+            share_providers (bool): Reuse process-wide provider instances, so clients
+                with equal configs share SDK clients and connection pools. Providers
+                are re-created in a child process after os.fork().
+            image_preprocessor (ImagePreprocessor): Optional stage that downscales and
+                recompresses images in messages to the provider's limits.
+            semantic_cache (SemanticCache): Optional cache that answers requests whose
+                final user message is similar to one answered before.
+            adaptive_limiter (AdaptiveLimiter): Optional per-provider concurrency limits
+                that grow while calls are healthy and shrink on throttling errors and
+                latency spikes.
+            middlewares (list): Callables `middleware(request, call_next)` wrapped, in
+                order, around every chat completion call. See aisuite.middleware.
+            profiler (SlowCallProfiler): Optional profiler for chat completion calls
+                that spend too long on the client side. Defaults to one configured by
+                the AISUITE_PROFILE_SLOW_CALLS environment variable, if set.
         """
         self.providers = {}
         self.provider_configs = provider_configs
+        self.scheduler = scheduler
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.transport = transport
+        self.share_providers = share_providers
+        self.image_preprocessor = image_preprocessor
+        self.semantic_cache = semantic_cache
+        self.adaptive_limiter = adaptive_limiter
+        self._pid = os.getpid()
         self._chat = None
+        self._embeddings = None
+        self.middlewares = list(middlewares or [])
+        self.profiler = (
+            profiler if profiler is not None else SlowCallProfiler.from_env()
+        )
+        self._compile_middlewares()
         self._initialize_providers()
 
     def _initialize_providers(self):
         """Helper method to initialize or update providers."""
         for provider_key, config in self.provider_configs.items():
             provider_key = self._validate_provider_key(provider_key)
-            self.providers[provider_key] = ProviderFactory.create_provider(
-                provider_key, config
-            )
+            self.providers[provider_key] = self._create_provider(provider_key, config)
+
+    def _create_provider(self, provider_key, config):
+        config = self._provider_config(config)
+        if self.share_providers:
+            return ProviderFactory.get_shared_provider(provider_key, config)
+        return ProviderFactory.create_provider(provider_key, config)
+
+    def _provider_config(self, config):
+        """Apply client-wide provider options to a provider config."""
+        if self.transport is not None and "transport" not in config:
+            return {**config, "transport": self.transport}
+        return config
 
     def _validate_provider_key(self, provider_key):
         """
@@ -48,6 +129,20 @@ class Client:
 
         return provider_key
 
+    def add_middleware(self, middleware):
+        """Append a middleware to the chain. It runs inside the ones added before it."""
+        self.middlewares.append(middleware)
+        self._compile_middlewares()
+
+    def _compile_middlewares(self):
+        # The chains are built once here, so a call pays only for the middlewares it
+        # passes through, and a client without middlewares calls the handler directly.
+        handler = self.chat.completions._handle
+        # The profiler measures the calling thread, so it only wraps blocking calls.
+        profiled = [self.profiler] if self.profiler is not None else []
+        self._chain = compile_chain(profiled + self.middlewares, handler)
+        self._async_chain = compile_async_chain(self.middlewares, handler)
+
     def configure(self, provider_configs: dict = None):
         """
         Configure the client with provider configurations.
@@ -58,6 +153,77 @@ class Client:
         self.provider_configs.update(provider_configs)
         self._initialize_providers()  # NOTE: This will override existing provider instances.
 
+    def warmup(self, models: list, **kwargs):
+        """
+        Prepare providers and models ahead of the first request.
+
+        Providers are created eagerly, their connection pools are opened and, where the
+        provider supports it (e.g. Ollama), the models are loaded into memory. Models are
+        warmed up concurrently.
+
+        Args:
+            models (list): Model identifiers in the form 'provider:model'.
+            kwargs (dict): Provider specific warmup options, e.g. keep_alive for Ollama.
+        """
+        targets = [self._get_provider(model) for model in models]
+        # Providers that keep the base no-op warmup, or that do not derive from
+        # Provider and have none, are created with nothing to run.
+        targets = [
+            (provider, model_name)
+            for provider, model_name in targets
+            if getattr(type(provider), "warmup", Provider.warmup) is not Provider.warmup
+        ]
+        if not targets:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(DEFAULT_WARMUP_MAX_WORKERS, len(targets))
+        ) as pool:
+            futures = [
+                pool.submit(provider.warmup, model_name, **kwargs)
+                for provider, model_name in targets
+            ]
+            for future in futures:
+                future.result()
+
+    def _get_provider(self, model: str):
+        """
+        Resolve a 'provider:model' string to a provider instance and model name.
+        Providers are created lazily the first time they are used.
+        """
+        # Check that correct format is used
+        if ":" not in model:
+            raise ValueError(
+                f"Invalid model format. Expected 'provider:model', got '{model}'"
+            )
+
+        # Extract the provider key from the model identifier, e.g., "google:gemini-xx"
+        provider_key, model_name = model.split(":", 1)
+
+        # Validate if the provider is supported
+        supported_providers = ProviderFactory.get_supported_providers()
+        if provider_key not in supported_providers:
+            raise ValueError(
+                f"Invalid provider key '{provider_key}'. Supported providers: {supported_providers}. "
+                "Make sure the model string is formatted correctly as 'provider:model'."
+            )
+
+        # Shared providers from the parent process are not used after a fork.
+        if self.share_providers and self._pid != os.getpid():
+            self.providers = {}
+            self._pid = os.getpid()
+
+        # Initialize provider if not already initialized
+        if provider_key not in self.providers:
+            config = self.provider_configs.get(provider_key, {})
+            self.providers[provider_key] = self._create_provider(provider_key, config)
+
+        provider = self.providers.get(provider_key)
+        if not provider:
+            raise ValueError(f"Could not load provider for '{provider_key}'.")
+
+        return provider, model_name
+
     @property
     def chat(self):
         """Return the chat API interface."""
@@ -65,6 +231,13 @@ class Client:
             self._chat = Chat(self)
         return self._chat
 
+    @property
+    def embeddings(self):
+        """Return the embeddings API interface."""
+        if not self._embeddings:
+            self._embeddings = Embeddings(self)
+        return self._embeddings
+
 
 class Chat:
     def __init__(self, client: "Client"):
@@ -81,37 +254,349 @@ class Completions:
     def __init__(self, client: "Client"):
         self.client = client
 
-    def create(self, model: str, messages: list, **kwargs):
+    def create(
+        self,
+        model: str,
+        messages: list,
+        consensus=None,
+        priority="default",
+        queue_timeout: float = None,
+        hedge=None,
+        **kwargs,
+    ):
         """
         Create chat completion based on the model, messages, and any extra arguments.
+
+        The model is a 'provider:model' string, or a Cascade of models that are tried
+        in order until one's answer is accepted. Once the model string is parsed, the
+        call passes through the client's middlewares.
+
+        `n` is supported for every provider. Providers without native support receive
+        n concurrent requests whose choices are merged into one response.
+
+        Args:
+            consensus (bool or callable): Majority voting over the n samples. Sampling
+                stops once one answer holds a majority, and the winning choices are
+                returned first. A callable maps a choice's content to the voted value.
+            priority (str or int): Scheduling class when the client has a scheduler,
+                e.g. "interactive" or "batch". Lower integers are served first.
+            queue_timeout (float): Seconds the call may wait for scheduler and adaptive
+                limiter slots before it is shed with a RequestShedError.
+            hedge (Hedge): Sends a backup request when the call is slower than the
+                hedge delay, and returns whichever response arrives first.
         """
-        # Check that correct format is used
-        if ":" not in model:
-            raise ValueError(
-                f"Invalid model format. Expected 'provider:model', got '{model}'"
+        if isinstance(model, Cascade):
+            return model.run(
+                lambda tier_model, tier_messages, **tier_kwargs: self.create(
+                    tier_model,
+                    tier_messages,
+                    consensus=consensus,
+                    priority=priority,
+                    queue_timeout=queue_timeout,
+                    hedge=hedge,
+                    **tier_kwargs,
+                ),
+                messages,
+                **kwargs,
             )
 
-        # Extract the provider key from the model identifier, e.g., "google:gemini-xx"
-        provider_key, model_name = model.split(":", 1)
+        return self.client._chain(
+            self._request(
+                model, messages, consensus, priority, queue_timeout, hedge, kwargs
+            )
+        )
 
-        # Validate if the provider is supported
-        supported_providers = ProviderFactory.get_supported_providers()
-        if provider_key not in supported_providers:
-            raise ValueError(
-                f"Invalid provider key '{provider_key}'. Supported providers: {supported_providers}. "
-                "Make sure the model string is formatted correctly as 'provider:model'."
+    async def acreate(
+        self,
+        model: str,
+        messages: list,
+        consensus=None,
+        priority="default",
+        queue_timeout: float = None,
+        hedge=None,
+        **kwargs,
+    ):
+        """
+        Create a chat completion without blocking the event loop.
+
+        Takes the same arguments as create(). Coroutine middlewares run on the event
+        loop, and the provider call runs in the loop's default executor.
+        """
+        if isinstance(model, Cascade):
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(
+                    self.create,
+                    model,
+                    messages,
+                    consensus=consensus,
+                    priority=priority,
+                    queue_timeout=queue_timeout,
+                    hedge=hedge,
+                    **kwargs,
+                ),
+            )
+        return await self.client._async_chain(
+            self._request(
+                model, messages, consensus, priority, queue_timeout, hedge, kwargs
             )
+        )
 
-        # Initialize provider if not already initialized
-        if provider_key not in self.client.providers:
-            config = self.client.provider_configs.get(provider_key, {})
-            self.client.providers[provider_key] = ProviderFactory.create_provider(
-                provider_key, config
+    def _request(
+        self, model, messages, consensus, priority, queue_timeout, hedge, kwargs
+    ):
+        provider, _ = self.client._get_provider(model)
+        options = {
+            "consensus": consensus,
+            "priority": priority,
+            "queue_timeout": queue_timeout,
+            "hedge": hedge,
+        }
+        return Request(model, messages, kwargs, options, provider)
+
+    def _handle(self, request):
+        """Run a chat completion request; the innermost step of the middleware chain."""
+        model, messages, kwargs = request.model, request.messages, request.kwargs
+        provider = request.provider
+        if provider is None:
+            provider, _ = self.client._get_provider(model)
+        model_name = request.model_name
+        consensus = request.options.get("consensus")
+        priority = request.options.get("priority", "default")
+        queue_timeout = request.options.get("queue_timeout")
+        hedge = request.options.get("hedge")
+
+        if self.client.image_preprocessor is not None:
+            messages = self.client.image_preprocessor.prepare(
+                messages, getattr(provider, "IMAGE_MAX_DIMENSION", None)
             )
 
-        provider = self.client.providers.get(provider_key)
-        if not provider:
-            raise ValueError(f"Could not load provider for '{provider_key}'.")
+        cache = self.client.cache
+        cache_key = None
+        if cache is not None and not kwargs.get("stream"):
+            cache_key = cache.key(model, messages, kwargs, request.options)
+            response = cache.get(cache_key)
+            if response is not None:
+                return response
+
+        semantic_cache = self.client.semantic_cache
+        semantic_key = None
+        if semantic_cache is not None and not kwargs.get("stream"):
+            semantic_key = semantic_cache.key(
+                self.client, model, messages, kwargs, request.options
+            )
+            if semantic_key is not None:
+                response = semantic_cache.get(semantic_key)
+                if response is not None:
+                    return response
+
+        provider_key = model.split(":", 1)[0]
+        create = provider.chat_completions_create
+        if (
+            self.client.scheduler is not None
+            or self.client.rate_limiter is not None
+            or self.client.adaptive_limiter is not None
+        ):
+            create = self._limited(provider_key, create, priority, queue_timeout)
+
+        def dispatch():
+            n = kwargs.get("n") or 1
+            if n > 1 and (consensus or not getattr(provider, "SUPPORTS_N", False)):
+                return sampling.sample(
+                    create,
+                    model_name,
+                    messages,
+                    n,
+                    consensus=consensus,
+                    **{key: value for key, value in kwargs.items() if key != "n"},
+                )
+            # Delegate the chat completion to the correct provider's implementation
+            return create(model_name, messages, **kwargs)
+
+        if hedge is not None and not kwargs.get("stream"):
+            response = hedge.run(
+                dispatch,
+                lambda: self.create(
+                    hedge.backup or model,
+                    messages,
+                    consensus=consensus,
+                    priority=priority,
+                    queue_timeout=queue_timeout,
+                    **kwargs,
+                ),
+            )
+        else:
+            response = dispatch()
+
+        if cache_key is not None:
+            cache.set(cache_key, response)
+        if semantic_key is not None:
+            semantic_cache.set(semantic_key, response)
+        return response
+
+    def _limited(self, provider_key, create, priority, queue_timeout):
+        """Wrap a provider call in the client's rate limiter, scheduler and adaptive limiter."""
+        rate_limiter = self.client.rate_limiter
+
+        def limited(*args, **kwargs):
+            # The rate limit is waited for before a slot is taken, so no slot is held
+            # while it sleeps.
+            if rate_limiter is not None:
+                rate_limiter.acquire(provider_key)
+            with self._slots(provider_key, priority, queue_timeout):
+                return create(*args, **kwargs)
+
+        return limited
+
+    @contextlib.contextmanager
+    def _slots(self, provider_key, priority, queue_timeout, timed=True):
+        """
+        Hold the scheduler and adaptive limiter slots of a call. Both waits share the
+        call's queue timeout, so a call admitted by the scheduler cannot wait without
+        bound for an adaptive slot.
+        """
+        scheduler = self.client.scheduler
+        adaptive_limiter = self.client.adaptive_limiter
+        if queue_timeout is None and scheduler is not None:
+            queue_timeout = scheduler.default_queue_timeout
+        deadline = None if queue_timeout is None else time.monotonic() + queue_timeout
+        with contextlib.ExitStack() as stack:
+            if scheduler is not None:
+                stack.enter_context(
+                    scheduler.slot(provider_key, priority, queue_timeout)
+                )
+            if adaptive_limiter is not None:
+                remaining = (
+                    None if deadline is None else max(0.0, deadline - time.monotonic())
+                )
+                stack.enter_context(
+                    adaptive_limiter.slot(provider_key, timed=timed, timeout=remaining)
+                )
+            yield
+
+    def stream(
+        self,
+        model: str,
+        messages: list,
+        priority="default",
+        queue_timeout: float = None,
+        **kwargs,
+    ):
+        """
+        Stream a chat completion, yielding its text as it is generated.
+
+        Providers without a streaming API yield the whole completion at once. The
+        client's rate limiter applies before the request, and scheduler and adaptive
+        limiter slots are held until the stream is exhausted or closed.
+
+        The generator returns the token usage when the provider reports it, as a
+        dict with prompt_tokens, completion_tokens and total_tokens, and None
+        otherwise.
+        """
+        provider, model_name = self.client._get_provider(model)
+
+        if self.client.image_preprocessor is not None:
+            messages = self.client.image_preprocessor.prepare(
+                messages, getattr(provider, "IMAGE_MAX_DIMENSION", None)
+            )
+
+        provider_key = model.split(":", 1)[0]
+        if self.client.rate_limiter is not None:
+            self.client.rate_limiter.acquire(provider_key)
+        with self._slots(provider_key, priority, queue_timeout, timed=False):
+            if hasattr(provider, "chat_completions_stream"):
+                return (
+                    yield from provider.chat_completions_stream(
+                        model_name, messages, **kwargs
+                    )
+                )
+            response = provider.chat_completions_create(model_name, messages, **kwargs)
+            yield response.choices[0].message.content or ""
+            return usage_from(getattr(response, "usage", None))
+
+    def stream_json(
+        self,
+        model: str,
+        messages: list,
+        path=None,
+        schema: dict = None,
+        **kwargs,
+    ):
+        """
+        Stream a JSON completion, yielding values as soon as they are complete.
+
+        Items of the array at `path` (by default the top-level array) are yielded as
+        each one closes, while the rest of the completion is still being generated.
+        A top-level value that is not an array is yielded once complete.
+
+        Args:
+            path (str or tuple): Key, or keys, of the array whose items are yielded.
+            schema (dict): JSON schema every yielded value must match.
+
+        Raises:
+            StructuredOutputError: If the output is not valid JSON or a value does
+                not match the schema.
+        """
+        return structured.iter_json(
+            self.stream(model, messages, **kwargs), path=path, schema=schema
+        )
+
+
+class Embeddings:
+    def __init__(self, client: "Client"):
+        self.client = client
+
+    def create(
+        self,
+        model: str,
+        input,
+        batch_size: int = None,
+        max_workers: int = DEFAULT_EMBEDDINGS_MAX_WORKERS,
+        **kwargs,
+    ):
+        """
+        Create embeddings for the input texts based on the model and any extra arguments.
+
+        The input is split into batches sized for the provider, and the batches are
+        sent concurrently. The result is a contiguous float32 matrix with one row per
+        input text, in the same order as the input.
+
+        Args:
+            model (str): The model identifier in the form 'provider:model'.
+            input (str or list of str): The text(s) to embed.
+            batch_size (int): Overrides the provider's preferred batch size.
+            max_workers (int): Maximum number of batches in flight at once.
+            kwargs (dict): Extra arguments passed to the provider.
+
+        Returns:
+            numpy.ndarray: A (len(input), dimensions) float32 matrix.
+        """
+        provider, model_name = self.client._get_provider(model)
+        if not hasattr(provider, "embeddings_create"):
+            raise ValueError(f"Provider for '{model}' does not support embeddings.")
+
+        if isinstance(input, str):
+            input = [input]
+        if not input:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batch_size = batch_size or provider.embeddings_batch_size(model_name)
+        batches = [
+            input[start : start + batch_size]
+            for start in range(0, len(input), batch_size)
+        ]
+
+        def embed(batch):
+            return np.asarray(
+                provider.embeddings_create(model_name, batch, **kwargs),
+                dtype=np.float32,
+            )
+
+        if len(batches) == 1:
+            return np.ascontiguousarray(embed(batches[0]))
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+            results = list(pool.map(embed, batches))
 
-        # Delegate the chat completion to the correct provider's implementation
-        return provider.chat_completions_create(model_name, messages, **kwargs)
+        # np.concatenate copies the batches into one freshly allocated, C-contiguous matrix.
+        return np.concatenate(results, axis=0)
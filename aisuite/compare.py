@@ -0,0 +1,281 @@
+"""Run a prompt x model matrix concurrently and collect responses, latency and usage."""
+
+import contextlib
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .scheduler import Scheduler
+
+# Upper bound on the number of matrix cells in flight at once.
+DEFAULT_MAX_WORKERS = 32
+
+# Concurrent requests per provider when no limit is given for it.
+DEFAULT_PROVIDER_LIMIT = 8
+
+COLUMNS = (
+    "model",
+    "prompt_index",
+    "repeat",
+    "response",
+    "error",
+    "latency",
+    "ttft",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "cost",
+)
+
+
+class ComparisonResult:
+    """
+    The results of a comparison, one row per (model, prompt, repeat), stored by column.
+
+    Latency and time to first token (ttft) are in seconds. Token counts and cost are
+    None when the provider does not report usage.
+    """
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["model"])
+
+    def rows(self):
+        """Return the results as a list of dicts."""
+        return [
+            dict(zip(self.columns, values)) for values in zip(*self.columns.values())
+        ]
+
+    def to_csv(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.columns)
+            writer.writerows(zip(*self.columns.values()))
+
+    def to_pandas(self):
+        """Return the results as a pandas DataFrame (requires pandas)."""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                "DataFrame output requires the pandas package. Install it with `pip install pandas`."
+            )
+        return pd.DataFrame(self.columns)
+
+    def to_parquet(self, path):
+        """Write the results to a Parquet file (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Parquet output requires the pyarrow package. Install it with `pip install pyarrow`."
+            )
+        pq.write_table(pa.table(self.columns), path)
+
+    def summary(self):
+        """
+        Aggregate the results per model.
+
+        Returns:
+            list: One dict per model with the call and error counts, median and p95
+            latency and ttft, mean completion tokens and total cost.
+        """
+        models = np.array(self.columns["model"], dtype=object)
+        failed = np.array([error is not None for error in self.columns["error"]])
+        latency = _float_array(self.columns["latency"])
+        ttft = _float_array(self.columns["ttft"])
+        completion_tokens = _float_array(self.columns["completion_tokens"])
+        cost = _float_array(self.columns["cost"])
+
+        summary = []
+        for model in dict.fromkeys(self.columns["model"]):
+            rows = models == model
+            ok = rows & ~failed
+            summary.append(
+                {
+                    "model": model,
+                    "calls": int(rows.sum()),
+                    "errors": int((rows & failed).sum()),
+                    "latency_p50": _percentile(latency[ok], 50),
+                    "latency_p95": _percentile(latency[ok], 95),
+                    "ttft_p50": _percentile(ttft[ok], 50),
+                    "ttft_p95": _percentile(ttft[ok], 95),
+                    "completion_tokens_mean": _mean(completion_tokens[ok]),
+                    "cost": _sum(cost[rows]),
+                }
+            )
+        return summary
+
+
+def _float_array(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _percentile(values, q):
+    values = values[~np.isnan(values)]
+    return float(np.percentile(values, q)) if values.size else None
+
+
+def _mean(values):
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if values.size else None
+
+
+def _sum(values):
+    values = values[~np.isnan(values)]
+    return float(values.sum()) if values.size else None
+
+
+def _usage_value(usage, name):
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get(name)
+    return getattr(usage, name, None)
+
+
+def _as_messages(prompt):
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return prompt
+
+
+def compare(
+    client,
+    models: list,
+    prompts: list,
+    limits: dict = None,
+    default_limit: int = DEFAULT_PROVIDER_LIMIT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    repeats: int = 1,
+    stream: bool = True,
+    prices: dict = None,
+    **kwargs,
+):
+    """
+    Send every prompt to every model concurrently and collect the results.
+
+    Example:
+        result = compare(client, ["openai:gpt-4o-mini", "groq:llama3-8b-8192"], prompts,
+                         limits={"openai": 16, "groq": 4})
+        result.to_csv("comparison.csv")
+
+    Args:
+        client (Client): The client the requests are sent through.
+        models (list): 'provider:model' strings.
+        prompts (list): Prompts, each a string or a list of messages.
+        limits (dict): Maximum concurrent requests per provider key.
+        default_limit (int): Limit for providers not listed in limits. When the
+            client has a scheduler and no limits are given, the client's scheduler
+            limits requests instead.
+        max_workers (int): Maximum requests in flight across all providers.
+        repeats (int): Number of times each prompt is sent to each model.
+        stream (bool): Stream responses so time to first token is measured. Token
+            usage is collected either way, from providers that report it.
+        prices (dict): Optional USD price per million (input, output) tokens per
+            model, used to fill the cost column.
+        kwargs (dict): Extra arguments for every request, e.g. temperature.
+
+    Returns:
+        ComparisonResult: One row per model, prompt and repeat, in that order.
+    """
+    # The client's scheduler already limits every request it sends, so a second
+    # one is only created for limits specific to this comparison, or when the
+    # client has none.
+    scheduler = None
+    if limits or client.scheduler is None:
+        scheduler = Scheduler(limits, default_limit=default_limit)
+    prices = prices or {}
+    cells = [
+        (model, index, repeat)
+        for model in models
+        for index in range(len(prompts))
+        for repeat in range(repeats)
+    ]
+
+    def run(cell):
+        model, index, _ = cell
+        slot = (
+            scheduler.slot(model.split(":", 1)[0])
+            if scheduler is not None
+            else contextlib.nullcontext()
+        )
+        with slot:
+            return _run_cell(
+                client, model, _as_messages(prompts[index]), stream, kwargs
+            )
+
+    # Interleave models in submission order, so that workers waiting for one
+    # provider's slots do not hold back requests to the others.
+    order = sorted(
+        range(len(cells)),
+        key=lambda i: (cells[i][2], cells[i][1], models.index(cells[i][0])),
+    )
+    results = [None] * len(cells)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i, result in zip(order, pool.map(lambda i: run(cells[i]), order)):
+            results[i] = result
+
+    columns = {name: [] for name in COLUMNS}
+    for (model, index, repeat), result in zip(cells, results):
+        columns["model"].append(model)
+        columns["prompt_index"].append(index)
+        columns["repeat"].append(repeat)
+        for name in COLUMNS[3:-1]:
+            columns[name].append(result.get(name))
+        columns["cost"].append(_cost(prices.get(model), result))
+    return ComparisonResult(columns)
+
+
+def _run_cell(client, model, messages, stream, kwargs):
+    start = time.perf_counter()
+    ttft = None
+    usage = None
+    try:
+        if stream:
+            parts = []
+            deltas = client.chat.completions.stream(model, messages, **kwargs)
+            while True:
+                try:
+                    delta = next(deltas)
+                except StopIteration as stop:
+                    # The stream returns the token usage when it ends.
+                    usage = stop.value
+                    break
+                if ttft is None and delta:
+                    ttft = time.perf_counter() - start
+                parts.append(delta)
+            text = "".join(parts)
+        else:
+            response = client.chat.completions.create(model, messages, **kwargs)
+            text = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+    except Exception as error:
+        return {
+            "error": f"{type(error).__name__}: {error}",
+            "latency": time.perf_counter() - start,
+        }
+
+    return {
+        "response": text,
+        "latency": time.perf_counter() - start,
+        "ttft": ttft,
+        "prompt_tokens": _usage_value(usage, "prompt_tokens"),
+        "completion_tokens": _usage_value(usage, "completion_tokens"),
+        "total_tokens": _usage_value(usage, "total_tokens"),
+    }
+
+
+def _cost(price, result):
+    if price is None or result.get("prompt_tokens") is None:
+        return None
+    input_price, output_price = price
+    return (
+        result["prompt_tokens"] * input_price
+        + (result.get("completion_tokens") or 0) * output_price
+    ) / 1_000_000
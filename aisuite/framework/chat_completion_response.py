@@ -4,5 +4,6 @@ from aisuite.framework.choice import Choice
 class ChatCompletionResponse:
     """Used to conform to the response model of OpenAI"""
 
-    def __init__(self):
-        self.choices = [Choice()]  # Adjust the range as needed for more choices
+    def __init__(self, choices=None):
+        # A single empty choice by default, for providers to fill in.
+        self.choices = choices if choices is not None else [Choice()]
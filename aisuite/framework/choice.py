@@ -4,3 +4,6 @@ from aisuite.framework.message import Message
 class Choice:
     def __init__(self):
         self.message = Message()
+        self.finish_reason = None
+        # A Logprobs, when requested with logprobs=True. See aisuite.logprobs.
+        self.logprobs = None
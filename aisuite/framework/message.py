@@ -1,6 +1,21 @@
 """Interface to hold contents of api responses when they do not conform to the OpenAI style response"""
 
 
+class Function:
+    def __init__(self, name=None, arguments=None):
+        self.name = name
+        # A JSON string, as in OpenAI's API.
+        self.arguments = arguments
+
+
+class ToolCall:
+    def __init__(self, id=None, name=None, arguments=None):
+        self.id = id
+        self.type = "function"
+        self.function = Function(name, arguments)
+
+
 class Message:
     def __init__(self):
         self.content = None
+        self.tool_calls = None
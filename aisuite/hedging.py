@@ -0,0 +1,129 @@
+"""Hedged requests: send a backup request when the primary one is slow."""
+
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+# Delay used until enough latencies have been observed to learn a percentile.
+DEFAULT_INITIAL_DELAY = 2.0
+
+# Number of recent primary latencies the learned delay is computed from.
+_LATENCY_WINDOW = 1000
+
+
+class Hedge:
+    """
+    Hedging policy for chat completion calls.
+
+    If the primary request has not completed after the hedge delay, the same request
+    is sent to the backup model (or again to the same model, which reaches another
+    member when the provider is configured as a pool). Whichever response arrives
+    first is returned; the other request is abandoned and its result discarded.
+
+    The delay is either fixed, or learned as a percentile of recent primary latencies.
+    A budget caps hedged calls at a fraction of all calls, so hedging cannot double
+    the load when a provider slows down as a whole.
+
+    Reuse one Hedge across calls so it can learn latencies and track its budget:
+
+        hedge = Hedge(backup="azure:gpt-4o", percentile=95, budget=0.05)
+        client.chat.completions.create("openai:gpt-4o", messages, hedge=hedge)
+    """
+
+    def __init__(
+        self,
+        backup: str = None,
+        delay: float = None,
+        percentile: float = 95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        initial_delay: float = DEFAULT_INITIAL_DELAY,
+    ):
+        """
+        Args:
+            backup (str): The 'provider:model' to send the backup request to. Defaults
+                to the primary model.
+            delay (float): Fixed seconds to wait before hedging. When None, the delay is
+                the given percentile of recent primary latencies.
+            percentile (float): Latency percentile used for the learned delay.
+            budget (float): Maximum fraction of calls that may be hedged.
+            min_samples (int): Latencies needed before the learned delay is used.
+            initial_delay (float): Delay used until min_samples latencies are known.
+        """
+        self.backup = backup
+        self.delay = delay
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.calls = 0
+        self.hedged = 0
+        self.backup_wins = 0
+        self._latencies = collections.deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def current_delay(self):
+        """Return the seconds to wait for the primary request before hedging."""
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            latencies = np.fromiter(self._latencies, dtype=np.float64)
+        return float(np.percentile(latencies, self.percentile))
+
+    def run(self, primary, backup):
+        """
+        Call primary, and backup as well if primary is slower than the hedge delay.
+
+        Args:
+            primary (callable): Sends the primary request.
+            backup (callable): Sends the backup request.
+        """
+        delay = self.current_delay()
+        with self._lock:
+            self.calls += 1
+
+        # The pool is not waited on at exit, so the losing request cannot delay the caller.
+        pool = ThreadPoolExecutor(max_workers=2)
+        try:
+            start = time.monotonic()
+            primary_future = pool.submit(primary)
+            # Primary latencies are recorded even when the backup wins, so that slow
+            # requests are not left out of the learned percentile.
+            primary_future.add_done_callback(
+                lambda future: self._record_latency(future, start)
+            )
+            done, _ = wait([primary_future], timeout=delay)
+            if done or not self._take_budget():
+                return primary_future.result()
+
+            backup_future = pool.submit(backup)
+            pending = {primary_future, backup_future}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is backup_future:
+                            with self._lock:
+                                self.backup_wins += 1
+                        return future.result()
+            # Both requests failed; report the primary request's error.
+            return primary_future.result()
+        finally:
+            pool.shutdown(wait=False)
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def _record_latency(self, future, start):
+        if future.exception() is None:
+            with self._lock:
+                self._latencies.append(time.monotonic() - start)
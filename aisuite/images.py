@@ -0,0 +1,407 @@
+"""Image content parts for chat messages.
+
+A message's content may be a list of parts instead of a string. Text parts use the
+OpenAI form {"type": "text", "text": ...}. Image parts are either
+
+    {"type": "image", "image": <pathlib.Path, bytes, URL or data URL>}
+    {"type": "image_url", "image_url": {"url": <URL or data URL>}}
+
+and are translated into each provider's own format. Images read from files or bytes
+are base64-encoded once and the encoding is cached by content hash, so images that
+recur across calls are not re-encoded.
+"""
+
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# Upper bounds, in bytes, for the encoded images and downloaded URLs kept in memory.
+BASE64_CACHE_BYTES = 64 * 1024 * 1024
+DOWNLOAD_CACHE_BYTES = 64 * 1024 * 1024
+
+DEFAULT_JPEG_QUALITY = 85
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class _ByteBoundedCache:
+    """A thread-safe LRU cache limited by the total size of its values."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+
+_base64_cache = _ByteBoundedCache(BASE64_CACHE_BYTES)
+_download_cache = _ByteBoundedCache(DOWNLOAD_CACHE_BYTES)
+_prepared_cache = _ByteBoundedCache(BASE64_CACHE_BYTES)
+
+
+def _sniff_media_type(data):
+    for signature, media_type in _SIGNATURES:
+        if data.startswith(signature):
+            return media_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class ImageData:
+    """An image from a file, bytes or a URL, with lazily computed and cached encodings."""
+
+    def __init__(self, data: bytes = None, url: str = None, media_type: str = None):
+        self._data = data
+        self.url = url
+        self._media_type = media_type
+        self._digest = None
+
+    @classmethod
+    def from_source(cls, source, allow_paths: bool = False):
+        """
+        Create an ImageData from a pathlib.Path, bytes, URL, data URL or ImageData.
+
+        Strings are only read as file paths with allow_paths, so that messages from
+        untrusted sources cannot read local files.
+        """
+        if isinstance(source, ImageData):
+            return source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return cls(data=bytes(source))
+        is_path = isinstance(source, os.PathLike)
+        source = os.fspath(source)
+        if not is_path and source.startswith("data:"):
+            header, _, encoded = source.partition(",")
+            media_type = header[len("data:") :].split(";")[0] or None
+            image = cls(data=base64.b64decode(encoded), media_type=media_type)
+            # The caller already holds the base64 form; keep it instead of re-encoding.
+            _base64_cache.put(image.digest, encoded, len(encoded))
+            return image
+        if not is_path and source.startswith(("http://", "https://")):
+            return cls(url=source)
+        if not (is_path or allow_paths):
+            raise ValueError(
+                f"Image source {source[:64]!r} is not a URL or data URL. "
+                "Pass a pathlib.Path to read an image file."
+            )
+        with open(source, "rb") as f:
+            return cls(data=f.read(), media_type=mimetypes.guess_type(source)[0])
+
+    @property
+    def data(self):
+        """The raw image bytes. Remote images are downloaded on first use and cached."""
+        if self._data is None:
+            data = _download_cache.get(self.url)
+            if data is None:
+                response = httpx.get(self.url, follow_redirects=True)
+                response.raise_for_status()
+                data = response.content
+                _download_cache.put(self.url, data, len(data))
+            self._data = data
+        return self._data
+
+    @property
+    def digest(self):
+        """SHA-256 of the image bytes, used as the cache key for encodings."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.data).hexdigest()
+        return self._digest
+
+    @property
+    def media_type(self):
+        if self._media_type is None:
+            self._media_type = (
+                _sniff_media_type(self.data)
+                or mimetypes.guess_type(self.url or "")[0]
+                or "image/jpeg"
+            )
+        return self._media_type
+
+    @property
+    def format(self):
+        """The short image format name, e.g. "png" or "jpeg"."""
+        return self.media_type.split("/")[-1]
+
+    def base64(self):
+        """The base64 encoding of the image bytes, computed once per distinct image."""
+        encoded = _base64_cache.get(self.digest)
+        if encoded is None:
+            encoded = base64.b64encode(self.data).decode("ascii")
+            _base64_cache.put(self.digest, encoded, len(encoded))
+        return encoded
+
+    def data_url(self):
+        return f"data:{self.media_type};base64,{self.base64()}"
+
+    def url_or_data_url(self):
+        """A remote URL when the image has not been downloaded, otherwise a data URL."""
+        if self.url and self._data is None:
+            return self.url
+        return self.data_url()
+
+    def __repr__(self):
+        # Stable across calls for the same content, so requests with images can be cached.
+        if self.url and self._data is None:
+            return f"ImageData(url={self.url!r})"
+        return f"ImageData(sha256={self.digest})"
+
+
+def image_source(part):
+    """Return the image source of a content part, or None for non-image parts."""
+    if not isinstance(part, dict):
+        return None
+    if part.get("type") == "image":
+        return part["image"]
+    if part.get("type") == "image_url":
+        image_url = part["image_url"]
+        return image_url["url"] if isinstance(image_url, dict) else image_url
+    return None
+
+
+def iter_parts(content):
+    """
+    Yield ("text", str) and ("image", ImageData) pairs for message content.
+
+    Content may be a string, a list of parts, or None (an assistant message that
+    only calls tools).
+    """
+    if content is None:
+        return
+    if isinstance(content, str):
+        yield "text", content
+        return
+    for part in content:
+        if isinstance(part, str):
+            yield "text", part
+            continue
+        source = image_source(part)
+        if source is not None:
+            yield "image", ImageData.from_source(source)
+        elif part.get("type") == "text":
+            yield "text", part["text"]
+
+
+def has_image_parts(messages):
+    """Return True if any message has list content that may hold images."""
+    return any(not isinstance(message.get("content"), str) for message in messages)
+
+
+def to_openai_messages(messages):
+    """Translate image parts into OpenAI image_url parts. Messages without list content
+    are returned unchanged."""
+    if not has_image_parts(messages):
+        return messages
+    translated = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            message = {**message, "content": [_to_openai_part(p) for p in content]}
+        translated.append(message)
+    return translated
+
+
+def _to_openai_part(part):
+    source = image_source(part)
+    if source is None:
+        return part
+    image_url = {"url": ImageData.from_source(source).url_or_data_url()}
+    detail = part.get("detail") or (
+        part["image_url"].get("detail")
+        if isinstance(part.get("image_url"), dict)
+        else None
+    )
+    if detail:
+        image_url["detail"] = detail
+    return {"type": "image_url", "image_url": image_url}
+
+
+def to_anthropic_content(content):
+    """Translate message content into Anthropic content blocks."""
+    if isinstance(content, str):
+        return content
+    blocks = []
+    for kind, value in iter_parts(content):
+        if kind == "text":
+            blocks.append({"type": "text", "text": value})
+        else:
+            blocks.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": value.media_type,
+                        "data": value.base64(),
+                    },
+                }
+            )
+    return blocks
+
+
+def to_bedrock_content(content):
+    """Translate message content into Bedrock Converse content blocks."""
+    blocks = []
+    for kind, value in iter_parts(content):
+        if kind == "text":
+            blocks.append({"text": value})
+        else:
+            blocks.append(
+                {"image": {"format": value.format, "source": {"bytes": value.data}}}
+            )
+    return blocks
+
+
+def to_ollama_message(message):
+    """Translate a message into Ollama's form, with images in a separate list."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return message
+    texts, images = [], []
+    for kind, value in iter_parts(content):
+        if kind == "text":
+            texts.append(value)
+        else:
+            images.append(value.base64())
+    translated = {**message, "content": "\n".join(texts)}
+    if images:
+        translated["images"] = images
+    return translated
+
+
+class ImagePreprocessor:
+    """
+    Downscales and recompresses the images in a request before it is sent.
+
+    Images larger than the provider's limit (or max_dimension, if smaller) are resized
+    to fit and re-encoded, as JPEG unless they have transparency. The work runs in a
+    thread pool, one task per image, and results are cached by content hash. Requires
+    the Pillow package.
+
+    Example:
+        client = Client(image_preprocessor=ImagePreprocessor(max_dimension=1024))
+    """
+
+    def __init__(
+        self,
+        max_dimension: int = None,
+        quality: int = DEFAULT_JPEG_QUALITY,
+        max_workers: int = 4,
+    ):
+        """
+        Args:
+            max_dimension (int): Longest side in pixels for every provider. The
+                provider's own limit applies when it is smaller.
+            quality (int): JPEG quality used when re-encoding.
+            max_workers (int): Threads used to process images.
+        """
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def prepare(self, messages, provider_max_dimension=None):
+        """Return messages with every image part replaced by a prepared image."""
+        limits = [d for d in (self.max_dimension, provider_max_dimension) if d]
+        if not limits or not has_image_parts(messages):
+            return messages
+        max_dimension = min(limits)
+
+        jobs = {}
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, list):
+                for part in content:
+                    source = image_source(part)
+                    if source is not None and id(part) not in jobs:
+                        jobs[id(part)] = self._executor().submit(
+                            self._prepare_image,
+                            ImageData.from_source(source),
+                            max_dimension,
+                        )
+
+        prepared = []
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, list):
+                content = [
+                    (
+                        {"type": "image", "image": jobs[id(part)].result()}
+                        if id(part) in jobs
+                        else part
+                    )
+                    for part in content
+                ]
+                message = {**message, "content": content}
+            prepared.append(message)
+        return prepared
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _prepare_image(self, image, max_dimension):
+        key = (image.digest, max_dimension, self.quality)
+        prepared = _prepared_cache.get(key)
+        if prepared is not None:
+            return prepared
+
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError(
+                "Image preprocessing requires the Pillow package. Install it with `pip install pillow`."
+            )
+
+        with Image.open(io.BytesIO(image.data)) as img:
+            if max(img.size) <= max_dimension:
+                prepared = image
+            else:
+                img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+                output = io.BytesIO()
+                if img.mode in ("RGBA", "LA", "P"):
+                    img.save(output, format="PNG", optimize=True)
+                    media_type = "image/png"
+                else:
+                    img.convert("RGB").save(
+                        output, format="JPEG", quality=self.quality, optimize=True
+                    )
+                    media_type = "image/jpeg"
+                prepared = ImageData(data=output.getvalue(), media_type=media_type)
+
+        _prepared_cache.put(key, prepared, len(prepared.data))
+        return prepared
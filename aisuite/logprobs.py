@@ -0,0 +1,168 @@
+"""Token log probabilities as NumPy arrays.
+
+Chat completions requested with `logprobs=True` (and optionally `top_logprobs=k`)
+carry the log probability of every generated token. Providers return them as long
+nested lists; Logprobs holds them as flat arrays, and stack() pads the logprobs of
+many completions into batch arrays for vectorized scoring.
+"""
+
+import collections
+
+import numpy as np
+
+# Padded batch arrays, see stack(). Shapes are (batch, tokens) and
+# (batch, tokens, top); lengths holds the number of tokens of each completion.
+LogprobsBatch = collections.namedtuple(
+    "LogprobsBatch", ["tokens", "logprobs", "top_tokens", "top_logprobs", "lengths"]
+)
+
+
+def _field(item, name):
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+class Logprobs:
+    """
+    The log probabilities of one completion's tokens.
+
+    Attributes:
+        tokens (numpy.ndarray): The generated tokens, a (n,) string array.
+        logprobs (numpy.ndarray): Their log probabilities, a (n,) float32 array.
+        top_tokens (numpy.ndarray): The most likely tokens at each position, a (n, k)
+            string array, padded with "" where fewer than k were returned.
+        top_logprobs (numpy.ndarray): Their log probabilities, a (n, k) float32 array
+            padded with -inf.
+    """
+
+    __slots__ = ("tokens", "logprobs", "top_tokens", "top_logprobs")
+
+    def __init__(self, tokens, logprobs, top_tokens=None, top_logprobs=None):
+        self.tokens = np.asarray(tokens, dtype=np.str_)
+        self.logprobs = np.asarray(logprobs, dtype=np.float32)
+        if top_tokens is None:
+            top_tokens = np.empty((len(self.tokens), 0), dtype=np.str_)
+            top_logprobs = np.empty((len(self.tokens), 0), dtype=np.float32)
+        self.top_tokens = top_tokens
+        self.top_logprobs = top_logprobs
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __repr__(self):
+        return f"Logprobs(tokens={len(self)}, top={self.top_logprobs.shape[1]})"
+
+    @classmethod
+    def from_openai(cls, data):
+        """
+        Build Logprobs from a choice's logprobs in OpenAI's chat format
+        ({"content": [{"token", "logprob", "top_logprobs"}, ...]}), as a dict or an
+        SDK object. The completions format some servers return
+        ({"tokens", "token_logprobs", "top_logprobs"}) is accepted as well.
+        """
+        content = _field(data, "content")
+        if content is None and _field(data, "tokens") is not None:
+            return cls._from_completions_format(data)
+        content = content or []
+
+        tokens = [_field(item, "token") for item in content]
+        logprobs = [_field(item, "logprob") for item in content]
+        top = [_field(item, "top_logprobs") or () for item in content]
+        width = max((len(candidates) for candidates in top), default=0)
+
+        top_tokens = np.full((len(content), width), "", dtype=object)
+        top_logprobs = np.full((len(content), width), -np.inf, dtype=np.float32)
+        for i, candidates in enumerate(top):
+            for j, candidate in enumerate(candidates):
+                top_tokens[i, j] = _field(candidate, "token")
+                top_logprobs[i, j] = _field(candidate, "logprob")
+        return cls(tokens, logprobs, top_tokens.astype(np.str_), top_logprobs)
+
+    @classmethod
+    def _from_completions_format(cls, data):
+        tokens = _field(data, "tokens")
+        logprobs = [
+            -np.inf if value is None else value
+            for value in _field(data, "token_logprobs")
+        ]
+        top = _field(data, "top_logprobs") or []
+        width = max((len(candidates or ()) for candidates in top), default=0)
+
+        top_tokens = np.full((len(tokens), width), "", dtype=object)
+        top_logprobs = np.full((len(tokens), width), -np.inf, dtype=np.float32)
+        for i, candidates in enumerate(top):
+            # Candidates are a {token: logprob} mapping; order them most likely first.
+            ranked = sorted((candidates or {}).items(), key=lambda kv: -kv[1])
+            for j, (token, logprob) in enumerate(ranked):
+                top_tokens[i, j] = token
+                top_logprobs[i, j] = logprob
+        return cls(tokens, logprobs, top_tokens.astype(np.str_), top_logprobs)
+
+
+def from_choice(choice):
+    """
+    Return the Logprobs of a response choice, or None if it has none.
+
+    Works for normalized responses and for the SDK responses of OpenAI and Groq.
+    """
+    data = getattr(choice, "logprobs", None)
+    if data is None or isinstance(data, Logprobs):
+        return data
+    return Logprobs.from_openai(data)
+
+
+def stack(items, choice: int = 0):
+    """
+    Pad the logprobs of many completions into batch arrays.
+
+    Padding positions have logprob 0, so `batch.logprobs.sum(axis=1)` is the total
+    log probability of each completion; top logprobs are padded with -inf and
+    tokens with "".
+
+    Example:
+        batch = stack(responses)
+        scores = batch.logprobs.sum(axis=1) / batch.lengths
+
+    Args:
+        items (list): Chat completion responses, or Logprobs.
+        choice (int): The choice of each response to use.
+
+    Returns:
+        LogprobsBatch
+
+    Raises:
+        ValueError: If a response has no logprobs.
+    """
+    rows = []
+    for item in items:
+        if not isinstance(item, Logprobs):
+            logprobs = from_choice(item.choices[choice])
+            if logprobs is None:
+                raise ValueError(
+                    "A response has no logprobs. Request them with logprobs=True."
+                )
+            item = logprobs
+        rows.append(item)
+
+    lengths = np.array([len(row) for row in rows], dtype=np.int64)
+    length = int(lengths.max()) if rows else 0
+    width = max((row.top_logprobs.shape[1] for row in rows), default=0)
+
+    tokens = np.full((len(rows), length), "", dtype=object)
+    logprobs = np.zeros((len(rows), length), dtype=np.float32)
+    top_tokens = np.full((len(rows), length, width), "", dtype=object)
+    top_logprobs = np.full((len(rows), length, width), -np.inf, dtype=np.float32)
+    for i, row in enumerate(rows):
+        n, k = row.top_logprobs.shape
+        tokens[i, :n] = row.tokens
+        logprobs[i, :n] = row.logprobs
+        top_tokens[i, :n, :k] = row.top_tokens
+        top_logprobs[i, :n, :k] = row.top_logprobs
+    return LogprobsBatch(
+        tokens.astype(np.str_),
+        logprobs,
+        top_tokens.astype(np.str_),
+        top_logprobs,
+        lengths,
+    )
@@ -0,0 +1,221 @@
+"""Map-reduce over long documents: chunk, process chunks concurrently, combine the results."""
+
+import collections
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_CHUNK_TOKENS = 2000
+DEFAULT_REDUCE_TOKENS = 6000
+DEFAULT_MAX_WORKERS = 8
+
+DEFAULT_MAP_PROMPT = (
+    "Summarize the following part of a document. Keep all facts, names and numbers.\n\n"
+    "{chunk}"
+)
+DEFAULT_REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of a document. "
+    "Combine them into a single summary.\n\n{results}"
+)
+
+# Separators tried in order when a piece of text is larger than the chunk budget.
+_SEPARATORS = (
+    re.compile(r"(?<=\n\n)"),
+    re.compile(r"(?<=\n)"),
+    re.compile(r"(?<=[.!?] )"),
+    re.compile(r"(?<= )"),
+)
+
+# A completed step. stage is "map" or "reduce"; map results have level 0 and are
+# indexed by chunk, reduce results are indexed within their level. The last result
+# of a run has final set to True.
+PartialResult = collections.namedtuple(
+    "PartialResult", ["stage", "level", "index", "text", "final"]
+)
+
+
+def default_token_counter():
+    """
+    Return a function that counts the tokens of a text.
+
+    tiktoken's cl100k_base encoding is used when installed; otherwise tokens are
+    estimated as one per four characters.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda text: (len(text) + 3) // 4
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def chunk_text(text: str, max_tokens: int, count_tokens=None):
+    """
+    Split text into consecutive chunks of at most max_tokens tokens.
+
+    Splits prefer paragraph breaks, then line breaks, sentence ends and spaces, so
+    chunks end at natural boundaries. Joining the chunks gives back the text.
+    """
+    count_tokens = count_tokens or default_token_counter()
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in _split(text, max_tokens, count_tokens, 0):
+        tokens = count_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _split(text, max_tokens, count_tokens, depth):
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    if depth == len(_SEPARATORS):
+        # No natural boundary is left; cut by characters.
+        size = max(1, len(text) * max_tokens // count_tokens(text))
+        return [text[i : i + size] for i in range(0, len(text), size)]
+    pieces = []
+    for part in _SEPARATORS[depth].split(text):
+        if part:
+            pieces.extend(_split(part, max_tokens, count_tokens, depth + 1))
+    return pieces
+
+
+class MapReduce:
+    """
+    Processes documents of any length with a map prompt per chunk and reduce prompts
+    that combine the results.
+
+    The document is split into chunks by token budget and the map prompt runs over
+    all chunks concurrently. The results are then combined in groups that fit the
+    reduce budget, level by level, until one result is left. A document that fits in
+    one chunk is answered by the map prompt alone. Requests go through the client, so
+    its scheduler, rate limiter and cache apply.
+
+    Example:
+        summarize = MapReduce(client, "openai:gpt-4o-mini", max_workers=16)
+        for partial in summarize.stream(document):
+            print(partial.stage, partial.index, partial.text[:80])
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        map_prompt: str = DEFAULT_MAP_PROMPT,
+        reduce_prompt: str = DEFAULT_REDUCE_PROMPT,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        reduce_tokens: int = DEFAULT_REDUCE_TOKENS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        count_tokens=None,
+        **kwargs,
+    ):
+        """
+        Args:
+            client (Client): The client requests are sent through.
+            model (str): The 'provider:model' used for every step.
+            map_prompt (str): Template for each chunk, with a {chunk} placeholder.
+            reduce_prompt (str): Template for each group of results, with a {results}
+                placeholder. The results are separated by blank lines.
+                Placeholders are replaced as plain text, not with str.format, so
+                templates may contain other braces, e.g. JSON examples.
+            chunk_tokens (int): Maximum tokens per chunk.
+            reduce_tokens (int): Maximum tokens of the results combined in one reduce step.
+            max_workers (int): Maximum requests in flight.
+            count_tokens (callable): Counts the tokens of a text. See default_token_counter.
+            kwargs (dict): Extra arguments for every request, e.g. temperature or priority.
+        """
+        self.client = client
+        self.model = model
+        self.map_prompt = map_prompt
+        self.reduce_prompt = reduce_prompt
+        self.chunk_tokens = chunk_tokens
+        self.reduce_tokens = reduce_tokens
+        self.max_workers = max_workers
+        self.count_tokens = count_tokens or default_token_counter()
+        self.kwargs = kwargs
+
+    def run(self, text: str) -> str:
+        """Process the document and return the final result."""
+        for partial in self.stream(text):
+            if partial.final:
+                return partial.text
+
+    def stream(self, text: str):
+        """Process the document, yielding each PartialResult as soon as it completes."""
+        chunks = chunk_text(text, self.chunk_tokens, self.count_tokens)
+        if not chunks:
+            raise ValueError("The document is empty.")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = yield from self._run_level(
+                pool,
+                "map",
+                0,
+                [self.map_prompt.replace("{chunk}", chunk) for chunk in chunks],
+                final=len(chunks) == 1,
+            )
+            if len(results) == 1:
+                return
+            level = 1
+            while True:
+                groups = self._group(results)
+                results = yield from self._run_level(
+                    pool,
+                    "reduce",
+                    level,
+                    [
+                        self.reduce_prompt.replace("{results}", "\n\n".join(group))
+                        for group in groups
+                    ],
+                    final=len(groups) == 1,
+                )
+                if len(results) == 1:
+                    return
+                level += 1
+
+    def _run_level(self, pool, stage, level, prompts, final):
+        futures = {
+            pool.submit(self._complete, prompt): index
+            for index, prompt in enumerate(prompts)
+        }
+        results = [None] * len(prompts)
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                yield PartialResult(stage, level, index, results[index], final)
+        finally:
+            for future in futures:
+                future.cancel()
+        return results
+
+    def _complete(self, prompt):
+        response = self.client.chat.completions.create(
+            self.model, [{"role": "user", "content": prompt}], **self.kwargs
+        )
+        return response.choices[0].message.content or ""
+
+    def _group(self, results):
+        """Group consecutive results into reduce steps that fit the reduce budget.
+
+        Groups hold at least two results (unless there is only one), so every level
+        has fewer results than the one before."""
+        groups = []
+        current = []
+        current_tokens = 0
+        for result in results:
+            tokens = self.count_tokens(result)
+            if len(current) >= 2 and current_tokens + tokens > self.reduce_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(result)
+            current_tokens += tokens
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        elif current:
+            groups.append(current)
+        return groups
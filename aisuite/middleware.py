@@ -0,0 +1,144 @@
+"""Middleware chains around chat completion calls.
+
+A middleware is a callable `middleware(request, call_next)` that returns the response.
+It can inspect or change the request before passing it on with `call_next(request)`,
+change the response that comes back, or return a response of its own without calling
+`call_next` at all. Middlewares may also be coroutine functions, which await
+`call_next(request)`; they work with both `create` and `acreate`.
+
+Example:
+    def log_latency(request, call_next):
+        start = time.perf_counter()
+        response = call_next(request)
+        logger.info("%s took %.2fs", request.model, time.perf_counter() - start)
+        return response
+
+    client = Client(middlewares=[log_latency])
+"""
+
+import asyncio
+import inspect
+
+
+class Request:
+    """
+    A chat completion call as seen by middlewares.
+
+    Attributes:
+        model (str): The 'provider:model' string.
+        messages (list): The messages of the call.
+        kwargs (dict): Arguments passed on to the provider, e.g. temperature.
+        options (dict): Arguments handled by the client: consensus, priority,
+            queue_timeout and hedge.
+    """
+
+    __slots__ = ("model", "messages", "kwargs", "options", "provider")
+
+    def __init__(self, model, messages, kwargs, options, provider=None):
+        self.model = model
+        self.messages = messages
+        self.kwargs = kwargs
+        self.options = options
+        # The resolved provider instance, set by the client for the parsed model.
+        self.provider = provider
+
+    @property
+    def provider_key(self):
+        return self.model.split(":", 1)[0]
+
+    @property
+    def model_name(self):
+        return self.model.split(":", 1)[1]
+
+    def replace(self, **changes):
+        """Return a copy of the request with the given attributes changed."""
+        request = Request(
+            changes.pop("model", self.model),
+            changes.pop("messages", self.messages),
+            changes.pop("kwargs", self.kwargs),
+            changes.pop("options", self.options),
+            self.provider,
+        )
+        if changes:
+            raise TypeError(f"Unknown request attributes: {sorted(changes)}")
+        if request.model != self.model:
+            request.provider = None
+        return request
+
+    def __repr__(self):
+        return f"Request(model={self.model!r}, messages={len(self.messages)}, kwargs={self.kwargs!r})"
+
+
+def is_async(middleware):
+    return inspect.iscoroutinefunction(middleware) or inspect.iscoroutinefunction(
+        getattr(middleware, "__call__", None)
+    )
+
+
+def compile_chain(middlewares, handler):
+    """
+    Compose middlewares around a blocking handler into one callable, first middleware
+    outermost. Without middlewares the handler itself is returned.
+
+    Coroutine middlewares run in an event loop of their own for the call, and the
+    rest of the chain runs in a worker thread while they await it.
+    """
+    chain = handler
+    for middleware in reversed(middlewares):
+        chain = (
+            _run_async(middleware, chain)
+            if is_async(middleware)
+            else _bind(middleware, chain)
+        )
+    return chain
+
+
+def compile_async_chain(middlewares, handler):
+    """
+    Compose middlewares around a blocking handler into one coroutine function. The
+    handler runs in the default executor.
+
+    From the first blocking middleware inward, the rest of the chain runs as a
+    blocking chain (see compile_chain) in one executor thread. A call never holds an
+    executor thread while it waits for another one, so any number of concurrent
+    calls complete however small the executor is.
+    """
+
+    async def run_handler(request):
+        return await asyncio.get_running_loop().run_in_executor(None, handler, request)
+
+    chain = run_handler
+    for i in reversed(range(len(middlewares))):
+        if is_async(middlewares[i]):
+            chain = _bind(middlewares[i], chain)
+        else:
+            chain = _run_in_executor(compile_chain(middlewares[i:], handler))
+    return chain
+
+
+def _bind(middleware, call_next):
+    def step(request):
+        return middleware(request, call_next)
+
+    return step
+
+
+def _run_async(middleware, call_next):
+    async def call_next_in_thread(request):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, call_next, request
+        )
+
+    def step(request):
+        return asyncio.run(middleware(request, call_next_in_thread))
+
+    return step
+
+
+def _run_in_executor(blocking_chain):
+    async def step(request):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, blocking_chain, request
+        )
+
+    return step
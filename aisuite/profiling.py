@@ -0,0 +1,289 @@
+"""Profiles of chat completion calls that spend too long on the client side.
+
+Client-side time is the CPU time of the calling thread: converting messages,
+building SDK clients, encoding and decoding bodies. Time spent waiting for the
+provider is not counted, so a slow model does not trigger a profile; a call that
+spends seconds converting a long history does.
+"""
+
+import collections
+import cProfile
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+DEFAULT_THRESHOLD = 1.0
+DEFAULT_MAX_FILES = 100
+DEFAULT_INTERVAL = 0.005
+
+# Environment variables that enable profiling for every Client.
+THRESHOLD_ENV = "AISUITE_PROFILE_SLOW_CALLS"
+DIRECTORY_ENV = "AISUITE_PROFILE_DIR"
+
+
+class _Call:
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.start = time.monotonic()
+        self.stacks = collections.Counter()
+        # The thread's CPU clock, where the platform has one (not on Windows and macOS).
+        try:
+            self.clock = time.pthread_getcpuclockid(thread_id)
+            self.start_cpu = time.clock_gettime(self.clock)
+        except (AttributeError, OSError):
+            self.clock = None
+
+    def cpu_time(self, now):
+        """Return the CPU time used so far, or the wall time without a CPU clock."""
+        if self.clock is None:
+            return now - self.start
+        try:
+            return time.clock_gettime(self.clock) - self.start_cpu
+        except OSError:  # The thread has just exited.
+            return 0.0
+
+
+class SlowCallProfiler:
+    """
+    Writes a profile of every chat completion call whose client-side CPU time exceeds
+    a threshold, together with the call's metadata, to a directory that keeps the
+    most recent max_files profiles.
+
+    In "sampling" mode (the default) a background thread samples the stack of calls
+    that have used more than half the threshold in CPU time, so fast calls and calls
+    waiting for the provider are not sampled. On platforms without per-thread CPU
+    clocks (Windows, macOS) calls are sampled after half the threshold in wall time.
+    Profiles are written in the collapsed stack format read by flamegraph.pl and
+    speedscope. In "deterministic" mode calls run under cProfile, which is exact but
+    slows them down; profiles are pstats files. From Python 3.12 only one cProfile
+    can be active in a process, so one call is profiled at a time, and calls that
+    start meanwhile, or while another profiling tool is active, are not profiled.
+    Profiling never fails a call.
+
+    Message content, and request arguments other than numbers and booleans, are not
+    written unless include_content is set.
+
+    Profiling can also be enabled for every Client with environment variables:
+        AISUITE_PROFILE_SLOW_CALLS=0.5 AISUITE_PROFILE_DIR=/var/tmp/aisuite python app.py
+
+    Example:
+        client = Client(profiler=SlowCallProfiler(threshold=0.5, directory="profiles"))
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        directory: str = None,
+        max_files: int = DEFAULT_MAX_FILES,
+        mode: str = "sampling",
+        interval: float = DEFAULT_INTERVAL,
+        include_content: bool = False,
+    ):
+        """
+        Args:
+            threshold (float): Client-side CPU seconds above which a call is profiled.
+            directory (str): Where profiles are written. Defaults to an
+                "aisuite-profiles" directory in the system's temporary directory.
+            max_files (int): Number of profiles kept; the oldest are deleted.
+            mode (str): "sampling" or "deterministic".
+            interval (float): Seconds between stack samples in sampling mode.
+            include_content (bool): Write the messages of profiled calls.
+        """
+        if mode not in ("sampling", "deterministic"):
+            raise ValueError(f"Unknown profiling mode '{mode}'.")
+        self.threshold = threshold
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "aisuite-profiles"
+        )
+        self.max_files = max_files
+        self.mode = mode
+        self.interval = interval
+        self.include_content = include_content
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sampler = None
+        self._profile_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Return a profiler configured by the environment, or None if it is not enabled."""
+        threshold = os.getenv(THRESHOLD_ENV)
+        if not threshold:
+            return None
+        return cls(threshold=float(threshold), directory=os.getenv(DIRECTORY_ENV))
+
+    def __call__(self, request, call_next):
+        """Profile a call; used as the outermost middleware of a Client."""
+        start_cpu = time.thread_time()
+        start = time.monotonic()
+        profile = call = None
+        if self.mode == "deterministic":
+            profile = self._start_profile()
+        else:
+            call = self._start_sampling()
+        error = None
+        try:
+            return call_next(request)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profile_lock.release()
+            elif call is not None:
+                self._stop_sampling(call)
+            cpu = time.thread_time() - start_cpu
+            recorded = profile if profile is not None else call
+            if cpu >= self.threshold and recorded is not None:
+                try:
+                    self._write(request, recorded, cpu, time.monotonic() - start, error)
+                except OSError:  # A full or read-only disk must not fail the call.
+                    pass
+
+    def _start_profile(self):
+        """Return an enabled cProfile.Profile, or None if one cannot be enabled now."""
+        if not self._profile_lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Another profiling tool is already active.
+            self._profile_lock.release()
+            return None
+        return profile
+
+    def _start_sampling(self):
+        call = _Call(threading.get_ident())
+        with self._lock:
+            self._calls[id(call)] = call
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(
+                    target=self._sample, name="aisuite-profiler", daemon=True
+                )
+                self._sampler.start()
+            self._wake.set()
+        return call
+
+    def _stop_sampling(self, call):
+        with self._lock:
+            self._calls.pop(id(call), None)
+
+    def _sample(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._calls:
+                    self._wake.clear()
+                    continue
+                calls = list(self._calls.values())
+            now = time.monotonic()
+            half = self.threshold / 2
+            # Calls that are on their way to crossing the threshold.
+            sampled = []
+            # CPU time grows no faster than wall time, so no other call can reach
+            # half the threshold before this many seconds have passed.
+            wait = half
+            for call in calls:
+                remaining = half - call.cpu_time(now)
+                if remaining <= 0:
+                    sampled.append(call)
+                else:
+                    wait = min(wait, remaining)
+            if sampled:
+                frames = sys._current_frames()
+                for call in sampled:
+                    frame = frames.get(call.thread_id)
+                    if frame is not None:
+                        call.stacks[_collapse(frame)] += 1
+                wait = self.interval
+            # Calls started meanwhile have at least half the threshold to go as well.
+            time.sleep(max(wait, self.interval))
+
+    def _write(self, request, profile, cpu, duration, error):
+        os.makedirs(self.directory, exist_ok=True)
+        name = "{}-{}-{}".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            re.sub(r"[^\w.-]+", "_", request.model),
+            uuid.uuid4().hex[:8],
+        )
+        base = os.path.join(self.directory, name)
+        if isinstance(profile, cProfile.Profile):
+            profile.dump_stats(base + ".prof")
+        else:
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in profile.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(self._metadata(request, cpu, duration, error), f, default=repr)
+        self._rotate()
+
+    def _metadata(self, request, cpu, duration, error):
+        messages = request.messages
+        metadata = {
+            "model": request.model,
+            "cpu_seconds": cpu,
+            "wall_seconds": duration,
+            "error": type(error).__name__ if error is not None else None,
+            "mode": self.mode,
+            "kwargs": (
+                request.kwargs
+                if self.include_content
+                else {
+                    key: (
+                        value
+                        if value is None or isinstance(value, (bool, int, float))
+                        else f"<{type(value).__name__}>"
+                    )
+                    for key, value in request.kwargs.items()
+                }
+            ),
+            "message_count": len(messages),
+            "message_chars": sum(
+                len(content) if isinstance(content, str) else 0
+                for content in (message.get("content") for message in messages)
+            ),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        if self.include_content:
+            metadata["messages"] = messages
+        return metadata
+
+    def _rotate(self):
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+        profiles = []
+        for path in paths:
+            try:
+                profiles.append((os.path.getmtime(path), path))
+            except FileNotFoundError:  # Deleted by another process meanwhile.
+                pass
+        profiles.sort()
+        for _, path in profiles[: max(0, len(profiles) - self.max_files)]:
+            stem = path[: -len(".json")]
+            for suffix in (".json", ".folded", ".prof"):
+                try:
+                    os.remove(stem + suffix)
+                except FileNotFoundError:
+                    pass
+
+
+def _collapse(frame):
+    """Return a stack as "outer;...;inner" frames of "module:function:line"."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        names.append(f"{module}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
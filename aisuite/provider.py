@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
+import hashlib
 import importlib
+import json
 import os
 import functools
+import threading
 
 
 class LLMError(Exception):
@@ -12,18 +15,140 @@ class LLMError(Exception):
         super().__init__(message)
 
 
+# Error codes that AWS services use for throttled requests.
+_THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+}
+
+
+def is_rate_limit_error(error):
+    """
+    Return True if the error (or an error it was raised from) is a 429 / throttling error.
+
+    Providers surface throttling in different ways: SDK exceptions with a status_code,
+    httpx and urllib errors wrapped in an LLMError, or botocore ClientErrors with an
+    error code. The cause/context chain is followed so wrapped errors are recognized.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        response = getattr(error, "response", None)
+        if status is None and response is not None:
+            status = getattr(response, "status_code", None)
+        if status == 429:
+            return True
+        if isinstance(response, dict):
+            if response.get("Error", {}).get("Code") in _THROTTLING_ERROR_CODES:
+                return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def is_provider_error(error):
+    """
+    Return True if the error comes from the provider call itself rather than from the
+    caller: errors reported by the provider's API, rate limits, timeouts and connection
+    failures. Configuration and programming errors, such as an unknown provider, a
+    missing API key or a bad argument, are not provider errors.
+    """
+    if isinstance(error, (LLMError, TimeoutError, ConnectionError)):
+        return True
+    if is_rate_limit_error(error):
+        return True
+    error_type = type(error)
+    if error_type.__module__.split(".")[0] in ("httpx", "httpcore"):
+        return True
+    if "Timeout" in error_type.__name__ or "Connection" in error_type.__name__:
+        return True
+    # SDK errors of a sent request carry the request (OpenAI, Anthropic, Groq), the
+    # response (Mistral, botocore) or its status code.
+    for name in ("request", "response", "status_code"):
+        try:
+            if getattr(error, name, None) is not None:
+                return True
+        except RuntimeError:  # httpx errors raise when the request is not set.
+            continue
+    return False
+
+
+def usage_dict(prompt_tokens, completion_tokens):
+    """Return token usage in OpenAI's format, or None when the provider reported none."""
+    if prompt_tokens is None and completion_tokens is None:
+        return None
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": (prompt_tokens or 0) + (completion_tokens or 0),
+    }
+
+
+def usage_from(usage):
+    """Return the usage of an OpenAI style response (an SDK object or a dict) as a dict."""
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage_dict(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+    return usage_dict(
+        getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+    )
+
+
+def _single_delta(response):
+    yield response.choices[0].message.content or ""
+    return usage_from(getattr(response, "usage", None))
+
+
 class Provider(ABC):
+    # Whether the provider's API accepts `n` and returns n choices in one response.
+    SUPPORTS_N = False
+
+    # Longest image side, in pixels, that the provider accepts. Used by ImagePreprocessor.
+    IMAGE_MAX_DIMENSION = None
+
+    # Number of texts sent per embeddings request, unless the caller overrides it.
+    EMBEDDINGS_BATCH_SIZE = 64
+
     @abstractmethod
     def chat_completions_create(self, model, messages):
         """Abstract method for chat completion calls, to be implemented by each provider."""
         pass
 
+    def chat_completions_stream(self, model, messages, **kwargs):
+        """
+        Return an iterator over the text deltas of a chat completion.
+
+        Providers with a streaming API override this. They send the request before
+        returning, so errors such as rate limits are raised by the call itself. By
+        default the whole completion is requested and returned as a single delta.
+
+        The iterator returns the token usage (see usage_dict) when it is exhausted,
+        if the provider reports it.
+        """
+        response = self.chat_completions_create(model, messages, **kwargs)
+        return _single_delta(response)
+
+    def warmup(self, model, **kwargs):
+        """Prepare the provider for requests to the model. Providers override this to
+        open connections or preload models; by default there is nothing to do."""
+        pass
+
+    def embeddings_batch_size(self, model):
+        """Return the preferred number of texts per embeddings request for the model."""
+        return self.EMBEDDINGS_BATCH_SIZE
+
 
 class ProviderFactory:
     """Factory to dynamically load provider instances based on naming conventions."""
 
     PROVIDERS_DIR = Path(__file__).parent / "providers"
 
+    # Process-wide provider instances, keyed by provider key and config fingerprint.
+    _shared_providers = {}
+    _shared_lock = threading.Lock()
+
     @classmethod
     def create_provider(cls, provider_key, config):
         """Dynamically load and create an instance of a provider based on the naming convention."""
@@ -43,11 +168,59 @@ class ProviderFactory:
 
         # Instantiate the provider class
         provider_class = getattr(module, provider_class_name)
+
+        # A config with a "pool" creates one provider per listed credential, deployment
+        # or region; the remaining keys are shared by all members.
+        if "pool" in config:
+            from .provider_pool import ProviderPool
+
+            return ProviderPool.from_config(provider_class, config)
+
         return provider_class(**config)
 
+    @classmethod
+    def get_shared_provider(cls, provider_key, config):
+        """
+        Return a process-wide provider instance for the provider key and config.
+
+        Clients created with equal configs share one provider, and with it the provider's
+        SDK client and connection pool. The instances are dropped in a child process
+        after os.fork(), so each worker of a pre-fork server creates its own.
+        """
+        key = (provider_key, _config_fingerprint(config))
+        with cls._shared_lock:
+            provider = cls._shared_providers.get(key)
+            if provider is None:
+                # Providers may modify their config, so they get a copy.
+                provider = cls.create_provider(provider_key, dict(config))
+                cls._shared_providers[key] = provider
+        return provider
+
+    @classmethod
+    def clear_shared_providers(cls):
+        """Drop all process-wide provider instances."""
+        cls._shared_lock = threading.Lock()
+        cls._shared_providers = {}
+
     @classmethod
     @functools.cache
     def get_supported_providers(cls):
         """List all supported provider names based on files present in the providers directory."""
         provider_files = Path(cls.PROVIDERS_DIR).glob("*_provider.py")
         return {file.stem.replace("_provider", "") for file in provider_files}
+
+
+def _config_fingerprint(config):
+    """Hash a provider config. Values that are not JSON serializable (e.g. transports)
+    are identified by object identity."""
+    encoded = json.dumps(
+        config,
+        sort_keys=True,
+        default=lambda value: f"<{type(value).__name__}:{id(value)}>",
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# Connection pools and SDK clients must not be shared across a fork.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=ProviderFactory.clear_shared_providers)
@@ -0,0 +1,150 @@
+"""Spread calls for one provider across several credentials, deployments or regions."""
+
+import random
+import threading
+import time
+
+from .provider import Provider, is_rate_limit_error
+
+# How long a member that returned a throttling error is avoided, in seconds.
+DEFAULT_COOLDOWN = 5.0
+
+STRATEGIES = ("least_outstanding", "weighted")
+
+# Provider class attributes the client reads, copied from the members to the pool.
+_CAPABILITIES = ("SUPPORTS_N", "IMAGE_MAX_DIMENSION", "EMBEDDINGS_BATCH_SIZE")
+
+
+class _Member:
+    def __init__(self, provider, weight):
+        self.provider = provider
+        self.weight = weight
+        self.outstanding = 0
+        self.cooldown_until = 0.0
+
+
+class ProviderPool(Provider):
+    """
+    A provider made of several instances of the same provider class.
+
+    Each member is a fully configured provider with its own SDK or HTTP client, so
+    connection pools are not shared between keys. Calls go to the member chosen by
+    the strategy; when a member is throttled (HTTP 429 or a Bedrock ThrottlingException)
+    the call spills over to the next member, and the throttled member is avoided for
+    a cooldown period.
+
+    Configure a pool by listing the members under "pool" in the provider config:
+
+        {
+            "azure": {
+                "pool": [
+                    {"base_url": "https://east.models.ai.azure.com", "api_key": "..."},
+                    {"base_url": "https://west.models.ai.azure.com", "api_key": "...", "weight": 2},
+                ],
+                "strategy": "least_outstanding",  # or "weighted"
+                "timeout": 60,  # keys outside "pool" are shared by every member
+            }
+        }
+    """
+
+    def __init__(
+        self, members, strategy="least_outstanding", cooldown=DEFAULT_COOLDOWN
+    ):
+        """
+        Args:
+            members (list): (provider, weight) pairs. Weights must be positive.
+            strategy (str): "least_outstanding" sends each call to the member with the
+                fewest calls in flight; "weighted" picks members at random in proportion
+                to their weight.
+            cooldown (float): Seconds to avoid a member after it was throttled.
+        """
+        if not members:
+            raise ValueError("A provider pool needs at least one member.")
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Invalid pool strategy '{strategy}'. Supported strategies: {STRATEGIES}."
+            )
+        for _, weight in members:
+            if not weight > 0:
+                raise ValueError(f"Pool member weights must be positive, got {weight}.")
+
+        self.members = [_Member(provider, weight) for provider, weight in members]
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+        first = self.members[0].provider
+        for name in _CAPABILITIES:
+            setattr(self, name, getattr(first, name, getattr(Provider, name)))
+
+    @classmethod
+    def from_config(cls, provider_class, config):
+        """Create a pool from a provider config with a "pool" list."""
+        config = dict(config)
+        member_configs = config.pop("pool")
+        strategy = config.pop("strategy", "least_outstanding")
+        cooldown = config.pop("cooldown", DEFAULT_COOLDOWN)
+
+        members = []
+        for member_config in member_configs:
+            member_config = {**config, **member_config}
+            weight = member_config.pop("weight", 1)
+            members.append((provider_class(**member_config), weight))
+        return cls(members, strategy=strategy, cooldown=cooldown)
+
+    def chat_completions_create(self, model, messages, **kwargs):
+        return self._call("chat_completions_create", model, messages, **kwargs)
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        return self._call("chat_completions_stream", model, messages, **kwargs)
+
+    def embeddings_create(self, model, input, **kwargs):
+        if not hasattr(self.members[0].provider, "embeddings_create"):
+            raise ValueError(
+                f"{type(self.members[0].provider).__name__} does not support embeddings."
+            )
+        return self._call("embeddings_create", model, input, **kwargs)
+
+    def embeddings_batch_size(self, model):
+        return self.members[0].provider.embeddings_batch_size(model)
+
+    def warmup(self, model, **kwargs):
+        for member in self.members:
+            if hasattr(member.provider, "warmup"):
+                member.provider.warmup(model, **kwargs)
+
+    def _call(self, method, *args, **kwargs):
+        tried = set()
+        while True:
+            member = self._acquire(tried)
+            try:
+                return getattr(member.provider, method)(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                with self._lock:
+                    member.cooldown_until = time.monotonic() + self.cooldown
+                tried.add(id(member))
+                if len(tried) == len(self.members):
+                    raise
+            finally:
+                with self._lock:
+                    member.outstanding -= 1
+
+    def _acquire(self, tried):
+        """Choose a member that has not been tried for this call and count the call against it."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [m for m in self.members if id(m) not in tried]
+            # Prefer members that are not cooling down after a throttling error.
+            available = [m for m in candidates if m.cooldown_until <= now] or candidates
+
+            if self.strategy == "weighted":
+                member = random.choices(
+                    available, weights=[m.weight for m in available]
+                )[0]
+            else:
+                member = min(available, key=lambda m: m.outstanding / m.weight)
+
+            member.outstanding += 1
+            return member
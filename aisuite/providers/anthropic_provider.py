@@ -1,21 +1,51 @@
+import json
+
 import anthropic
-from aisuite.provider import Provider
-from aisuite.framework import ChatCompletionResponse
+import httpx
+from aisuite.provider import Provider, usage_dict
+from aisuite.framework import ChatCompletionResponse, ToolCall
+from aisuite import images, tools
 
 # Define a constant for the default max_tokens value
 DEFAULT_MAX_TOKENS = 4096
 
 
 class AnthropicProvider(Provider):
+    IMAGE_MAX_DIMENSION = 1568
+
     def __init__(self, **config):
         """
         Initialize the Anthropic provider with the given configuration.
         Pass the entire configuration dictionary to the Anthropic client constructor.
         """
 
+        # Route the SDK's requests through a custom httpx transport, e.g. to record or replay them.
+        transport = config.pop("transport", None)
+        if transport is not None:
+            config["http_client"] = httpx.Client(transport=transport)
+
         self.client = anthropic.Anthropic(**config)
 
     def chat_completions_create(self, model, messages, **kwargs):
+        system_message, messages, kwargs = self._prepare_request(messages, kwargs)
+        return self.normalize_response(
+            self.client.messages.create(
+                model=model, system=system_message, messages=messages, **kwargs
+            )
+        )
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        system_message, messages, kwargs = self._prepare_request(messages, kwargs)
+        stream = self.client.messages.create(
+            model=model,
+            system=system_message,
+            messages=messages,
+            stream=True,
+            **kwargs,
+        )
+        return self._iter_deltas(stream)
+
+    def _prepare_request(self, messages, kwargs):
         # Check if the fist message is a system message
         if messages[0]["role"] == "system":
             system_message = messages[0]["content"]
@@ -23,18 +53,119 @@ class AnthropicProvider(Provider):
         else:
             system_message = []
 
+        if images.has_image_parts(messages):
+            messages = [
+                {**message, "content": images.to_anthropic_content(message["content"])}
+                for message in messages
+            ]
+        messages = self._convert_tool_messages(messages)
+
+        if "tools" in kwargs:
+            kwargs["tools"] = [
+                {
+                    "name": function["name"],
+                    "description": function.get("description", ""),
+                    "input_schema": function.get("parameters")
+                    or {"type": "object", "properties": {}},
+                }
+                for function in map(tools.function_of, kwargs["tools"])
+            ]
+        if "tool_choice" in kwargs:
+            kwargs["tool_choice"] = self._convert_tool_choice(kwargs["tool_choice"])
+
         # kwargs.setdefault('max_tokens', DEFAULT_MAX_TOKENS)
         if "max_tokens" not in kwargs:
             kwargs["max_tokens"] = DEFAULT_MAX_TOKENS
+        return system_message, messages, kwargs
 
-        return self.normalize_response(
-            self.client.messages.create(
-                model=model, system=system_message, messages=messages, **kwargs
-            )
-        )
+    def _convert_tool_messages(self, messages):
+        """
+        Translate OpenAI style tool calls and results into tool_use and tool_result
+        blocks. Consecutive tool results are sent together in one user message.
+        """
+        if not any(
+            message["role"] == "tool" or message.get("tool_calls")
+            for message in messages
+        ):
+            return messages
+        converted = []
+        results = None
+        for message in messages:
+            if message["role"] == "tool":
+                if results is None:
+                    results = {"role": "user", "content": []}
+                    converted.append(results)
+                results["content"].append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": message["tool_call_id"],
+                        "content": message.get("content") or "",
+                    }
+                )
+                continue
+            results = None
+            if message.get("tool_calls"):
+                content = message.get("content") or []
+                if isinstance(content, str):
+                    content = [{"type": "text", "text": content}] if content else []
+                message = {
+                    "role": "assistant",
+                    "content": content
+                    + [
+                        {
+                            "type": "tool_use",
+                            "id": tool_call["id"],
+                            "name": tool_call["function"]["name"],
+                            "input": tools.parse_arguments(
+                                tool_call["function"].get("arguments")
+                            ),
+                        }
+                        for tool_call in message["tool_calls"]
+                    ],
+                }
+            converted.append(message)
+        return converted
+
+    def _convert_tool_choice(self, tool_choice):
+        if tool_choice == "auto":
+            return {"type": "auto"}
+        if tool_choice == "required":
+            return {"type": "any"}
+        if isinstance(tool_choice, dict) and "function" in tool_choice:
+            return {"type": "tool", "name": tool_choice["function"]["name"]}
+        return tool_choice
+
+    def _iter_deltas(self, stream):
+        # Input tokens are reported when the message starts, output tokens at its end.
+        input_tokens = output_tokens = None
+        with stream:
+            for event in stream:
+                if (
+                    event.type == "content_block_delta"
+                    and event.delta.type == "text_delta"
+                ):
+                    yield event.delta.text
+                elif event.type == "message_start":
+                    input_tokens = event.message.usage.input_tokens
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+        return usage_dict(input_tokens, output_tokens)
 
     def normalize_response(self, response):
         """Normalize the response from the Anthropic API to match OpenAI's response format."""
         normalized_response = ChatCompletionResponse()
-        normalized_response.choices[0].message.content = response.content[0].text
+        message = normalized_response.choices[0].message
+        texts = []
+        tool_calls = []
+        for block in response.content:
+            if block.type == "tool_use":
+                tool_calls.append(
+                    ToolCall(block.id, block.name, json.dumps(block.input))
+                )
+            elif block.type == "text":
+                texts.append(block.text)
+        message.content = "".join(texts) if texts else None
+        if tool_calls:
+            message.tool_calls = tool_calls
+            normalized_response.choices[0].finish_reason = "tool_calls"
         return normalized_response
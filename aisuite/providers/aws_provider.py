@@ -1,11 +1,19 @@
+import json
 import os
 
 import boto3
+from botocore.config import Config
 from aisuite.provider import Provider, LLMError
-from aisuite.framework import ChatCompletionResponse
+from aisuite.framework import ChatCompletionResponse, ToolCall
+from aisuite import images, tools
 
 
 class AwsProvider(Provider):
+    # Cohere embedding models accept up to 96 texts per call.
+    # Titan embedding models accept a single text per call.
+    COHERE_EMBEDDINGS_BATCH_SIZE = 96
+    IMAGE_MAX_DIMENSION = 8000
+
     def __init__(self, **config):
         """
         Initialize the AWS Bedrock provider with the given configuration.
@@ -27,7 +35,9 @@ class AwsProvider(Provider):
           ~/.aws/credentials or the "AWS_SECRET_ACCESS_KEY" and "AWS_ACCESS_KEY_ID" environment variables.
         - If the region is not set, it defaults to us-west-1, which may lead to a
           "Could not connect to the endpoint URL" error.
-        - The client constructor does not accept additional parameters.
+        - The client constructor does not accept additional parameters, except
+          max_pool_connections, which sets the size of botocore's connection pool
+          (10 by default). Raise it when making many concurrent calls.
 
         Args:
             **config: Configuration options for the provider.
@@ -36,7 +46,12 @@ class AwsProvider(Provider):
         self.region_name = config.get(
             "region_name", os.getenv("AWS_REGION_NAME", "us-west-2")
         )
-        self.client = boto3.client("bedrock-runtime", region_name=self.region_name)
+        client_config = None
+        if config.get("max_pool_connections"):
+            client_config = Config(max_pool_connections=config["max_pool_connections"])
+        self.client = boto3.client(
+            "bedrock-runtime", region_name=self.region_name, config=client_config
+        )
         self.inference_parameters = [
             "maxTokens",
             "temperature",
@@ -47,9 +62,25 @@ class AwsProvider(Provider):
     def normalize_response(self, response):
         """Normalize the response from the Bedrock API to match OpenAI's response format."""
         norm_response = ChatCompletionResponse()
-        norm_response.choices[0].message.content = response["output"]["message"][
-            "content"
-        ][0]["text"]
+        message = norm_response.choices[0].message
+        texts = []
+        tool_calls = []
+        for block in response["output"]["message"]["content"]:
+            if "toolUse" in block:
+                tool_use = block["toolUse"]
+                tool_calls.append(
+                    ToolCall(
+                        tool_use["toolUseId"],
+                        tool_use["name"],
+                        json.dumps(tool_use["input"]),
+                    )
+                )
+            elif "text" in block:
+                texts.append(block["text"])
+        message.content = "".join(texts) if texts else None
+        if tool_calls:
+            message.tool_calls = tool_calls
+            norm_response.choices[0].finish_reason = "tool_calls"
         return norm_response
 
     def chat_completions_create(self, model, messages, **kwargs):
@@ -64,10 +95,43 @@ class AwsProvider(Provider):
         formatted_messages = []
         for message in messages:
             # QUIETLY Ignore any "system" messages except the first system message.
-            if message["role"] != "system":
-                formatted_messages.append(
-                    {"role": message["role"], "content": [{"text": message["content"]}]}
-                )
+            if message["role"] == "tool":
+                # Tool results are sent in user messages, consecutive ones together.
+                result = {
+                    "toolResult": {
+                        "toolUseId": message["tool_call_id"],
+                        "content": [{"text": message.get("content") or ""}],
+                    }
+                }
+                previous = formatted_messages[-1] if formatted_messages else None
+                if (
+                    previous
+                    and previous["content"]
+                    and "toolResult" in previous["content"][-1]
+                ):
+                    previous["content"].append(result)
+                else:
+                    formatted_messages.append({"role": "user", "content": [result]})
+            elif message["role"] != "system":
+                content = images.to_bedrock_content(message["content"])
+                for tool_call in message.get("tool_calls") or []:
+                    content.append(
+                        {
+                            "toolUse": {
+                                "toolUseId": tool_call["id"],
+                                "name": tool_call["function"]["name"],
+                                "input": tools.parse_arguments(
+                                    tool_call["function"].get("arguments")
+                                ),
+                            }
+                        }
+                    )
+                formatted_messages.append({"role": message["role"], "content": content})
+
+        # Tools are passed in the toolConfig, in Bedrock's format.
+        tool_config = self._tool_config(
+            kwargs.pop("tools", None), kwargs.pop("tool_choice", None)
+        )
 
         # Maintain a list of Inference Parameters which Bedrock supports.
         # These fields need to be passed using inferenceConfig.
@@ -83,11 +147,72 @@ class AwsProvider(Provider):
                 additional_model_request_fields[key] = value
 
         # Call the Bedrock Converse API.
+        request = {}
+        if tool_config is not None:
+            request["toolConfig"] = tool_config
         response = self.client.converse(
             modelId=model,  # baseModelId or provisionedModelArn
             messages=formatted_messages,
             system=system_message,
             inferenceConfig=inference_config,
             additionalModelRequestFields=additional_model_request_fields,
+            **request,
         )
         return self.normalize_response(response)
+
+    def _tool_config(self, tool_definitions, tool_choice):
+        if not tool_definitions:
+            return None
+        config = {
+            "tools": [
+                {
+                    "toolSpec": {
+                        "name": function["name"],
+                        "description": function.get("description", ""),
+                        "inputSchema": {
+                            "json": function.get("parameters")
+                            or {"type": "object", "properties": {}}
+                        },
+                    }
+                }
+                for function in map(tools.function_of, tool_definitions)
+            ]
+        }
+        if tool_choice == "auto":
+            config["toolChoice"] = {"auto": {}}
+        elif tool_choice == "required":
+            config["toolChoice"] = {"any": {}}
+        elif isinstance(tool_choice, dict) and "function" in tool_choice:
+            config["toolChoice"] = {"tool": {"name": tool_choice["function"]["name"]}}
+        return config
+
+    def embeddings_batch_size(self, model):
+        if model.startswith("cohere."):
+            return self.COHERE_EMBEDDINGS_BATCH_SIZE
+        return 1
+
+    def embeddings_create(self, model, input, **kwargs):
+        # Bedrock has no unified embeddings API, so the request body depends on the model family.
+        # https://docs.aws.amazon.com/bedrock/latest/userguide/model-parameters-embed.html
+        if model.startswith("cohere."):
+            body = {"texts": input, "input_type": "search_document", **kwargs}
+            return self._invoke_embedding_model(model, body)["embeddings"]
+
+        if model.startswith("amazon.titan-embed"):
+            return [
+                self._invoke_embedding_model(model, {"inputText": text, **kwargs})[
+                    "embedding"
+                ]
+                for text in input
+            ]
+
+        raise LLMError(f"Unsupported Bedrock embedding model: {model}")
+
+    def _invoke_embedding_model(self, model, body):
+        response = self.client.invoke_model(
+            modelId=model,
+            body=json.dumps(body),
+            contentType="application/json",
+            accept="application/json",
+        )
+        return json.loads(response["body"].read())
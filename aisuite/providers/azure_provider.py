@@ -1,9 +1,11 @@
 import urllib.request
-import json
 import os
 
 from aisuite.provider import Provider
 from aisuite.framework import ChatCompletionResponse
+from aisuite.logprobs import Logprobs
+from aisuite.utils import json_codec
+from aisuite import images, tools
 
 
 class AzureProvider(Provider):
@@ -17,6 +19,9 @@ class AzureProvider(Provider):
                 "For Azure, base_url is required. Check your deployment page for a URL like this - https://<model-deployment-name>.<region>.models.ai.azure.com"
             )
 
+        # Optionally gzip request bodies larger than this many bytes (disabled by default)
+        self.compress_threshold = config.get("compress_threshold")
+
     def chat_completions_create(self, model, messages, **kwargs):
         url = f"https://{model}.westus3.models.ai.azure.com/v1/chat/completions"
         url = f"https://{self.base_url}/chat/completions"
@@ -25,21 +30,27 @@ class AzureProvider(Provider):
 
         # Remove 'stream' from kwargs if present
         kwargs.pop("stream", None)
-        data = {"messages": messages, **kwargs}
+        data = {"messages": images.to_openai_messages(messages), **kwargs}
 
-        body = json.dumps(data).encode("utf-8")
-        headers = {"Content-Type": "application/json", "Authorization": self.api_key}
+        body, headers = json_codec.encode_request(data, self.compress_threshold)
+        headers["Authorization"] = self.api_key
 
         try:
             req = urllib.request.Request(url, body, headers)
             with urllib.request.urlopen(req) as response:
                 result = response.read()
-                resp_json = json.loads(result)
+                resp_json = json_codec.loads(result, json_codec.ChatCompletionSchema)
                 completion_response = ChatCompletionResponse()
                 # TODO: Add checks for fields being present in resp_json.
-                completion_response.choices[0].message.content = resp_json["choices"][
-                    0
-                ]["message"]["content"]
+                choice_data = resp_json["choices"][0]
+                choice = completion_response.choices[0]
+                choice.message.content = choice_data["message"].get("content")
+                choice.message.tool_calls = tools.tool_calls_from_dicts(
+                    choice_data["message"].get("tool_calls")
+                )
+                choice.finish_reason = choice_data.get("finish_reason")
+                if choice_data.get("logprobs"):
+                    choice.logprobs = Logprobs.from_openai(choice_data["logprobs"])
                 return completion_response
 
         except urllib.error.HTTPError as error:
@@ -0,0 +1,17 @@
+from aisuite.providers.openai_compatible import OpenAICompatibleProvider
+
+
+class CustomProvider(OpenAICompatibleProvider):
+    """
+    Provider for self-hosted or third-party servers with an OpenAI-compatible API,
+    such as vLLM, TGI or llama.cpp. The base_url is required:
+
+        client = Client({"custom": {"base_url": "http://gpu-01:8000/v1"}})
+        client.chat.completions.create("custom:meta-llama/Meta-Llama-3-8B-Instruct", messages)
+
+    The API key, if the server needs one, is fetched from the config or the
+    CUSTOM_API_KEY environment variable. See OpenAICompatibleProvider for all options.
+    """
+
+    NAME = "OpenAI-compatible server"
+    API_KEY_ENV = "CUSTOM_API_KEY"
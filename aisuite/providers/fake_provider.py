@@ -0,0 +1,248 @@
+"""An in-process provider that simulates a model server, for load tests and tests.
+
+No request leaves the process. Latency, generation speed, failures and content
+are set by the config, and can be overridden per model in the model string:
+
+    client = Client({"fake": {"latency": 0.2, "tokens_per_second": 50}})
+    client.chat.completions.create("fake:echo", messages)
+    client.chat.completions.create("fake:slow?latency=2&jitter=0.5&error_rate=0.01", messages)
+"""
+
+import hashlib
+import math
+import random
+import re
+import time
+from urllib.parse import parse_qsl
+
+import numpy as np
+
+from aisuite.framework import ChatCompletionResponse
+from aisuite.framework.choice import Choice
+from aisuite.provider import LLMError, Provider, usage_dict
+
+_LOREM = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua ut enim ad minim veniam quis "
+    "nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat"
+).split()
+
+# A token is a word and the whitespace before it.
+_TOKEN = re.compile(r"\s*\S+")
+
+# Options that can be set in the config and in the model string, and their types.
+_OPTIONS = {
+    "latency": float,
+    "jitter": float,
+    "tokens_per_second": float,
+    "error_rate": float,
+    "rate_limit_rate": float,
+    "content": str,
+    "completion_tokens": int,
+    "dimensions": int,
+}
+
+# Short names accepted in model strings.
+_ALIASES = {"tps": "tokens_per_second", "tokens": "completion_tokens"}
+
+
+class FakeProviderError(LLMError):
+    """A simulated failure. status_code is 429 for rate limits and 500 otherwise."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FakeProvider(Provider):
+    """
+    Provider that answers from memory after a simulated delay.
+
+    Options, set in the config or per model as a query string ("fake:name?latency=0.5"):
+        latency (float): Median seconds before the first token, 0 by default.
+        jitter (float): Spread of the latency. Latencies are log-normal with this
+            sigma, so 0 (the default) is constant and 1 gives a long tail.
+        tokens_per_second (float): Generation speed. Streams are paced by it, and
+            complete responses take as long as streaming them. Unlimited by default.
+        error_rate (float): Fraction of requests that fail with a 500 after the latency.
+        rate_limit_rate (float): Fraction of requests rejected at once with a 429.
+        content (str): The response text. By default, the "echo" model repeats the
+            last user message and other models generate completion_tokens words.
+        completion_tokens (int): Length of generated responses, 16 by default.
+            max_tokens, when passed with a request, truncates responses.
+        dimensions (int): Size of embeddings, 256 by default.
+        seed (int): Seed of the random failures and latencies.
+
+    Embeddings are unit vectors derived from a hash of each text, so equal texts get
+    equal embeddings.
+    """
+
+    SUPPORTS_N = True
+
+    def __init__(self, **config):
+        self.defaults = {
+            "latency": 0.0,
+            "jitter": 0.0,
+            "tokens_per_second": None,
+            "error_rate": 0.0,
+            "rate_limit_rate": 0.0,
+            "content": None,
+            "completion_tokens": 16,
+            "dimensions": 256,
+        }
+        self.defaults.update(_parse_options(config))
+        self._random = random.Random(config.get("seed"))
+        # Parsed model strings, so that a request does not parse its model again.
+        self._models = {}
+
+    def chat_completions_create(self, model, messages, **kwargs):
+        options = self._options(model)
+        self._fail_fast(model, options)
+        start = time.monotonic()
+        n = kwargs.get("n") or 1
+        choices = []
+        longest = 0
+        for _ in range(n):
+            tokens, finish_reason = self._generate(options, messages, kwargs)
+            longest = max(longest, len(tokens))
+            choice = Choice()
+            choice.message.content = "".join(tokens)
+            choice.finish_reason = finish_reason
+            choices.append(choice)
+
+        deadline = start + self._delay(options)
+        if options["tokens_per_second"]:
+            # Choices are generated in parallel, as by a server batching them.
+            deadline += longest / options["tokens_per_second"]
+        _sleep_until(deadline)
+        self._fail_late(model, options)
+
+        response = ChatCompletionResponse(choices)
+        response.usage = usage_dict(
+            _prompt_tokens(messages),
+            sum(len(_TOKEN.findall(choice.message.content)) for choice in choices),
+        )
+        return response
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        """
+        Stream a completion one token at a time, at tokens_per_second. Rate limits
+        are raised by the call; other failures after the first-token latency.
+        """
+        options = self._options(model)
+        self._fail_fast(model, options)
+        tokens, _ = self._generate(options, messages, kwargs)
+        delay = self._delay(options)
+        return self._iter_tokens(
+            model, options, tokens, time.monotonic() + delay, _prompt_tokens(messages)
+        )
+
+    def _iter_tokens(self, model, options, tokens, first_token_at, prompt_tokens):
+        _sleep_until(first_token_at)
+        self._fail_late(model, options)
+        tps = options["tokens_per_second"]
+        for i, token in enumerate(tokens):
+            if tps:
+                # Pace against the start, so that sleep overshoot does not add up.
+                _sleep_until(first_token_at + i / tps)
+            yield token
+        return usage_dict(prompt_tokens, len(tokens))
+
+    def embeddings_create(self, model, input, **kwargs):
+        options = self._options(model)
+        self._fail_fast(model, options)
+        _sleep_until(time.monotonic() + self._delay(options))
+        self._fail_late(model, options)
+        dimensions = kwargs.get("dimensions") or options["dimensions"]
+        embeddings = np.empty((len(input), dimensions), dtype=np.float32)
+        for i, text in enumerate(input):
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            rng = np.random.default_rng(int.from_bytes(digest, "little"))
+            vector = rng.standard_normal(dimensions)
+            embeddings[i] = vector / np.linalg.norm(vector)
+        return embeddings
+
+    def _options(self, model):
+        options = self._models.get(model)
+        if options is None:
+            name, _, query = model.partition("?")
+            options = {
+                **self.defaults,
+                **_parse_options(dict(parse_qsl(query)), strict=True),
+                "name": name,
+            }
+            self._models[model] = options
+        return options
+
+    def _delay(self, options):
+        latency = options["latency"]
+        if latency <= 0:
+            return 0.0
+        if options["jitter"] > 0:
+            return latency * math.exp(self._random.gauss(0, options["jitter"]))
+        return latency
+
+    def _fail_fast(self, model, options):
+        if (
+            options["rate_limit_rate"]
+            and self._random.random() < options["rate_limit_rate"]
+        ):
+            raise FakeProviderError(f"Fake model '{model}' is rate limited.", 429)
+
+    def _fail_late(self, model, options):
+        if options["error_rate"] and self._random.random() < options["error_rate"]:
+            raise FakeProviderError(f"Fake model '{model}' failed.", 500)
+
+    def _generate(self, options, messages, kwargs):
+        """Return the tokens of a completion and its finish reason."""
+        content = options["content"]
+        if content is None and options["name"] == "echo":
+            content = next(
+                (
+                    message["content"]
+                    for message in reversed(messages)
+                    if message.get("role") == "user"
+                    and isinstance(message.get("content"), str)
+                ),
+                "",
+            )
+        if content is not None:
+            tokens = _TOKEN.findall(content)
+        else:
+            start = self._random.randrange(len(_LOREM))
+            tokens = [
+                (" " if i else "") + _LOREM[(start + i) % len(_LOREM)]
+                for i in range(options["completion_tokens"])
+            ]
+        max_tokens = kwargs.get("max_tokens")
+        if max_tokens and len(tokens) > max_tokens:
+            return tokens[:max_tokens], "length"
+        return tokens, "stop"
+
+
+def _parse_options(values, strict=False):
+    """Convert the known options; with strict, unknown ones (typos) raise ValueError."""
+    options = {}
+    for key, value in values.items():
+        key = _ALIASES.get(key, key)
+        if key in _OPTIONS:
+            options[key] = None if value is None else _OPTIONS[key](value)
+        elif strict:
+            raise ValueError(
+                f"Unknown fake provider option '{key}'. Options: {sorted(_OPTIONS)}."
+            )
+    return options
+
+
+def _prompt_tokens(messages):
+    return sum(
+        len(_TOKEN.findall(message["content"]))
+        for message in messages
+        if isinstance(message.get("content"), str)
+    )
+
+
+def _sleep_until(deadline):
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
@@ -6,6 +6,7 @@ import vertexai
 from vertexai.generative_models import GenerativeModel, GenerationConfig
 
 from aisuite.framework import ProviderInterface, ChatCompletionResponse
+from aisuite import images
 
 
 DEFAULT_TEMPERATURE = 0.7
@@ -14,6 +15,8 @@ DEFAULT_TEMPERATURE = 0.7
 class GoogleProvider(ProviderInterface):
     """Implements the ProviderInterface for interacting with Google's Vertex AI."""
 
+    IMAGE_MAX_DIMENSION = 3072
+
     def __init__(self, **config):
         """Set up the Google AI client with a project ID."""
         self.project_id = config.get("project_id") or os.getenv("GOOGLE_PROJECT_ID")
@@ -59,6 +62,8 @@ class GoogleProvider(ProviderInterface):
 
         # Get the last message from the transformed messages
         last_message = transformed_messages[-1]["content"]
+        if not isinstance(last_message, str):
+            last_message = self.convert_content_to_parts(last_message)
 
         # Create the GenerativeModel with the specified model and generation configuration
         model = GenerativeModel(
@@ -74,16 +79,30 @@ class GoogleProvider(ProviderInterface):
 
     def convert_openai_to_vertex_ai(self, messages):
         """Convert OpenAI messages to Google AI messages."""
-        from vertexai.generative_models import Content, Part
+        from vertexai.generative_models import Content
 
         history = []
         for message in messages:
             role = message["role"]
             content = message["content"]
-            parts = [Part.from_text(content)]
+            parts = self.convert_content_to_parts(content)
             history.append(Content(role=role, parts=parts))
         return history
 
+    def convert_content_to_parts(self, content):
+        """Convert message content, a string or a list of text and image parts, to Parts."""
+        from vertexai.generative_models import Part
+
+        parts = []
+        for kind, value in images.iter_parts(content):
+            if kind == "text":
+                parts.append(Part.from_text(value))
+            else:
+                parts.append(
+                    Part.from_data(data=value.data, mime_type=value.media_type)
+                )
+        return parts
+
     def transform_roles(self, messages):
         """Transform the roles in the messages based on the provided transformations."""
         openai_roles_to_google_roles = {
@@ -1,7 +1,9 @@
 import os
 
 import groq
-from aisuite.provider import Provider
+import httpx
+from aisuite.provider import Provider, usage_from
+from aisuite import images
 
 
 class GroqProvider(Provider):
@@ -16,11 +18,43 @@ class GroqProvider(Provider):
             raise ValueError(
                 " API key is missing. Please provide it in the config or set the GROQ_API_KEY environment variable."
             )
+        # Route the SDK's requests through a custom httpx transport, e.g. to record or replay them.
+        transport = config.pop("transport", None)
+        if transport is not None:
+            config["http_client"] = httpx.Client(transport=transport)
+
         self.client = groq.Groq(**config)
 
     def chat_completions_create(self, model, messages, **kwargs):
         return self.client.chat.completions.create(
             model=model,
-            messages=messages,
-            **kwargs  # Pass any additional arguments to the Groq API
+            messages=images.to_openai_messages(messages),
+            **kwargs,  # Pass any additional arguments to the Groq API
+        )
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=images.to_openai_messages(messages),
+            stream=True,
+            **kwargs,
         )
+        return _iter_deltas(stream)
+
+    def warmup(self, model, **kwargs):
+        # Looking up the model opens a pooled connection (including the TLS handshake)
+        # and fails early if the model is not available to this key.
+        self.client.models.retrieve(model)
+
+
+def _iter_deltas(stream):
+    usage = None
+    with stream:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            # Groq reports the usage in the x_groq field of the last chunk.
+            x_groq = getattr(chunk, "x_groq", None)
+            if getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+    return usage_from(usage)
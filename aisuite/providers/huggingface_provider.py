@@ -1,67 +1,53 @@
-import os
-import httpx
-from aisuite.provider import Provider, LLMError
-from aisuite.framework import ChatCompletionResponse
+from aisuite.providers.openai_compatible import OpenAICompatibleProvider
+from aisuite.utils import json_codec
 
 
-class HuggingfaceProvider(Provider):
+class HuggingfaceProvider(OpenAICompatibleProvider):
     """
     HuggingFace Provider using httpx for direct API calls.
-    Currently, this provider support calls to HF serverless Inference Endpoints
-    which uses Text Generation Inference (TGI) as the backend.
-    TGI is OpenAI protocol compliant.
+    By default, this provider calls HF serverless Inference Endpoints, which use
+    Text Generation Inference (TGI) as the backend. TGI is OpenAI protocol compliant.
     https://huggingface.co/inference-endpoints/
+
+    Set base_url in the config to reach a dedicated or self-hosted TGI server instead,
+    e.g. "http://tgi.internal:8080/v1". The token is fetched from the config ("token"
+    or "api_key") or the HUGGINGFACE_TOKEN environment variable.
     """
 
+    SUPPORTS_N = False
+    NAME = "Hugging Face"
+    BASE_URL = "https://api-inference.huggingface.co"
+    API_KEY_ENV = "HUGGINGFACE_TOKEN"
+    EMBEDDINGS_BATCH_SIZE = 32
+
     def __init__(self, **config):
         """
         Initialize the provider with the given configuration.
-        The token is fetched from the config or environment variables.
         """
-        # Ensure API key is provided either in config or via environment variable
-        self.token = config.get("token") or os.getenv("HUGGINGFACE_TOKEN")
-        if not self.token:
+        if config.get("token"):
+            config.setdefault("api_key", config["token"])
+        self.serverless = not config.get("base_url")
+        super().__init__(**config)
+        if self.serverless and not self.api_key:
             raise ValueError(
                 "Hugging Face token is missing. Please provide it in the config or set the HUGGINGFACE_TOKEN environment variable."
             )
+        self.token = self.api_key
 
-        # Optionally set a custom timeout (default to 30s)
-        self.timeout = config.get("timeout", 30)
+    def chat_url(self, model):
+        if self.serverless:
+            return f"{self.base_url}/models/{model}/v1/chat/completions"
+        return super().chat_url(model)
 
-    def chat_completions_create(self, model, messages, **kwargs):
+    def embeddings_create(self, model, input, **kwargs):
         """
-        Makes a request to the Inference API endpoint using httpx.
+        Makes a request to the feature-extraction Inference API endpoint using httpx.
+        The model is expected to return one pooled vector per input text.
+        Servers set with base_url are called through the OpenAI embeddings API.
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.token}",
-        }
-
-        data = {
-            "model": model,
-            "messages": messages,
-            **kwargs,  # Pass any additional arguments to the API
-        }
-
-        url = f"https://api-inference.huggingface.co/models/{model}/v1/chat/completions"
-        try:
-            # Make the request to Hugging Face endpoint.
-            response = httpx.post(url, json=data, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-        except httpx.HTTPStatusError as http_err:
-            raise LLMError(f"Hugging Face request failed: {http_err}")
-        except Exception as e:
-            raise LLMError(f"An error occurred: {e}")
+        if not self.serverless:
+            return super().embeddings_create(model, input, **kwargs)
 
-        # Return the normalized response
-        return self._normalize_response(response.json())
-
-    def _normalize_response(self, response_data):
-        """
-        Normalize the response to a common format (ChatCompletionResponse).
-        """
-        normalized_response = ChatCompletionResponse()
-        normalized_response.choices[0].message.content = response_data["choices"][0][
-            "message"
-        ]["content"]
-        return normalized_response
+        url = f"{self.base_url}/pipeline/feature-extraction/{model}"
+        response = self._post(url, {"inputs": input, **kwargs})
+        return json_codec.loads(response.content)
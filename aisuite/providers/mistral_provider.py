@@ -1,11 +1,16 @@
 import os
 
+import httpx
 from mistralai import Mistral
 
-from aisuite.provider import Provider
+from aisuite.provider import Provider, usage_from
+from aisuite import images
 
 
 class MistralProvider(Provider):
+    SUPPORTS_N = True
+    EMBEDDINGS_BATCH_SIZE = 128
+
     def __init__(self, **config):
         """
         Initialize the Mistral provider with the given configuration.
@@ -17,7 +22,36 @@ class MistralProvider(Provider):
             raise ValueError(
                 " API key is missing. Please provide it in the config or set the MISTRAL_API_KEY environment variable."
             )
+        # Route the SDK's requests through a custom httpx transport, e.g. to record or replay them.
+        transport = config.pop("transport", None)
+        if transport is not None:
+            config["client"] = httpx.Client(transport=transport)
+
         self.client = Mistral(**config)
 
     def chat_completions_create(self, model, messages, **kwargs):
-        return self.client.chat.complete(model=model, messages=messages, **kwargs)
+        return self.client.chat.complete(
+            model=model, messages=images.to_openai_messages(messages), **kwargs
+        )
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        stream = self.client.chat.stream(
+            model=model, messages=images.to_openai_messages(messages), **kwargs
+        )
+        return _iter_deltas(stream)
+
+    def embeddings_create(self, model, input, **kwargs):
+        response = self.client.embeddings.create(model=model, inputs=input, **kwargs)
+        return [item.embedding for item in response.data]
+
+
+def _iter_deltas(stream):
+    usage = None
+    with stream:
+        for event in stream:
+            choices = event.data.choices
+            if choices and choices[0].delta.content:
+                yield choices[0].delta.content
+            if getattr(event.data, "usage", None) is not None:
+                usage = event.data.usage
+    return usage_from(usage)
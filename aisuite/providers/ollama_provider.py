@@ -1,7 +1,26 @@
+import collections
+import contextlib
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TypedDict
+
 import httpx
-from aisuite.provider import Provider, LLMError
+from aisuite.provider import Provider, LLMError, usage_dict
 from aisuite.framework import ChatCompletionResponse
+from aisuite.utils import json_codec
+from aisuite import images, tools
+
+
+class _ChatResponseSchema(TypedDict, total=False):
+    """The fields of an /api/chat response that are normalized."""
+
+    message: json_codec.MessageSchema
+    # Token counts, sent with the last chunk of a stream.
+    prompt_eval_count: int
+    eval_count: int
 
 
 class OllamaProvider(Provider):
@@ -10,9 +29,18 @@ class OllamaProvider(Provider):
     It uses the /api/chat endpoint.
     Read more here - https://github.com/ollama/ollama/blob/main/docs/api.md#generate-a-chat-completion
     If OLLAMA_API_URL is not set and not passed in config, then it will default to "http://localhost:11434"
+
+    With a list of hosts in the config, requests are balanced across several Ollama
+    servers. Each request goes to the least busy host that already has the model
+    loaded, as reported by /api/ps, so requests do not wait for a model to load.
+    A model that no host has loaded is loaded on the host with the fewest loaded
+    models. When every host holding a model has spill_threshold requests in flight,
+    the model is loaded on another, less busy host as well.
     """
 
     _CHAT_COMPLETION_ENDPOINT = "/api/chat"
+    _EMBEDDINGS_ENDPOINT = "/api/embed"
+    _LOADED_MODELS_ENDPOINT = "/api/ps"
     _CONNECT_ERROR_MESSAGE = "Ollama is likely not running. Start Ollama by running `ollama serve` on your host."
 
     def __init__(self, **config):
@@ -26,24 +54,198 @@ class OllamaProvider(Provider):
         # Optionally set a custom timeout (default to 30s)
         self.timeout = config.get("timeout", 30)
 
+        # Optionally set how long models stay loaded after a request, e.g. "30m" or -1 (forever)
+        self.keep_alive = config.get("keep_alive")
+
+        # Optionally gzip request bodies larger than this many bytes (disabled by default)
+        self.compress_threshold = config.get("compress_threshold")
+
+        # Reuse pooled connections across requests. A custom httpx transport can be
+        # passed in the config, e.g. to record or replay traffic.
+        self.client = httpx.Client(
+            timeout=self.timeout, transport=config.get("transport")
+        )
+
+        # Optionally balance requests across several servers, e.g. ["http://gpu-01:11434", ...].
+        # Loaded models are refreshed every refresh_interval seconds (10 by default).
+        self.router = None
+        if config.get("hosts"):
+            self.router = _HostRouter(
+                config["hosts"],
+                self.client,
+                refresh_interval=config.get("refresh_interval", 10),
+                spill_threshold=config.get("spill_threshold", 4),
+            )
+            self.url = self.router.hosts[0].url
+
+    def host_stats(self):
+        """Return the loaded models and requests in flight of each host."""
+        if self.router is None:
+            return []
+        return self.router.stats()
+
+    def _host(self, model, exclude=()):
+        """Context manager that holds a host for a request and gives its URL."""
+        if self.router is None:
+            return contextlib.nullcontext(self.url.rstrip("/"))
+        return self.router.route(model, exclude)
+
+    def _send(self, model, send):
+        """
+        Call send(url) with the URL of a host for the model. Returns its response and
+        a context that holds the host until it is closed. With several hosts, a
+        request that cannot connect is retried once on another host.
+        """
+        excluded = set()
+        while True:
+            with contextlib.ExitStack() as stack:
+                url = stack.enter_context(self._host(model, excluded))
+                try:
+                    return send(url), stack.pop_all()
+                except httpx.ConnectError:
+                    if self.router is None:
+                        raise
+                    # Not used again until a refresh reaches it.
+                    self.router.mark_down(url)
+                    if excluded or len(self.router.hosts) == 1:
+                        raise
+                    excluded.add(url)
+
     def chat_completions_create(self, model, messages, **kwargs):
         """
         Makes a request to the chat completions endpoint using httpx.
         """
         kwargs["stream"] = False
+        body, headers = self._chat_request_body(model, messages, kwargs)
+
+        try:
+            response, held = self._send(
+                model,
+                lambda url: self.client.post(
+                    url + self._CHAT_COMPLETION_ENDPOINT,
+                    content=body,
+                    headers=headers,
+                ),
+            )
+            held.close()
+            response.raise_for_status()
+        except httpx.ConnectError:  # Handle connection errors
+            raise LLMError(f"Connection failed: {self._CONNECT_ERROR_MESSAGE}")
+        except httpx.HTTPStatusError as http_err:
+            raise LLMError(f"Ollama request failed: {http_err}")
+        except Exception as e:
+            raise LLMError(f"An error occurred: {e}")
+
+        # Return the normalized response
+        return self._normalize_response(
+            json_codec.loads(response.content, _ChatResponseSchema)
+        )
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        """
+        Streams a chat completion. Ollama sends one JSON object per line.
+        """
+        kwargs["stream"] = True
+        body, headers = self._chat_request_body(model, messages, kwargs)
+
+        def send(url):
+            request = self.client.build_request(
+                "POST",
+                url + self._CHAT_COMPLETION_ENDPOINT,
+                content=body,
+                headers=headers,
+            )
+            return self.client.send(request, stream=True)
+
+        try:
+            # The host is held until the stream is exhausted or closed.
+            response, held = self._send(model, send)
+            if response.is_error:
+                held.close()
+                response.read()
+                response.close()
+                response.raise_for_status()
+        except httpx.ConnectError:  # Handle connection errors
+            raise LLMError(f"Connection failed: {self._CONNECT_ERROR_MESSAGE}")
+        except httpx.HTTPStatusError as http_err:
+            raise LLMError(f"Ollama request failed: {http_err}")
+        except Exception as e:
+            raise LLMError(f"An error occurred: {e}")
+
+        return self._iter_deltas(response, held)
+
+    def _chat_request_body(self, model, messages, kwargs):
+        if self.keep_alive is not None:
+            kwargs.setdefault("keep_alive", self.keep_alive)
         data = {
             "model": model,
-            "messages": messages,
+            "messages": [_to_ollama_message(message) for message in messages],
             **kwargs,  # Pass any additional arguments to the API
         }
+        return json_codec.encode_request(data, self.compress_threshold)
 
+    def _iter_deltas(self, response, held):
+        usage = None
         try:
-            response = httpx.post(
-                self.url.rstrip("/") + self._CHAT_COMPLETION_ENDPOINT,
-                json=data,
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json_codec.loads(line, _ChatResponseSchema)
+                content = chunk.get("message", {}).get("content")
+                if content:
+                    yield content
+                if "eval_count" in chunk:
+                    usage = usage_dict(
+                        chunk.get("prompt_eval_count"), chunk.get("eval_count")
+                    )
+        finally:
+            response.close()
+            held.close()
+        return usage
+
+    def warmup(self, model, keep_alive=None, **kwargs):
+        """
+        Loads the model into memory so the first chat request does not pay for it.
+        A chat request without messages makes Ollama load the model and return immediately.
+        """
+        data = {"model": model, "messages": [], "stream": False}
+        keep_alive = keep_alive if keep_alive is not None else self.keep_alive
+        if keep_alive is not None:
+            data["keep_alive"] = keep_alive
+        body, headers = json_codec.encode_request(data)
+
+        try:
+            # Loading large models can take much longer than a regular request.
+            with self._host(model) as url:
+                response = self.client.post(
+                    url + self._CHAT_COMPLETION_ENDPOINT,
+                    content=body,
+                    headers=headers,
+                    timeout=None,
+                )
+                response.raise_for_status()
+        except httpx.ConnectError:  # Handle connection errors
+            raise LLMError(f"Connection failed: {self._CONNECT_ERROR_MESSAGE}")
+        except httpx.HTTPStatusError as http_err:
+            raise LLMError(f"Ollama warmup failed: {http_err}")
+        except Exception as e:
+            raise LLMError(f"An error occurred: {e}")
+
+    def embeddings_create(self, model, input, **kwargs):
+        """
+        Makes a request to the embeddings endpoint using httpx.
+        """
+        data = {"model": model, "input": input, **kwargs}
+        body, headers = json_codec.encode_request(data, self.compress_threshold)
+
+        try:
+            with self._host(model) as url:
+                response = self.client.post(
+                    url + self._EMBEDDINGS_ENDPOINT,
+                    content=body,
+                    headers=headers,
+                )
+                response.raise_for_status()
         except httpx.ConnectError:  # Handle connection errors
             raise LLMError(f"Connection failed: {self._CONNECT_ERROR_MESSAGE}")
         except httpx.HTTPStatusError as http_err:
@@ -51,15 +253,163 @@ class OllamaProvider(Provider):
         except Exception as e:
             raise LLMError(f"An error occurred: {e}")
 
-        # Return the normalized response
-        return self._normalize_response(response.json())
+        return json_codec.loads(response.content)["embeddings"]
 
     def _normalize_response(self, response_data):
         """
         Normalize the API response to a common format (ChatCompletionResponse).
         """
         normalized_response = ChatCompletionResponse()
-        normalized_response.choices[0].message.content = response_data["message"][
-            "content"
-        ]
+        message = response_data["message"]
+        normalized_response.choices[0].message.content = message["content"]
+        tool_calls = tools.tool_calls_from_dicts(message.get("tool_calls"))
+        if tool_calls:
+            normalized_response.choices[0].message.tool_calls = tool_calls
+            normalized_response.choices[0].finish_reason = "tool_calls"
         return normalized_response
+
+
+def _to_ollama_message(message):
+    message = images.to_ollama_message(message)
+    if message.get("tool_calls"):
+        # Ollama takes the arguments of earlier tool calls as objects, not JSON strings.
+        message = {
+            **message,
+            "tool_calls": [
+                {
+                    "function": {
+                        "name": tool_call["function"]["name"],
+                        "arguments": tools.parse_arguments(
+                            tool_call["function"].get("arguments")
+                        ),
+                    }
+                }
+                for tool_call in message["tool_calls"]
+            ],
+        }
+    return message
+
+
+def _model_key(model):
+    """Model names as /api/ps reports them, with the implicit ":latest" tag."""
+    return model if ":" in model else model + ":latest"
+
+
+class _Host:
+    """One Ollama server: its loaded models and the requests in flight on it."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.models = set()
+        self.in_flight = 0
+        self.in_flight_by_model = collections.Counter()
+        self.down = False
+
+
+class _HostRouter:
+    """Chooses the host for each request from the models loaded on each host."""
+
+    def __init__(self, urls, client, refresh_interval, spill_threshold):
+        self.hosts = [_Host(url) for url in urls]
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.spill_threshold = spill_threshold
+        self._lock = threading.Lock()
+        self._refreshed = float("-inf")
+        self._refreshing = False
+
+    @contextmanager
+    def route(self, model, exclude=()):
+        host, key = self._acquire(model, exclude)
+        try:
+            yield host.url
+        finally:
+            with self._lock:
+                host.in_flight -= 1
+                host.in_flight_by_model[key] -= 1
+
+    def mark_down(self, url):
+        with self._lock:
+            for host in self.hosts:
+                if host.url == url:
+                    host.down = True
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    "url": host.url,
+                    "in_flight": host.in_flight,
+                    "models": sorted(host.models),
+                    "down": host.down,
+                }
+                for host in self.hosts
+            ]
+
+    def _acquire(self, model, exclude=()):
+        self._refresh_if_stale()
+        key = _model_key(model)
+        with self._lock:
+            hosts = [host for host in self.hosts if host.url not in exclude]
+            hosts = [host for host in hosts if not host.down] or hosts
+            warm = [host for host in hosts if key in host.models]
+            host = min(warm, key=lambda h: h.in_flight) if warm else None
+            if host is None or host.in_flight >= self.spill_threshold:
+                # Load the model where the fewest models compete for memory. While it
+                # loads, further requests for the model follow it to the same host.
+                cold = [h for h in hosts if key not in h.models]
+                if cold:
+                    candidate = min(cold, key=lambda h: (len(h.models), h.in_flight))
+                    if host is None or candidate.in_flight < host.in_flight:
+                        host = candidate
+                        host.models.add(key)
+            host.in_flight += 1
+            host.in_flight_by_model[key] += 1
+            return host, key
+
+    def _refresh_if_stale(self):
+        with self._lock:
+            if (
+                self._refreshing
+                or time.monotonic() - self._refreshed < self.refresh_interval
+            ):
+                return
+            self._refreshing = True
+            first = self._refreshed == float("-inf")
+        if first:
+            # Routing needs to know where models are loaded before the first request.
+            self._refresh()
+        else:
+            # Later requests route from the last known state rather than wait for
+            # /api/ps, which takes up to 5 seconds when a host is down.
+            threading.Thread(
+                target=self._refresh, name="aisuite-ollama-refresh", daemon=True
+            ).start()
+
+    def _refresh(self):
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.hosts)) as pool:
+                loaded = list(pool.map(self._loaded_models, self.hosts))
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._refreshed = time.monotonic()
+        with self._lock:
+            for host, models in zip(self.hosts, loaded):
+                host.down = models is None
+                # Models with requests in flight may still be loading.
+                host.models = (models or set()) | {
+                    key for key, count in host.in_flight_by_model.items() if count
+                }
+
+    def _loaded_models(self, host):
+        try:
+            response = self.client.get(
+                host.url + OllamaProvider._LOADED_MODELS_ENDPOINT,
+                timeout=min(5, self.client.timeout.read or 5),
+            )
+            response.raise_for_status()
+            models = json_codec.loads(response.content).get("models") or []
+        except Exception:
+            return None
+        return {model.get("model") or model.get("name") for model in models}
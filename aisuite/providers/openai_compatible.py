@@ -0,0 +1,237 @@
+"""Base class for providers that speak the OpenAI HTTP API.
+
+Hosted services (Together AI, Fireworks AI, Hugging Face) and self-hosted servers
+(vLLM, TGI, llama.cpp) accept the same chat completions and embeddings requests, so
+their providers differ only in base URL, credentials and defaults.
+"""
+
+import os
+import threading
+
+import httpx
+
+from aisuite import images, tools
+from aisuite.framework import ChatCompletionResponse
+from aisuite.framework.choice import Choice
+from aisuite.logprobs import Logprobs
+from aisuite.provider import LLMError, Provider, usage_from
+from aisuite.utils import json_codec
+
+# Connection pool limits of the transport shared by all OpenAI-compatible providers.
+MAX_CONNECTIONS = 256
+MAX_KEEPALIVE_CONNECTIONS = 64
+
+_shared_transport = None
+_shared_transport_lock = threading.Lock()
+
+
+def shared_transport():
+    """
+    Return the process-wide transport used by OpenAI-compatible providers.
+
+    Every provider instance sends its requests through one connection pool, so
+    connections to the same host are reused across providers and clients.
+    """
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = httpx.HTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                )
+            )
+        return _shared_transport
+
+
+def _reset_shared_transport():
+    global _shared_transport, _shared_transport_lock
+    _shared_transport = None
+    _shared_transport_lock = threading.Lock()
+
+
+# Pooled connections must not be shared across a fork.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_transport)
+
+
+class OpenAICompatibleProvider(Provider):
+    """
+    Provider for servers that implement the OpenAI chat completions API over HTTP.
+
+    Subclasses set the defaults below. Every one of them can be overridden by config:
+        base_url (str): URL that the API paths are appended to, e.g. "http://gpu-01:8000/v1".
+        api_key (str): Credential sent in the auth header. Defaults to $API_KEY_ENV.
+        auth_header (str): Name of the auth header, "Authorization" by default.
+        auth_scheme (str): Prefix of the credential, "Bearer" by default. "" sends the key as is.
+        headers (dict): Extra headers sent with every request.
+        timeout (float): Request timeout in seconds, 30 by default.
+        compress_threshold (int): Gzip request bodies larger than this many bytes.
+        stream_usage (bool): Ask for the token usage of streams with stream_options,
+            True by default. Disable it for servers that reject the option.
+        transport (httpx.BaseTransport): Replaces the shared pooled transport.
+    """
+
+    SUPPORTS_N = True
+    NAME = "OpenAI-compatible server"
+    BASE_URL = None
+    API_KEY_ENV = None
+    API_KEY_REQUIRED = False
+    CHAT_PATH = "/chat/completions"
+    EMBEDDINGS_PATH = "/embeddings"
+    STREAM_USAGE = True
+
+    def __init__(self, **config):
+        self.base_url = (config.get("base_url") or self.BASE_URL or "").rstrip("/")
+        if not self.base_url:
+            raise ValueError(
+                f"{self.NAME} base_url is missing. Please provide it in the config."
+            )
+
+        self.api_key = config.get("api_key") or (
+            os.getenv(self.API_KEY_ENV) if self.API_KEY_ENV else None
+        )
+        if self.API_KEY_REQUIRED and not self.api_key:
+            raise ValueError(
+                f"{self.NAME} API key is missing. Please provide it in the config or set the {self.API_KEY_ENV} environment variable."
+            )
+
+        headers = dict(config.get("headers") or {})
+        if self.api_key:
+            scheme = config.get("auth_scheme", "Bearer")
+            headers[config.get("auth_header", "Authorization")] = (
+                f"{scheme} {self.api_key}" if scheme else self.api_key
+            )
+
+        # Optionally set a custom timeout (default to 30s)
+        self.timeout = config.get("timeout", 30)
+
+        # Optionally gzip request bodies larger than this many bytes (disabled by default)
+        self.compress_threshold = config.get("compress_threshold")
+
+        self.stream_usage = config.get("stream_usage", self.STREAM_USAGE)
+
+        # Reuse pooled connections across requests and providers. A custom httpx
+        # transport can be passed in the config, e.g. to record or replay traffic.
+        self.client = httpx.Client(
+            headers=headers,
+            timeout=self.timeout,
+            transport=config.get("transport") or shared_transport(),
+        )
+
+    def chat_url(self, model):
+        return self.base_url + self.CHAT_PATH
+
+    def embeddings_url(self, model):
+        return self.base_url + self.EMBEDDINGS_PATH
+
+    def chat_completions_create(self, model, messages, **kwargs):
+        """
+        Makes a request to the chat completions endpoint using httpx.
+        """
+        response = self._post(
+            self.chat_url(model), self._chat_request(model, messages, kwargs)
+        )
+
+        # Return the normalized response
+        return self._normalize_response(
+            json_codec.loads(response.content, json_codec.ChatCompletionSchema)
+        )
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        """
+        Streams a chat completion. The server sends chunks as server-sent events.
+        """
+        kwargs["stream"] = True
+        if self.stream_usage:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        response = self._post(
+            self.chat_url(model),
+            self._chat_request(model, messages, kwargs),
+            stream=True,
+        )
+        return self._iter_deltas(response)
+
+    def warmup(self, model, **kwargs):
+        """
+        Opens a pooled connection to the endpoint ahead of the first request.
+        """
+        try:
+            self.client.head(self.base_url)
+        except Exception as e:
+            raise LLMError(f"{self.NAME} warmup failed: {e}")
+
+    def embeddings_create(self, model, input, **kwargs):
+        """
+        Makes a request to the embeddings endpoint using httpx.
+        """
+        response = self._post(
+            self.embeddings_url(model), {"model": model, "input": input, **kwargs}
+        )
+
+        # Items carry their position in the input, which is not guaranteed to match list order.
+        items = sorted(
+            json_codec.loads(response.content)["data"], key=lambda item: item["index"]
+        )
+        return [item["embedding"] for item in items]
+
+    def _chat_request(self, model, messages, kwargs):
+        return {
+            "model": model,
+            "messages": images.to_openai_messages(messages),
+            **kwargs,  # Pass any additional arguments to the API
+        }
+
+    def _post(self, url, data, stream=False):
+        body, headers = json_codec.encode_request(data, self.compress_threshold)
+        request = self.client.build_request("POST", url, content=body, headers=headers)
+        try:
+            response = self.client.send(request, stream=stream)
+            if stream and response.is_error:
+                # Read the body of a streamed error so that it is reported.
+                response.read()
+                response.close()
+            response.raise_for_status()
+        except httpx.HTTPStatusError as http_err:
+            raise LLMError(f"{self.NAME} request failed: {http_err}")
+        except Exception as e:
+            raise LLMError(f"An error occurred: {e}")
+        return response
+
+    def _iter_deltas(self, response):
+        usage = None
+        try:
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json_codec.loads(data, json_codec.ChatCompletionChunkSchema)
+                choices = chunk.get("choices")
+                if choices:
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        yield content
+                if chunk.get("usage"):
+                    usage = usage_from(chunk["usage"])
+        finally:
+            response.close()
+        return usage
+
+    def _normalize_response(self, response_data):
+        """
+        Normalize the response to a common format (ChatCompletionResponse).
+        """
+        choices = []
+        for choice_data in response_data["choices"]:
+            choice = Choice()
+            choice.message.content = choice_data["message"].get("content")
+            choice.message.tool_calls = tools.tool_calls_from_dicts(
+                choice_data["message"].get("tool_calls")
+            )
+            choice.finish_reason = choice_data.get("finish_reason")
+            if choice_data.get("logprobs"):
+                choice.logprobs = Logprobs.from_openai(choice_data["logprobs"])
+            choices.append(choice)
+        return ChatCompletionResponse(choices)
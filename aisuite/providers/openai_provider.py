@@ -1,9 +1,20 @@
+import base64
 import openai
 import os
-from aisuite.provider import Provider, LLMError
+
+import httpx
+import numpy as np
+
+from aisuite.provider import Provider, LLMError, usage_from
+from aisuite import images
 
 
 class OpenaiProvider(Provider):
+    SUPPORTS_N = True
+    IMAGE_MAX_DIMENSION = 2048
+    # The embeddings endpoint accepts up to 2048 inputs per request.
+    EMBEDDINGS_BATCH_SIZE = 2048
+
     def __init__(self, **config):
         """
         Initialize the OpenAI provider with the given configuration.
@@ -20,6 +31,11 @@ class OpenaiProvider(Provider):
         # infer certain values from the environment variables.
         # Eg: OPENAI_API_KEY, OPENAI_ORG_ID, OPENAI_PROJECT_ID, OPENAI_BASE_URL, etc.
 
+        # Route the SDK's requests through a custom httpx transport, e.g. to record or replay them.
+        transport = config.pop("transport", None)
+        if transport is not None:
+            config["http_client"] = httpx.Client(transport=transport)
+
         # Pass the entire config to the OpenAI client constructor
         self.client = openai.OpenAI(**config)
 
@@ -28,6 +44,46 @@ class OpenaiProvider(Provider):
         # Maybe we should catch them and raise a custom LLMError.
         return self.client.chat.completions.create(
             model=model,
-            messages=messages,
-            **kwargs  # Pass any additional arguments to the OpenAI API
+            messages=images.to_openai_messages(messages),
+            **kwargs,  # Pass any additional arguments to the OpenAI API
+        )
+
+    def chat_completions_stream(self, model, messages, **kwargs):
+        # The last chunk then carries the token usage.
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=images.to_openai_messages(messages),
+            stream=True,
+            **kwargs,
         )
+        return _iter_deltas(stream)
+
+    def warmup(self, model, **kwargs):
+        # Looking up the model opens a pooled connection (including the TLS handshake)
+        # and fails early if the model is not available to this key.
+        self.client.models.retrieve(model)
+
+    def embeddings_create(self, model, input, **kwargs):
+        # Request base64 so the vectors can be decoded straight into float32 arrays
+        # instead of going through lists of Python floats.
+        response = self.client.embeddings.create(
+            model=model, input=input, encoding_format="base64", **kwargs
+        )
+        return np.stack(
+            [
+                np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                for item in response.data
+            ]
+        )
+
+
+def _iter_deltas(stream):
+    usage = None
+    with stream:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+    return usage_from(usage)
@@ -0,0 +1,65 @@
+"""Request rate limits per provider, backed by a shared state backend."""
+
+import time
+
+from .state import MemoryStateBackend
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limits in requests per minute, keyed by provider.
+
+    With a SQLiteStateBackend, all processes using the same database file draw from
+    the same buckets, so N workers together stay within one quota instead of each
+    assuming it owns the full quota.
+
+    Example:
+        limiter = RateLimiter(
+            {"openai": 500, "anthropic": 50},
+            backend=SQLiteStateBackend("/tmp/aisuite-state.db"),
+        )
+        client = Client(rate_limiter=limiter)
+    """
+
+    def __init__(self, limits: dict, backend=None, burst: dict = None):
+        """
+        Args:
+            limits (dict): Requests per minute per provider key. Providers that are not
+                listed are not limited.
+            backend: A state backend. Defaults to a per-process MemoryStateBackend.
+            burst (dict): Bucket capacity per provider key, i.e. how many requests may
+                be sent back to back. Defaults to one second's worth of requests.
+                At least 1, since a request takes a whole token.
+        """
+        for provider_key, limit in limits.items():
+            if limit is not None and not limit > 0:
+                raise ValueError(
+                    f"Rate limit for '{provider_key}' must be positive, got {limit}."
+                )
+        for provider_key, capacity in (burst or {}).items():
+            if not capacity >= 1:
+                raise ValueError(
+                    f"Burst for '{provider_key}' must be at least 1, got {capacity}."
+                )
+        self.limits = limits
+        self.backend = backend or MemoryStateBackend()
+        self.burst = burst or {}
+
+    def acquire(self, provider_key):
+        """Block until the provider's bucket grants a request."""
+        limit = self.limits.get(provider_key)
+        if not limit:
+            return
+        rate = limit / 60.0
+        capacity = self.burst.get(provider_key, max(1.0, rate))
+        while (wait := self.backend.take_token(provider_key, rate, capacity)) > 0:
+            time.sleep(wait)
+
+    def wrap(self, provider_key, func):
+        """Return func wrapped so every call first waits for the rate limit."""
+
+        def limited(*args, **kwargs):
+            self.acquire(provider_key)
+            return func(*args, **kwargs)
+
+        return limited
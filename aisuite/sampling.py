@@ -0,0 +1,64 @@
+"""Concurrent n-sampling for providers that do not support the `n` parameter natively."""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .framework import ChatCompletionResponse
+
+
+def sample(create, model, messages, n, consensus=None, **kwargs):
+    """
+    Request n completions concurrently and merge them into a single response.
+
+    Args:
+        create (callable): The provider's chat_completions_create method.
+        model (str): The provider specific model name.
+        messages (list): The chat history.
+        n (int): The number of samples to request.
+        consensus (bool or callable): Enables majority voting. When True, answers are
+            compared by their stripped content; a callable maps the content of a choice
+            to the value that is voted on (e.g. the final number in a reasoning chain).
+            Sampling stops as soon as one answer holds a majority of the n votes, and
+            samples that have not started yet are cancelled.
+        kwargs (dict): Extra arguments for the provider.
+
+    Returns:
+        ChatCompletionResponse: One choice per completed sample. With consensus, the
+        choices holding the winning answer come first.
+    """
+    vote_key = _vote_key(consensus)
+    majority = n // 2 + 1
+
+    # With voting, only as many samples as a majority needs run at once, so the
+    # remaining ones are never sent if the first answers already agree.
+    pool = ThreadPoolExecutor(max_workers=majority if vote_key else n)
+    futures = [pool.submit(create, model, messages, **kwargs) for _ in range(n)]
+    try:
+        if not vote_key:
+            return ChatCompletionResponse(
+                [future.result().choices[0] for future in futures]
+            )
+
+        choices = []
+        votes = Counter()
+        for future in as_completed(futures):
+            choice = future.result().choices[0]
+            choices.append(choice)
+            votes[vote_key(choice.message.content)] += 1
+            if votes.most_common(1)[0][1] >= majority:
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # Counter.most_common keeps insertion order for ties, so the earliest answer wins a tie.
+    winner = votes.most_common(1)[0][0]
+    choices.sort(key=lambda choice: vote_key(choice.message.content) != winner)
+    return ChatCompletionResponse(choices)
+
+
+def _vote_key(consensus):
+    if not consensus:
+        return None
+    if callable(consensus):
+        return consensus
+    return lambda content: (content or "").strip()
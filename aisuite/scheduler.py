@@ -0,0 +1,188 @@
+"""Priority-aware admission control in front of provider calls."""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from .provider import LLMError
+
+# Lower values are served first. Integers can be used for finer-grained classes.
+PRIORITIES = {"interactive": 0, "default": 5, "batch": 10}
+
+DEFAULT_LIMIT = 16
+
+# Weight of the latest call when updating the average call duration.
+_DURATION_SMOOTHING = 0.2
+
+
+class RequestShedError(LLMError):
+    """Raised when the scheduler drops a request that cannot start within its queue deadline."""
+
+
+class _Waiter:
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+
+class _Lane:
+    """Concurrency slots and waiting requests for one provider."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.waiting = []
+        self.queued = 0
+        self.avg_duration = None
+
+
+class Scheduler:
+    """
+    Shares per-provider concurrency limits between all requests made through a Client.
+
+    Requests that find their provider at its limit wait in a priority queue, so an
+    interactive request overtakes any batch requests queued before it. Each request
+    may carry a queue timeout: if it cannot start in time it is shed with a
+    RequestShedError. Requests whose estimated wait (from the queue ahead of them and
+    the average call duration) already exceeds their timeout are shed immediately,
+    without waiting.
+
+    Example:
+        scheduler = Scheduler(limits={"openai": 32, "anthropic": 8}, max_queue=500)
+        client = Client(scheduler=scheduler)
+        client.chat.completions.create(
+            "openai:gpt-4o", messages, priority="interactive", queue_timeout=2.0
+        )
+    """
+
+    def __init__(
+        self,
+        limits: dict = None,
+        default_limit: int = DEFAULT_LIMIT,
+        max_queue: int = None,
+        default_queue_timeout: float = None,
+    ):
+        """
+        Args:
+            limits (dict): Maximum concurrent calls per provider key, e.g. {"openai": 32}.
+            default_limit (int): Limit for providers not listed in limits.
+            max_queue (int): Maximum number of waiting requests per provider. Requests
+                beyond it are shed immediately.
+            default_queue_timeout (float): Seconds a request may wait for a slot when it
+                does not set its own queue_timeout. None waits indefinitely.
+        """
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self.default_queue_timeout = default_queue_timeout
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def wrap(self, provider_key, func, priority="default", queue_timeout=None):
+        """Return func wrapped so every call runs inside a scheduler slot."""
+
+        def scheduled(*args, **kwargs):
+            with self.slot(provider_key, priority, queue_timeout):
+                return func(*args, **kwargs)
+
+        return scheduled
+
+    @contextmanager
+    def slot(self, provider_key, priority="default", queue_timeout=None):
+        """Hold one of the provider's concurrency slots for the duration of the block."""
+        lane = self._acquire(provider_key, priority, queue_timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(lane, time.monotonic() - start)
+
+    def stats(self, provider_key):
+        """Return the active and queued request counts for a provider."""
+        with self._lock:
+            lane = self._lane(provider_key)
+            return {"active": lane.active, "queued": lane.queued}
+
+    def _lane(self, provider_key):
+        lane = self._lanes.get(provider_key)
+        if lane is None:
+            limit = self.limits.get(provider_key, self.default_limit)
+            lane = self._lanes[provider_key] = _Lane(limit)
+        return lane
+
+    def _acquire(self, provider_key, priority, queue_timeout):
+        rank = _rank(priority)
+        if queue_timeout is None:
+            queue_timeout = self.default_queue_timeout
+
+        with self._lock:
+            lane = self._lane(provider_key)
+            if lane.active < lane.limit and not lane.queued:
+                lane.active += 1
+                return lane
+
+            if self.max_queue is not None and lane.queued >= self.max_queue:
+                raise RequestShedError(
+                    f"Request shed: the queue for '{provider_key}' is full."
+                )
+
+            if queue_timeout is not None and lane.avg_duration is not None:
+                ahead = sum(
+                    1 for r, _, w in lane.waiting if r <= rank and not w.cancelled
+                )
+                estimated_wait = (ahead + 1) / lane.limit * lane.avg_duration
+                if estimated_wait > queue_timeout:
+                    raise RequestShedError(
+                        f"Request shed: estimated queue time for '{provider_key}' "
+                        f"({estimated_wait:.2f}s) exceeds the deadline ({queue_timeout}s)."
+                    )
+
+            waiter = _Waiter()
+            heapq.heappush(lane.waiting, (rank, next(self._sequence), waiter))
+            lane.queued += 1
+
+        waiter.event.wait(queue_timeout)
+
+        with self._lock:
+            if waiter.granted:
+                return lane
+            # Cancelled waiters stay in the heap and are skipped when slots are handed out.
+            waiter.cancelled = True
+            lane.queued -= 1
+        raise RequestShedError(
+            f"Request shed: no slot for '{provider_key}' within {queue_timeout}s."
+        )
+
+    def _release(self, lane, duration):
+        with self._lock:
+            if lane.avg_duration is None:
+                lane.avg_duration = duration
+            else:
+                lane.avg_duration += _DURATION_SMOOTHING * (
+                    duration - lane.avg_duration
+                )
+
+            # Hand the slot straight to the highest priority waiter, if any.
+            while lane.waiting:
+                _, _, waiter = heapq.heappop(lane.waiting)
+                if not waiter.cancelled:
+                    waiter.granted = True
+                    lane.queued -= 1
+                    waiter.event.set()
+                    return
+            lane.active -= 1
+
+
+def _rank(priority):
+    """The rank of a priority class name or number; lower ranks are served first."""
+    if not isinstance(priority, str):
+        return priority
+    if priority not in PRIORITIES:
+        raise ValueError(
+            f"Unknown priority '{priority}'. Priorities: {sorted(PRIORITIES)}."
+        )
+    return PRIORITIES[priority]
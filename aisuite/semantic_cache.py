@@ -0,0 +1,197 @@
+"""Semantic cache for chat completion responses, backed by an in-process vector index."""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+import numpy as np
+
+from .cache import key_options
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class SemanticCache:
+    """
+    Returns a stored response when a new request's final user message is similar enough
+    to a previously answered one.
+
+    The final user message is embedded and compared against all stored entries at once
+    with a single matrix-vector product over normalized float32 vectors. An entry only
+    matches requests with the same model, request arguments, client options such as
+    consensus, and earlier messages, so the same question in a different conversation
+    is not served from the cache. When the cache is full, the least recently used
+    entry is replaced. If the final message cannot be embedded, for example during
+    an outage of the embedding provider, the request is sent without the cache.
+
+    Example:
+        cache = SemanticCache("openai:text-embedding-3-small", threshold=0.92)
+        client = Client(semantic_cache=cache)
+    """
+
+    def __init__(
+        self,
+        embedding_model: str = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        embed=None,
+    ):
+        """
+        Args:
+            embedding_model (str): The 'provider:model' used to embed messages through
+                the client's embeddings API.
+            threshold (float): Minimum cosine similarity for a cached response to be used.
+            max_entries (int): Maximum number of stored responses.
+            embed (callable): Alternative to embedding_model. Maps a text to a vector.
+        """
+        if embedding_model is None and embed is None:
+            raise ValueError("A semantic cache needs an embedding_model or embed.")
+        self.embedding_model = embedding_model
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._contexts = np.zeros(max_entries, dtype=np.uint64)
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._responses = [None] * max_entries
+        self._size = 0
+        self._clock = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def key(self, client, model, messages, kwargs, options=None):
+        """
+        Return the lookup key for a request, or None if it cannot be cached.
+
+        Only requests that end with a user message with text content are cached.
+        """
+        if not messages:
+            return None
+        last = messages[-1]
+        if last.get("role") != "user" or not isinstance(last.get("content"), str):
+            return None
+
+        context = json.dumps(
+            {
+                "model": model,
+                "history": messages[:-1],
+                "kwargs": kwargs,
+                **key_options(options),
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        digest = hashlib.sha256(context.encode("utf-8")).digest()
+        context_id = np.frombuffer(digest[:8], dtype=np.uint64)[0]
+        try:
+            vector = self._embed(client, last["content"])
+        except Exception:
+            return None
+        return context_id, vector
+
+    def get(self, key):
+        """Return the cached response for the key, or None."""
+        context_id, vector = key
+        with self._lock:
+            index = self._nearest(context_id, vector)
+            if index is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            self._last_used[index] = self._clock
+            return self._responses[index]
+
+    def set(self, key, response):
+        context_id, vector = key
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros(
+                    (self.max_entries, vector.shape[0]), dtype=np.float32
+                )
+            if self._size < self.max_entries:
+                index = self._size
+                self._size += 1
+            else:
+                index = int(np.argmin(self._last_used))
+                self.evictions += 1
+            self._clock += 1
+            self._vectors[index] = vector
+            self._contexts[index] = context_id
+            self._last_used[index] = self._clock
+            self._responses[index] = response
+
+    def _embed(self, client, text):
+        if self.embed is not None:
+            vector = np.asarray(self.embed(text), dtype=np.float32)
+        else:
+            vector = client.embeddings.create(self.embedding_model, [text])[0]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _nearest(self, context_id, vector):
+        if not self._size:
+            return None
+        similarities = self._vectors[: self._size] @ vector
+        similarities[self._contexts[: self._size] != context_id] = -np.inf
+        index = int(np.argmax(similarities))
+        if similarities[index] < self.threshold:
+            return None
+        return index
+
+    def save(self, path):
+        """Write the cache to a directory. Responses are stored pickled."""
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            size = self._size
+            if self._vectors is not None:
+                np.save(os.path.join(path, "vectors.npy"), self._vectors)
+            with open(os.path.join(path, "entries.pickle"), "wb") as f:
+                pickle.dump(
+                    {
+                        "max_entries": self.max_entries,
+                        "contexts": self._contexts[:size],
+                        "last_used": self._last_used[:size],
+                        "responses": self._responses[:size],
+                    },
+                    f,
+                )
+
+    @classmethod
+    def load(cls, path, mmap: bool = True, **kwargs):
+        """
+        Load a cache written by save(). kwargs are passed to the constructor, except
+        max_entries, which is the saved cache's.
+
+        With mmap, the vectors are memory-mapped copy-on-write instead of read into
+        memory, so processes loading the same large index share the file's pages.
+        New entries are not written back to the file; call save() to persist them.
+        The pickled responses must come from a trusted source.
+        """
+        with open(os.path.join(path, "entries.pickle"), "rb") as f:
+            entries = pickle.load(f)
+        cache = cls(max_entries=entries["max_entries"], **kwargs)
+        size = len(entries["responses"])
+        vectors_path = os.path.join(path, "vectors.npy")
+        if os.path.exists(vectors_path):
+            cache._vectors = np.load(vectors_path, mmap_mode="c" if mmap else None)
+        cache._contexts[:size] = entries["contexts"]
+        cache._last_used[:size] = entries["last_used"]
+        cache._responses[:size] = entries["responses"]
+        cache._size = size
+        cache._clock = int(entries["last_used"].max()) if size else 0
+        return cache
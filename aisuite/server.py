@@ -0,0 +1,520 @@
+"""An OpenAI-compatible HTTP gateway in front of an aisuite Client.
+
+One gateway per host lets services in any language, and any number of worker
+processes, share a single warm Client: one set of provider connection pools, one
+scheduler, one rate limiter and one response cache.
+
+    aisuite serve --config providers.json --port 8000
+
+    curl localhost:8000/v1/chat/completions -d '{"model": "openai:gpt-4o",
+        "messages": [{"role": "user", "content": "Hi"}], "stream": true}'
+
+Endpoints:
+    POST /v1/chat/completions   OpenAI chat completions, with SSE when "stream" is true.
+    GET  /metrics               Request counters and latencies in Prometheus text format.
+    GET  /health                Liveness check.
+
+Image parts must be data URLs. The gateway never reads image paths from its own
+disk, and fetches http(s) image URLs only when started with allow_remote_images.
+
+The server is plain asyncio with no web framework. Provider calls are blocking, so
+they run in a thread pool while the event loop keeps serving other connections.
+"""
+
+import asyncio
+import collections
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import images, tools
+from .client import Client
+from .provider import ProviderFactory, is_rate_limit_error
+from .scheduler import RequestShedError
+from .utils import json_codec
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_MAX_WORKERS = 64
+
+# Largest accepted request head and body, in bytes.
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+# Most distinct models given their own metrics label; later ones are counted as "other".
+MAX_MODEL_LABELS = 256
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message, error_type="invalid_request_error"):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+class GatewayMetrics:
+    """
+    Thread-safe request counters, exposed in Prometheus text format.
+
+    Models come from request bodies, so their labels are bounded: models of unknown
+    providers are counted as "invalid", and models beyond the first max_model_labels
+    as "other".
+    """
+
+    def __init__(self, max_model_labels: int = MAX_MODEL_LABELS):
+        self._lock = threading.Lock()
+        self.requests = collections.Counter()
+        self.latency_sum = collections.Counter()
+        self.in_flight = 0
+        self.max_model_labels = max_model_labels
+
+    def start(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, model, status, latency):
+        with self._lock:
+            self.in_flight -= 1
+            model = self._model_label(model)
+            self.requests[(model, status)] += 1
+            self.latency_sum[model] += latency
+
+    def _model_label(self, model):
+        if not isinstance(model, str):
+            return "invalid"
+        provider_key, separator, _ = model.partition(":")
+        if (
+            not separator
+            or provider_key not in ProviderFactory.get_supported_providers()
+        ):
+            return "invalid"
+        if model not in self.latency_sum and len(self.latency_sum) >= (
+            self.max_model_labels
+        ):
+            return "other"
+        return model
+
+    def render(self, client):
+        lines = [
+            "# TYPE aisuite_requests_total counter",
+            "# TYPE aisuite_request_duration_seconds_sum counter",
+            "# TYPE aisuite_requests_in_flight gauge",
+        ]
+        with self._lock:
+            for (model, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'aisuite_requests_total{{model="{_escape_label(model)}",status="{status}"}} {count}'
+                )
+            for model, total in sorted(self.latency_sum.items()):
+                lines.append(
+                    f'aisuite_request_duration_seconds_sum{{model="{_escape_label(model)}"}} {total:.6f}'
+                )
+            lines.append(f"aisuite_requests_in_flight {self.in_flight}")
+
+        cache = client.cache
+        if cache is not None:
+            lines.append("# TYPE aisuite_cache_hits_total counter")
+            lines.append(f"aisuite_cache_hits_total {cache.hits}")
+            lines.append("# TYPE aisuite_cache_misses_total counter")
+            lines.append(f"aisuite_cache_misses_total {cache.misses}")
+
+        scheduler = client.scheduler
+        if scheduler is not None:
+            lines.append("# TYPE aisuite_scheduler_active gauge")
+            lines.append("# TYPE aisuite_scheduler_queued gauge")
+            for provider_key in sorted(client.providers):
+                stats = scheduler.stats(provider_key)
+                lines.append(
+                    f'aisuite_scheduler_active{{provider="{provider_key}"}} {stats["active"]}'
+                )
+                lines.append(
+                    f'aisuite_scheduler_queued{{provider="{provider_key}"}} {stats["queued"]}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    """Escape a label value as the Prometheus text format requires."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def response_to_dict(response, model):
+    """Convert a chat completion response from any provider to an OpenAI JSON object."""
+    if hasattr(response, "model_dump"):
+        return response.model_dump(exclude_none=True)
+    choices = []
+    for index, choice in enumerate(response.choices):
+        message = {
+            "role": getattr(choice.message, "role", None) or "assistant",
+            "content": choice.message.content,
+        }
+        if getattr(choice.message, "tool_calls", None):
+            message["tool_calls"] = tools.assistant_message(choice.message)[
+                "tool_calls"
+            ]
+        choices.append(
+            {
+                "index": index,
+                "message": message,
+                "finish_reason": getattr(choice, "finish_reason", None) or "stop",
+            }
+        )
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": choices,
+    }
+
+
+def _chunk(base, index, delta, finish_reason=None):
+    return {
+        **base,
+        "choices": [{"index": index, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _chunk_base(model, completion_id=None, created=None):
+    return {
+        "id": completion_id or f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion.chunk",
+        "created": created or int(time.time()),
+        "model": model,
+    }
+
+
+def completion_to_chunks(completion):
+    """Split an OpenAI chat completion object into streaming chunks."""
+    base = _chunk_base(
+        completion.get("model"), completion.get("id"), completion.get("created")
+    )
+    for choice in completion["choices"]:
+        message = choice.get("message") or {}
+        delta = {"role": message.get("role", "assistant")}
+        if message.get("content") is not None:
+            delta["content"] = message["content"]
+        yield _chunk(base, choice["index"], delta)
+        yield _chunk(base, choice["index"], {}, choice.get("finish_reason") or "stop")
+
+
+class Gateway:
+    """
+    Serves a Client over HTTP.
+
+    Example:
+        client = Client(provider_configs, scheduler=Scheduler({"openai": 32}))
+        asyncio.run(Gateway(client).serve_forever())
+    """
+
+    def __init__(
+        self,
+        client: Client = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        allow_remote_images: bool = False,
+    ):
+        """
+        Args:
+            client (Client): The client requests are routed through. Defaults to a
+                Client with shared providers and no provider configs.
+            host (str): Interface to listen on.
+            port (int): Port to listen on. 0 picks a free port.
+            max_workers (int): Threads available for concurrent provider calls.
+            allow_remote_images (bool): Accept http(s) image URLs, which the server
+                may fetch itself. Only data URLs are accepted by default.
+        """
+        self.client = client or Client(share_providers=True)
+        self.host = host
+        self.port = port
+        self.allow_remote_images = allow_remote_images
+        self.metrics = GatewayMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._server = None
+
+    async def start(self):
+        """Start listening. The bound port is available as `port` afterwards."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._dispatch(writer, method, path, body)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            await self._send_error(writer, _HTTPError(413, "Request head too large."))
+            return None
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            await self._send_error(writer, _HTTPError(400, "Malformed request line."))
+            return None
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            await self._send_error(writer, _HTTPError(400, "Invalid Content-Length."))
+            return None
+        if length > MAX_BODY_BYTES:
+            await self._send_error(writer, _HTTPError(413, "Request body too large."))
+            return None
+        body = await reader.readexactly(length) if length else b""
+        return method, target.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, writer, method, path, body):
+        if path == "/v1/chat/completions":
+            if method != "POST":
+                await self._send_error(writer, _HTTPError(405, "Use POST."))
+                return
+            await self._chat_completions(writer, body)
+        elif path == "/metrics" and method == "GET":
+            text = self.metrics.render(self.client).encode("utf-8")
+            await self._send(writer, 200, text, "text/plain; version=0.0.4")
+        elif path == "/health" and method == "GET":
+            await self._send(writer, 200, b'{"status":"ok"}', "application/json")
+        else:
+            await self._send_error(writer, _HTTPError(404, f"Unknown path {path}."))
+
+    async def _chat_completions(self, writer, body):
+        try:
+            request = json_codec.loads(body)
+            model = request.pop("model")
+            messages = request.pop("messages")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            await self._send_error(
+                writer, _HTTPError(400, "Expected a JSON body with model and messages.")
+            )
+            return
+        try:
+            _check_image_sources(messages, self.allow_remote_images)
+        except _HTTPError as error:
+            await self._send_error(writer, error)
+            return
+
+        stream = request.pop("stream", False)
+        request.pop("stream_options", None)
+        if stream and (request.get("n") or 1) == 1:
+            await self._stream_completion(writer, model, messages, request)
+            return
+
+        self.metrics.start()
+        start = time.monotonic()
+        status = 200
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                lambda: self.client.chat.completions.create(model, messages, **request),
+            )
+            completion = response_to_dict(response, model)
+        except Exception as error:
+            http_error = _to_http_error(error)
+            status = http_error.status
+            await self._send_error(writer, http_error)
+            return
+        finally:
+            self.metrics.finish(model, status, time.monotonic() - start)
+
+        if stream:
+            await self._send_stream(writer, completion_to_chunks(completion))
+        else:
+            await self._send(
+                writer, 200, json_codec.dumps(completion), "application/json"
+            )
+
+    async def _stream_completion(self, writer, model, messages, request):
+        """Relay the provider's stream as it arrives, one SSE event per text delta."""
+        loop = asyncio.get_running_loop()
+        deltas = self.client.chat.completions.stream(model, messages, **request)
+        self.metrics.start()
+        start = time.monotonic()
+        status = 200
+        try:
+            try:
+                # The first delta is awaited before the status line is sent, so
+                # errors such as rate limits get their proper HTTP status.
+                delta = await loop.run_in_executor(self._executor, next, deltas, None)
+            except Exception as error:
+                http_error = _to_http_error(error)
+                status = http_error.status
+                await self._send_error(writer, http_error)
+                return
+
+            await self._start_stream(writer)
+            base = _chunk_base(model)
+            await self._write_event(
+                writer, _chunk(base, 0, {"role": "assistant", "content": ""})
+            )
+            try:
+                while delta is not None:
+                    if delta:
+                        await self._write_event(
+                            writer, _chunk(base, 0, {"content": delta})
+                        )
+                    delta = await loop.run_in_executor(
+                        self._executor, next, deltas, None
+                    )
+                await self._write_event(writer, _chunk(base, 0, {}, "stop"))
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as error:
+                # Headers are already sent; report the failure in the stream.
+                http_error = _to_http_error(error)
+                status = http_error.status
+                await self._write_event(
+                    writer,
+                    {"error": {"message": str(error), "type": http_error.error_type}},
+                )
+            await self._end_stream(writer)
+        finally:
+            deltas.close()
+            self.metrics.finish(model, status, time.monotonic() - start)
+
+    async def _send(self, writer, status, body, content_type):
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+    async def _send_stream(self, writer, chunks):
+        await self._start_stream(writer)
+        for chunk in chunks:
+            await self._write_event(writer, chunk)
+        await self._end_stream(writer)
+
+    async def _start_stream(self, writer):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        await writer.drain()
+
+    async def _end_stream(self, writer):
+        await self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _write_event(self, writer, data):
+        await self._write_chunk(writer, b"data: " + json_codec.dumps(data) + b"\n\n")
+
+    async def _write_chunk(self, writer, data):
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+
+    async def _send_error(self, writer, error):
+        body = json_codec.dumps(
+            {"error": {"message": str(error), "type": error.error_type}}
+        )
+        await self._send(writer, error.status, body, "application/json")
+
+
+def _check_image_sources(messages, allow_remote_images):
+    """
+    Reject image parts that would make the server read its own files or, unless
+    allowed, fetch URLs on the client's behalf.
+    """
+    allowed = ("data:", "http://", "https://") if allow_remote_images else ("data:",)
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            try:
+                source = images.image_source(part)
+            except (KeyError, TypeError):
+                raise _HTTPError(400, "Malformed image part.")
+            if source is not None and not (
+                isinstance(source, str) and source.startswith(allowed)
+            ):
+                kinds = "data or http(s) URLs" if allow_remote_images else "data URLs"
+                raise _HTTPError(400, f"Images must be {kinds}.")
+
+
+def _to_http_error(error):
+    if isinstance(error, _HTTPError):
+        return error
+    if isinstance(error, RequestShedError):
+        return _HTTPError(503, str(error), "overloaded_error")
+    if is_rate_limit_error(error):
+        return _HTTPError(429, str(error), "rate_limit_error")
+    if isinstance(error, ValueError):
+        return _HTTPError(400, str(error))
+    return _HTTPError(500, str(error), "api_error")
+
+
+def serve(
+    client: Client = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    allow_remote_images: bool = False,
+):
+    """Run a Gateway until interrupted."""
+    gateway = Gateway(
+        client,
+        host=host,
+        port=port,
+        max_workers=max_workers,
+        allow_remote_images=allow_remote_images,
+    )
+    asyncio.run(gateway.serve_forever())
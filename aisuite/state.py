@@ -0,0 +1,157 @@
+"""Storage backends for rate-limit buckets and cached responses.
+
+MemoryStateBackend keeps state inside one process. SQLiteStateBackend keeps it in a
+local SQLite file, so every worker process on a host shares the same quota and cache
+without running an external service.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+# Expired cache rows are purged once every this many writes.
+_PURGE_INTERVAL = 256
+
+
+class MemoryStateBackend:
+    """Per-process state. This is the default when no backend is given."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._cache = {}
+
+    def take_token(self, key, rate, capacity):
+        """
+        Take one token from the bucket if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def cache_get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.time():
+                del self._cache[key]
+                return None
+            return value
+
+    def cache_set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._cache[key] = (value, expires)
+
+
+class SQLiteStateBackend:
+    """
+    State shared by all processes on a host through a local SQLite database.
+
+    Bucket updates run in IMMEDIATE transactions, so concurrent workers never spend
+    the same token. Connections are opened per thread and re-opened after os.fork(),
+    so the backend can be created before a pre-fork server starts its workers.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        """
+        Args:
+            path (str): Path of the database file, e.g. "/tmp/aisuite-state.db".
+            timeout (float): Seconds to wait for another process holding the write lock.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL
+            );
+            """
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # isolation_level=None leaves transaction control to the explicit BEGINs below.
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take_token(self, key, rate, capacity):
+        """
+        Take one token from the bucket if available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def cache_get(self, key):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def cache_set(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, value, expires),
+        )
+        with self._writes_lock:
+            self._writes += 1
+            purge = self._writes % _PURGE_INTERVAL == 0
+        if purge:
+            conn.execute("DELETE FROM cache WHERE expires <= ?", (now,))
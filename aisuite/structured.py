@@ -0,0 +1,264 @@
+"""Incremental parsing of JSON that arrives as a stream of text chunks.
+
+Structured (JSON mode) responses can be consumed while they are generated: the items
+of an array are yielded as soon as each one closes, instead of after the whole
+completion has arrived and been parsed.
+"""
+
+import bisect
+import json
+import re
+
+from .provider import LLMError
+
+
+# Marks an object or array item that was reported when it closed.
+_TAKEN = -1
+
+# The characters that end a run of plain characters in a string.
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class StructuredOutputError(LLMError):
+    """Raised when streamed output is not valid JSON or does not match the schema."""
+
+
+class JSONStreamParser:
+    """
+    Parses a JSON document fed in chunks and reports the items of one array as they close.
+
+    Each chunk's characters are scanned once, and each completed item is decoded once
+    from its slice of the text. Chunks are kept only until the text they hold has been
+    decoded, so the cost of a feed does not grow with the length of the stream.
+    Text before the document and after it, such as a Markdown code fence, is ignored.
+
+    Example:
+        parser = JSONStreamParser(path=("results",))
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+        document = parser.close()
+    """
+
+    def __init__(self, path=()):
+        """
+        Args:
+            path (tuple): Keys (or indices) leading from the top-level value to the
+                array whose items are reported. The empty path is the top-level value.
+        """
+        self.path = tuple(path)
+        self.document = None
+        # Chunks that may still be needed, and the position of each in the stream.
+        # Chunks before _first have been dropped.
+        self._chunks = []
+        self._offsets = []
+        self._first = 0
+        self._pos = 0
+        self._start = None
+        self._done = False
+        # One frame per open container: [bracket, key or index, expecting_key].
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._item_start = None
+        # The document without the reported items, which are replaced by 0s, and the
+        # position up to which its text has been collected.
+        self._skeleton = []
+        self._skeleton_end = None
+        self._items = []
+
+    def feed(self, chunk):
+        """Add a chunk of text and return the items completed by it."""
+        if self._done or not chunk:
+            return []
+        base = self._pos
+        self._chunks.append(chunk)
+        self._offsets.append(base)
+        self._pos += len(chunk)
+        items = []
+        j = 0
+        while j < len(chunk):
+            char = chunk[j]
+            i = base + j
+            j += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(i)
+                else:
+                    # Skip to the next quote or backslash.
+                    match = _STRING_SPECIAL.search(chunk, j)
+                    j = match.start() if match else len(chunk)
+                continue
+
+            if self._start is None:
+                if char not in "{[":
+                    continue
+                self._start = self._skeleton_end = i
+
+            in_target = self._in_target_array()
+            if (
+                in_target
+                and self._item_start is None
+                and not char.isspace()
+                and char not in ",]"
+            ):
+                self._item_start = i
+                self._skeleton.append(self._slice(self._skeleton_end, i))
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == "{":
+                self._stack.append(["{", None, True])
+            elif char == "[":
+                self._stack.append(["[", 0, False])
+            elif char in "}]":
+                if in_target:
+                    # The target array closes; a pending scalar item ends here.
+                    if self._item_start not in (None, _TAKEN):
+                        items.append(self._take_item(self._item_start, i))
+                    self._item_start = None
+                self._stack.pop()
+                if not self._stack:
+                    self._finish(i)
+                    return items
+                if self._in_target_array() and self._item_start is not None:
+                    # An object or array item closes.
+                    items.append(self._take_item(self._item_start, i + 1))
+                    self._item_start = _TAKEN
+            elif char == ",":
+                frame = self._stack[-1]
+                if frame[0] == "{":
+                    frame[2] = True
+                else:
+                    frame[1] += 1
+                if in_target:
+                    if self._item_start not in (None, _TAKEN):
+                        items.append(self._take_item(self._item_start, i))
+                    self._item_start = None
+        self._drop_chunks()
+        return items
+
+    def close(self):
+        """Return the complete document, raising if the stream ended before it closed."""
+        if not self._done:
+            raise StructuredOutputError(
+                "The stream ended before the JSON document was complete."
+            )
+        return self.document
+
+    def _in_target_array(self):
+        if len(self._stack) != len(self.path) + 1 or self._stack[-1][0] != "[":
+            return False
+        return all(frame[1] == key for frame, key in zip(self._stack, self.path))
+
+    def _slice(self, start, end):
+        """Return the text from position start to end, which must not be dropped."""
+        i = bisect.bisect_right(self._offsets, start, self._first) - 1
+        parts = []
+        while start < end:
+            offset, chunk = self._offsets[i], self._chunks[i]
+            parts.append(chunk[start - offset : end - offset])
+            start = offset + len(chunk)
+            i += 1
+        return "".join(parts)
+
+    def _drop_chunks(self):
+        # Text before the skeleton's end is not needed again; pending items and keys
+        # start after it.
+        needed = self._pos if self._start is None else self._skeleton_end
+        first = self._first
+        while first < len(self._chunks) - 1 and self._offsets[first + 1] <= needed:
+            self._chunks[first] = None
+            first += 1
+        if first > 32 and first * 2 > len(self._chunks):
+            del self._chunks[:first], self._offsets[:first]
+            first = 0
+        self._first = first
+
+    def _end_string(self, i):
+        if self._stack and self._stack[-1][0] == "{" and self._stack[-1][2]:
+            self._stack[-1][1] = json.loads(self._slice(self._string_start, i + 1))
+            self._stack[-1][2] = False
+
+    def _take_item(self, start, end):
+        try:
+            item = json.loads(self._slice(start, end))
+        except ValueError as error:
+            raise StructuredOutputError(f"Invalid JSON in streamed output: {error}")
+        self._items.append(item)
+        self._skeleton.append("0")
+        self._skeleton_end = end
+        return item
+
+    def _finish(self, i):
+        self._done = True
+        self._skeleton.append(self._slice(self._skeleton_end, i + 1))
+        try:
+            document = json.loads("".join(self._skeleton))
+        except ValueError as error:
+            raise StructuredOutputError(f"Invalid JSON in streamed output: {error}")
+        if self._items:
+            # Put the decoded items back in place of their 0 placeholders.
+            if not self.path:
+                document = self._items
+            else:
+                parent = document
+                for key in self.path[:-1]:
+                    parent = parent[key]
+                parent[self.path[-1]] = self._items
+        self.document = document
+        self._chunks, self._offsets, self._first = [], [], 0
+
+
+def iter_json(chunks, path=None, schema=None):
+    """
+    Yield JSON values from a stream of text chunks as soon as they are complete.
+
+    Args:
+        chunks (iterable): Text deltas of a streamed completion.
+        path (str or tuple): Key, or keys, of the array whose items are yielded, e.g.
+            "results" for {"results": [...]}. By default the items of a top-level
+            array are yielded, and any other top-level value is yielded once complete.
+        schema (dict): Optional JSON schema every yielded value must match (requires
+            the jsonschema package).
+    """
+    if isinstance(path, str):
+        path = (path,)
+    validator = _schema_validator(schema) if schema is not None else None
+    parser = JSONStreamParser(path or ())
+    yielded = False
+
+    def checked(value):
+        if validator is not None:
+            errors = sorted(validator.iter_errors(value), key=str)
+            if errors:
+                raise StructuredOutputError(
+                    f"Streamed value does not match the schema: {errors[0].message}"
+                )
+        return value
+
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yielded = True
+            yield checked(item)
+
+    document = parser.close()
+    if path is None and not yielded and not isinstance(document, list):
+        yield checked(document)
+
+
+def _schema_validator(schema):
+    try:
+        import jsonschema
+    except ImportError:
+        raise ImportError(
+            "Schema validation requires the jsonschema package. Install it with `pip install jsonschema`."
+        )
+    return jsonschema.Draft202012Validator(schema)
@@ -0,0 +1,316 @@
+"""Tool calling: tool definitions from Python functions, and a loop that runs the tools.
+
+Tools and tool calls use OpenAI's format for every provider. Tools are passed as
+`tools=[{"type": "function", "function": {...}}]`, responses carry
+`message.tool_calls`, and tool results are sent back as "tool" messages. Providers
+with another format translate to and from it.
+"""
+
+import asyncio
+import collections
+import inspect
+import json
+import re
+import typing
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .framework import ToolCall
+from .provider import LLMError
+
+DEFAULT_MAX_STEPS = 10
+DEFAULT_MAX_WORKERS = 8
+
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    tuple: "array",
+    dict: "object",
+}
+
+# "name (type): description" or "name: description" lines of a docstring's Args section.
+_ARG_LINE = re.compile(r"^\s*(\w+)\s*(?:\([^)]*\))?\s*:\s*(.+)$")
+
+# The result of run_tools: the final response, the conversation including the
+# assistant's tool calls and the tool results, and the number of model calls made.
+ToolRun = collections.namedtuple("ToolRun", ["response", "messages", "steps"])
+
+
+def tool_spec(func):
+    """
+    Return the OpenAI tool definition of a Python function.
+
+    The description is the first paragraph of the docstring. Parameters are typed
+    from the annotations, described from the docstring's Args section, and required
+    unless they have a default.
+    """
+    doc = inspect.getdoc(func) or ""
+    description = doc.split("\n\n", 1)[0].replace("\n", " ")
+    arg_docs = _arg_docs(doc)
+    hints = typing.get_type_hints(func)
+
+    properties = {}
+    required = []
+    for name, parameter in inspect.signature(func).parameters.items():
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        schema = _json_schema(hints.get(name))
+        if name in arg_docs:
+            schema["description"] = arg_docs[name]
+        properties[name] = schema
+        if parameter.default is parameter.empty:
+            required.append(name)
+
+    return {
+        "type": "function",
+        "function": {
+            "name": func.__name__,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+            },
+        },
+    }
+
+
+def _arg_docs(doc):
+    docs = {}
+    in_args = False
+    for line in doc.splitlines():
+        if line.strip() in ("Args:", "Arguments:", "Parameters:"):
+            in_args = True
+            continue
+        if in_args:
+            if line and not line[0].isspace():
+                break
+            match = _ARG_LINE.match(line)
+            if match:
+                docs[match.group(1)] = match.group(2).strip()
+    return docs
+
+
+def _json_schema(annotation):
+    if annotation is None:
+        return {}
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _json_schema(args[0]) if len(args) == 1 else {}
+    if origin is typing.Literal:
+        return {"enum": list(typing.get_args(annotation))}
+    if origin in (list, tuple):
+        args = typing.get_args(annotation)
+        schema = {"type": "array"}
+        if args and args[0] is not Ellipsis:
+            schema["items"] = _json_schema(args[0])
+        return schema
+    json_type = _JSON_TYPES.get(origin or annotation)
+    return {"type": json_type} if json_type else {}
+
+
+def function_of(tool):
+    """Return the "function" part of an OpenAI tool definition."""
+    return tool["function"] if "function" in tool else tool
+
+
+def parse_arguments(arguments):
+    """Return a tool call's arguments as a dict. Providers send a JSON string or a dict."""
+    if not arguments:
+        return {}
+    if isinstance(arguments, str):
+        return json.loads(arguments)
+    return dict(arguments)
+
+
+def tool_calls_from_dicts(tool_calls):
+    """
+    Build ToolCalls from OpenAI style tool call dicts, e.g. from a JSON response.
+
+    Calls without an id (Ollama sends none) are given one, and dict arguments are
+    encoded as JSON.
+    """
+    if not tool_calls:
+        return None
+    calls = []
+    for tool_call in tool_calls:
+        function = tool_call.get("function", {})
+        arguments = function.get("arguments")
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments or {})
+        calls.append(
+            ToolCall(
+                tool_call.get("id") or f"call_{uuid.uuid4().hex}",
+                function.get("name"),
+                arguments,
+            )
+        )
+    return calls
+
+
+def assistant_message(message):
+    """Return a response message, with its tool calls, as an OpenAI message dict."""
+    return {
+        "role": "assistant",
+        "content": message.content,
+        "tool_calls": [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": (
+                        tool_call.function.arguments
+                        if isinstance(tool_call.function.arguments, str)
+                        else json.dumps(tool_call.function.arguments or {})
+                    ),
+                },
+            }
+            for tool_call in message.tool_calls
+        ],
+    }
+
+
+def _tool_message(tool_call, result):
+    if not isinstance(result, str):
+        result = json.dumps(result, default=str)
+    return {"role": "tool", "tool_call_id": tool_call.id, "content": result}
+
+
+def _registry(tools):
+    registry = {}
+    for tool in tools:
+        if not callable(tool):
+            raise TypeError(f"Tools must be functions, got {tool!r}.")
+        registry[tool.__name__] = tool
+    return registry
+
+
+def _prepare_call(registry, tool_call):
+    """Return the function and arguments of a tool call, or the error to report."""
+    func = registry.get(tool_call.function.name)
+    if func is None:
+        return None, None, f"Error: unknown tool '{tool_call.function.name}'."
+    try:
+        return func, parse_arguments(tool_call.function.arguments), None
+    except ValueError as error:
+        return None, None, f"Error: the arguments are not valid JSON: {error}"
+
+
+def _run_call(registry, tool_call):
+    func, arguments, error = _prepare_call(registry, tool_call)
+    if error is not None:
+        return _tool_message(tool_call, error)
+    try:
+        return _tool_message(tool_call, func(**arguments))
+    except Exception as error:
+        return _tool_message(tool_call, f"Error: {type(error).__name__}: {error}")
+
+
+async def _arun_call(registry, tool_call):
+    func, arguments, error = _prepare_call(registry, tool_call)
+    if error is not None:
+        return _tool_message(tool_call, error)
+    try:
+        if inspect.iscoroutinefunction(func):
+            result = await func(**arguments)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: func(**arguments)
+            )
+        return _tool_message(tool_call, result)
+    except Exception as error:
+        return _tool_message(tool_call, f"Error: {type(error).__name__}: {error}")
+
+
+def run_tools(
+    client,
+    model,
+    messages: list,
+    tools: list,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    **kwargs,
+):
+    """
+    Let a model call Python functions until it answers without tool calls.
+
+    All tool calls of one turn run concurrently in a thread pool, so a turn takes as
+    long as its slowest tool. Results, and errors raised by tools, are sent back to
+    the model as tool messages.
+
+    Example:
+        def get_weather(city: str) -> dict:
+            ...  # The docstring describes the tool to the model.
+
+        run = run_tools(client, "anthropic:claude-3-5-sonnet-20240620", messages, [get_weather])
+        print(run.response.choices[0].message.content)
+
+    Args:
+        client (Client): The client requests are sent through.
+        model (str): The 'provider:model' to use.
+        messages (list): The conversation so far. It is not modified.
+        tools (list): Functions the model may call. See tool_spec.
+        max_steps (int): Maximum number of model calls.
+        max_workers (int): Maximum tools running at once.
+        kwargs (dict): Extra arguments for every request, e.g. temperature.
+
+    Returns:
+        ToolRun: The final response, the whole conversation and the number of steps.
+
+    Raises:
+        LLMError: If the model still calls tools after max_steps calls.
+    """
+    registry = _registry(tools)
+    specs = [tool_spec(tool) for tool in tools]
+    messages = list(messages)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for step in range(1, max_steps + 1):
+            response = client.chat.completions.create(
+                model, messages, tools=specs, **kwargs
+            )
+            message = response.choices[0].message
+            if not getattr(message, "tool_calls", None):
+                return ToolRun(response, messages, step)
+            messages.append(assistant_message(message))
+            calls = message.tool_calls
+            if len(calls) == 1:
+                messages.append(_run_call(registry, calls[0]))
+            else:
+                messages.extend(pool.map(lambda call: _run_call(registry, call), calls))
+    raise LLMError(f"The model was still calling tools after {max_steps} steps.")
+
+
+async def arun_tools(
+    client,
+    model,
+    messages: list,
+    tools: list,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    **kwargs,
+):
+    """
+    Like run_tools, on an event loop. Coroutine function tools are awaited together,
+    and other tools run in the loop's default executor.
+    """
+    registry = _registry(tools)
+    specs = [tool_spec(tool) for tool in tools]
+    messages = list(messages)
+    for step in range(1, max_steps + 1):
+        response = await client.chat.completions.acreate(
+            model, messages, tools=specs, **kwargs
+        )
+        message = response.choices[0].message
+        if not getattr(message, "tool_calls", None):
+            return ToolRun(response, messages, step)
+        messages.append(assistant_message(message))
+        messages.extend(
+            await asyncio.gather(
+                *(_arun_call(registry, call) for call in message.tool_calls)
+            )
+        )
+    raise LLMError(f"The model was still calling tools after {max_steps} steps.")
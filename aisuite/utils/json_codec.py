@@ -0,0 +1,120 @@
+"""JSON encoding and decoding for the HTTP based providers.
+
+orjson or msgspec are used when installed, falling back to the standard library.
+When msgspec is available, responses can be decoded against a schema so that only
+the fields a provider reads are materialized; all other fields are skipped while parsing.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional, TypedDict
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+_msgspec_encoder = msgspec.json.Encoder() if msgspec is not None else None
+_msgspec_decoders = {}
+
+
+def dumps(data) -> bytes:
+    """Serialize data to UTF-8 encoded JSON."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    if _msgspec_encoder is not None:
+        return _msgspec_encoder.encode(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data, schema=None):
+    """
+    Deserialize JSON bytes or str.
+
+    Args:
+        data (bytes or str): The JSON document.
+        schema (type): Optional TypedDict describing the fields to keep. With msgspec
+            installed, fields not in the schema are skipped while parsing. Without it,
+            the whole document is returned.
+
+    Raises:
+        ValueError: If the data is not valid JSON or does not match the schema, with
+            every backend.
+    """
+    if schema is not None and msgspec is not None:
+        decoder = _msgspec_decoders.get(schema)
+        if decoder is None:
+            decoder = _msgspec_decoders[schema] = msgspec.json.Decoder(schema)
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as error:  # Includes ValidationError.
+            raise ValueError(f"Invalid JSON document: {error}") from error
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_request(data, compress_threshold=None):
+    """
+    Serialize a request body, gzip-compressing it when it is larger than the threshold.
+
+    Returns:
+        A tuple of the body bytes and the headers that describe it.
+    """
+    body = dumps(data)
+    headers = {"Content-Type": "application/json"}
+    if compress_threshold is not None and len(body) >= compress_threshold:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+class ToolCallSchema(TypedDict, total=False):
+    id: str
+    type: str
+    # The arguments are a JSON string, or an object for some servers (e.g. Ollama).
+    function: Dict[str, Any]
+
+
+class MessageSchema(TypedDict, total=False):
+    role: str
+    content: Optional[str]
+    tool_calls: List[ToolCallSchema]
+
+
+class ChoiceSchema(TypedDict, total=False):
+    message: MessageSchema
+    finish_reason: Optional[str]
+    # {"content": [...]} in the chat format, or {"tokens": [...], ...} from some servers.
+    logprobs: Optional[Dict[str, Any]]
+
+
+class ChatCompletionSchema(TypedDict, total=False):
+    """The fields of an OpenAI style chat completion that the providers normalize."""
+
+    choices: List[ChoiceSchema]
+
+
+class ChunkChoiceSchema(TypedDict, total=False):
+    delta: MessageSchema
+
+
+class ChatCompletionChunkSchema(TypedDict, total=False):
+    """The fields of an OpenAI style streamed chunk that the providers normalize."""
+
+    choices: List[ChunkChoiceSchema]
+    # Sent in the last chunk when requested with stream_options.
+    usage: Optional[Dict[str, Any]]
@@ -0,0 +1,141 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from aisuite import AdaptiveLimiter, Client, RequestShedError, Scheduler
+from aisuite.provider import LLMError
+
+
+class ThrottledError(LLMError):
+    status_code = 429
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_throttling_cuts_the_limit_once_per_window(self):
+        limiter = AdaptiveLimiter(initial=8)
+        barrier = threading.Barrier(4)
+
+        def throttled():
+            barrier.wait()
+            raise ThrottledError("Too many requests")
+
+        call = limiter.wrap("aws", throttled)
+
+        def run():
+            with self.assertRaises(ThrottledError):
+                call()
+
+        # Four calls in flight together are throttled together: one cut.
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(limiter.stats("aws")["limit"], 4)
+
+        # A call started after the cut cuts again.
+        barrier = threading.Barrier(1)
+        with self.assertRaises(ThrottledError):
+            call()
+        self.assertEqual(
+            limiter.stats("aws"), {"limit": 2, "active": 0, "latency": None}
+        )
+
+    def test_limit_is_not_cut_below_min_limit(self):
+        limiter = AdaptiveLimiter(initial=2, min_limit=1)
+        for _ in range(5):
+            with self.assertRaises(ThrottledError):
+                with limiter.slot("azure"):
+                    raise ThrottledError("Too many requests")
+        self.assertEqual(limiter.stats("azure")["limit"], 1)
+
+    def test_other_errors_leave_the_limit_unchanged(self):
+        limiter = AdaptiveLimiter(initial=2)
+        with self.assertRaises(ValueError):
+            with limiter.slot("openai"):
+                raise ValueError("bad request")
+        self.assertEqual(limiter.stats("openai")["limit"], 2)
+
+    def test_healthy_calls_raise_the_limit_additively(self):
+        limiter = AdaptiveLimiter(initial=1, max_limit=3, latency_factor=None)
+
+        # Each call fills the single slot, so each one counts.
+        with limiter.slot("groq"):
+            pass
+        self.assertEqual(limiter.stats("groq")["limit"], 2)
+
+        # A call that leaves a slot unused is no evidence for more capacity.
+        with limiter.slot("groq"):
+            pass
+        self.assertEqual(limiter.stats("groq")["limit"], 2)
+
+        for _ in range(10):
+            with limiter.slot("groq"), limiter.slot("groq"):
+                pass
+        self.assertEqual(limiter.stats("groq")["limit"], 3)
+
+    def test_latency_spike_cuts_the_limit(self):
+        limiter = AdaptiveLimiter(initial=4, latency_factor=3.0)
+        for _ in range(5):
+            with limiter.slot("openai"):
+                pass
+        with limiter.slot("openai"):
+            time.sleep(0.05)
+        self.assertEqual(limiter.stats("openai")["limit"], 2)
+
+    def test_calls_wait_for_a_free_slot(self):
+        limiter = AdaptiveLimiter(initial=1)
+        started = threading.Event()
+
+        def run():
+            with limiter.slot("ollama"):
+                started.set()
+
+        with limiter.slot("ollama"):
+            thread = threading.Thread(target=run)
+            thread.start()
+            self.assertFalse(started.wait(0.05))
+        thread.join()
+        self.assertTrue(started.is_set())
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_client_calls_go_through_adaptive_limiter(self, mock_create):
+        limiter = AdaptiveLimiter(initial=4)
+        mock_create.side_effect = ThrottledError("Too many requests")
+
+        client = Client({"openai": {"api_key": "key"}}, adaptive_limiter=limiter)
+        with self.assertRaises(ThrottledError):
+            client.chat.completions.create(
+                "openai:gpt-4o", [{"role": "user", "content": "Hi"}]
+            )
+
+        self.assertEqual(limiter.stats("openai")["limit"], 2)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_adaptive_wait_counts_against_queue_timeout(self, mock_create):
+        limiter = AdaptiveLimiter(initial=1)
+        scheduler = Scheduler(limits={"openai": 4})
+        client = Client(
+            {"openai": {"api_key": "key"}},
+            scheduler=scheduler,
+            adaptive_limiter=limiter,
+        )
+
+        with limiter.slot("openai"):
+            start = time.monotonic()
+            with self.assertRaises(RequestShedError):
+                client.chat.completions.create(
+                    "openai:gpt-4o",
+                    [{"role": "user", "content": "Hi"}],
+                    queue_timeout=0.05,
+                )
+            self.assertLess(time.monotonic() - start, 1)
+
+        mock_create.assert_not_called()
+        self.assertEqual(scheduler.stats("openai"), {"active": 0, "queued": 0})
+        self.assertEqual(limiter.stats("openai")["active"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
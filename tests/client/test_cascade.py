@@ -0,0 +1,93 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from aisuite import Cascade, Client
+from aisuite.framework import ChatCompletionResponse
+from aisuite.provider import LLMError
+
+
+def make_response(content):
+    response = ChatCompletionResponse()
+    response.choices[0].message.content = content
+    return response
+
+
+class TestCascade(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(
+            {"groq": {"api_key": "groq-api-key"}, "openai": {"api_key": "key"}}
+        )
+        self.messages = [{"role": "user", "content": "Give me JSON."}]
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    @patch("aisuite.providers.groq_provider.GroqProvider.chat_completions_create")
+    def test_first_accepted_tier_serves(self, mock_groq, mock_openai):
+        mock_groq.return_value = make_response(json.dumps({"answer": 42}))
+        results = []
+        cascade = Cascade(
+            ["groq:llama3-8b", "openai:gpt-4o"],
+            validator={"type": "object", "required": ["answer"]},
+            on_result=lambda model, tier, response: results.append((model, tier)),
+        )
+
+        response = self.client.chat.completions.create(cascade, self.messages)
+
+        self.assertEqual(json.loads(response.choices[0].message.content)["answer"], 42)
+        mock_openai.assert_not_called()
+        self.assertEqual(results, [("groq:llama3-8b", 0)])
+        self.assertEqual(cascade.served["groq:llama3-8b"], 1)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    @patch("aisuite.providers.groq_provider.GroqProvider.chat_completions_create")
+    def test_rejected_answer_escalates(self, mock_groq, mock_openai):
+        mock_groq.return_value = make_response("not json")
+        mock_openai.return_value = make_response('{"answer": 1}')
+        cascade = Cascade(
+            ["groq:llama3-8b", "openai:gpt-4o"],
+            validator={"type": "object", "required": ["answer"]},
+        )
+
+        response = self.client.chat.completions.create(
+            cascade, self.messages, temperature=0
+        )
+
+        self.assertEqual(response.choices[0].message.content, '{"answer": 1}')
+        mock_openai.assert_called_once_with("gpt-4o", self.messages, temperature=0)
+        self.assertEqual(cascade.rejected["groq:llama3-8b"], 1)
+        self.assertEqual(cascade.served["openai:gpt-4o"], 1)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    @patch("aisuite.providers.groq_provider.GroqProvider.chat_completions_create")
+    def test_failed_tier_escalates_and_confidence_rule(self, mock_groq, mock_openai):
+        mock_groq.side_effect = LLMError("unavailable")
+        mock_openai.return_value = make_response("0.4")
+        cascade = Cascade(
+            ["groq:llama3-8b", "openai:gpt-4o"],
+            validator=lambda response: float(response.choices[0].message.content),
+            min_confidence=0.9,
+        )
+
+        # The last tier is returned even if its answer is not accepted.
+        response = self.client.chat.completions.create(cascade, self.messages)
+        self.assertEqual(response.choices[0].message.content, "0.4")
+        self.assertFalse(cascade.accepts(response))
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    @patch("aisuite.providers.groq_provider.GroqProvider.chat_completions_create")
+    def test_programming_errors_do_not_escalate(self, mock_groq, mock_openai):
+        mock_groq.side_effect = TypeError("unexpected keyword argument 'temprature'")
+        cascade = Cascade(["groq:llama3-8b", "openai:gpt-4o"])
+
+        with self.assertRaises(TypeError):
+            self.client.chat.completions.create(cascade, self.messages, temprature=0.5)
+        with self.assertRaises(ValueError):
+            self.client.chat.completions.create(
+                Cascade(["nope:model", "openai:gpt-4o"]), self.messages
+            )
+        mock_openai.assert_not_called()
+        self.assertEqual(cascade.rejected["groq:llama3-8b"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from aisuite import Cassette, Client
+from aisuite.cassette import CassetteError
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def ollama_server(request):
+    return httpx.Response(200, json={"message": {"content": "recorded reply"}})
+
+
+def openai_server(request):
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "recorded openai"},
+                    "finish_reason": "stop",
+                }
+            ],
+        },
+    )
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "traffic.cassette")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record_and_reload(self, provider_configs, server, model):
+        cassette = Cassette()
+        recorder = cassette.recorder(httpx.MockTransport(server))
+        client = Client(provider_configs, transport=recorder)
+        recorded = client.chat.completions.create(model, MESSAGES)
+        cassette.save(self.path)
+        return recorded, Cassette.load(self.path)
+
+    def test_ollama_record_and_replay(self):
+        recorded, cassette = self.record_and_reload({}, ollama_server, "ollama:llama3")
+        self.assertEqual(len(cassette.interactions), 1)
+
+        client = Client(transport=cassette.player(speed=0))
+        replayed = client.chat.completions.create("ollama:llama3", MESSAGES)
+
+        self.assertEqual(recorded.choices[0].message.content, "recorded reply")
+        self.assertEqual(replayed.choices[0].message.content, "recorded reply")
+
+    def test_sdk_provider_record_and_replay(self):
+        configs = {"openai": {"api_key": "key", "max_retries": 0}}
+        recorded, cassette = self.record_and_reload(
+            configs, openai_server, "openai:gpt-4o"
+        )
+
+        client = Client(configs, transport=cassette.player(speed=0))
+        replayed = client.chat.completions.create("openai:gpt-4o", MESSAGES)
+
+        self.assertEqual(recorded.choices[0].message.content, "recorded openai")
+        self.assertEqual(replayed.choices[0].message.content, "recorded openai")
+
+    def test_streamed_chunks_keep_their_timing(self):
+        cassette = Cassette()
+        chunks = [b"data: 1\n\n", b"data: 2\n\n"]
+
+        class ChunkStream(httpx.SyncByteStream):
+            def __iter__(self):
+                yield from chunks
+
+        recorder = cassette.recorder(
+            httpx.MockTransport(
+                lambda request: httpx.Response(200, stream=ChunkStream())
+            )
+        )
+        with httpx.Client(transport=recorder) as client:
+            with client.stream("POST", "http://localhost/stream") as response:
+                self.assertEqual(list(response.iter_bytes()), chunks)
+
+        interaction = cassette.interactions[0]
+        self.assertEqual(len(interaction["chunks"]), 2)
+        offsets = [offset for offset, _ in interaction["chunks"]]
+        self.assertEqual(offsets, sorted(offsets))
+
+        with httpx.Client(transport=cassette.player(speed=0)) as client:
+            # A different body still replays the recording for the same URL.
+            response = client.post("http://localhost/stream", content=b"other")
+            self.assertEqual(response.content, b"".join(chunks))
+
+    def test_unrecorded_request(self):
+        player = Cassette().player()
+        with httpx.Client(transport=player) as client:
+            with self.assertRaises(CassetteError):
+                client.get("http://localhost/missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch
 from aisuite import Client
+from aisuite.framework import ProviderInterface
 
 
 class TestClient(unittest.TestCase):
@@ -183,6 +184,37 @@ class TestClient(unittest.TestCase):
             "Invalid model format. Expected 'provider:model'", str(context.exception)
         )
 
+    @patch("aisuite.providers.ollama_provider.OllamaProvider.warmup")
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.warmup")
+    def test_warmup(self, mock_openai_warmup, mock_ollama_warmup):
+        client = Client({"openai": {"api_key": "test_openai_api_key"}})
+
+        client.warmup(["openai:gpt-4o", "ollama:llama3"], keep_alive="10m")
+
+        self.assertIn("ollama", client.providers)
+        mock_openai_warmup.assert_called_once_with("gpt-4o", keep_alive="10m")
+        mock_ollama_warmup.assert_called_once_with("llama3", keep_alive="10m")
+
+    @patch("aisuite.client.ThreadPoolExecutor")
+    def test_warmup_without_provider_warmup(self, mock_executor):
+        client = Client()
+
+        client.warmup(["fake:echo"])
+
+        # The provider is created, but it has nothing to warm up.
+        self.assertIn("fake", client.providers)
+        mock_executor.assert_not_called()
+
+    @patch("aisuite.client.ThreadPoolExecutor")
+    def test_warmup_of_provider_without_warmup_method(self, mock_executor):
+        client = Client()
+        # Like GoogleProvider, which derives from ProviderInterface, not Provider.
+        client.providers["google"] = ProviderInterface()
+
+        client.warmup(["google:gemini-1.5-pro"])
+
+        mock_executor.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,121 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from aisuite import Client, Scheduler
+from aisuite.compare import compare
+
+
+def server(request):
+    if request.url.host == "api.openai.com":
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "openai says hi"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 5,
+                    "total_tokens": 15,
+                },
+            },
+        )
+    return httpx.Response(200, json={"message": {"content": "ollama says hi"}})
+
+
+class TestCompare(unittest.TestCase):
+    def setUp(self):
+        self.client = Client(
+            {"openai": {"api_key": "key", "max_retries": 0}},
+            transport=httpx.MockTransport(server),
+        )
+
+    def test_matrix(self):
+        result = compare(
+            self.client,
+            ["ollama:llama3", "openai:gpt-4o", "nope:model"],
+            ["Hi", [{"role": "user", "content": "Hello"}]],
+            limits={"ollama": 1},
+            repeats=2,
+        )
+        self.assertEqual(len(result), 12)
+        rows = result.rows()
+        self.assertEqual(
+            [(row["model"], row["prompt_index"], row["repeat"]) for row in rows[:4]],
+            [("ollama:llama3", 0, 0), ("ollama:llama3", 0, 1)]
+            + [("ollama:llama3", 1, 0), ("ollama:llama3", 1, 1)],
+        )
+        self.assertEqual(rows[0]["response"], "ollama says hi")
+        self.assertIsNotNone(rows[0]["ttft"])
+        self.assertIsNone(rows[0]["error"])
+        self.assertTrue(all(row["error"] for row in rows[8:]))
+
+        summary = {row["model"]: row for row in result.summary()}
+        self.assertEqual(summary["ollama:llama3"]["errors"], 0)
+        self.assertEqual(summary["nope:model"]["errors"], 4)
+        self.assertIsNone(summary["nope:model"]["latency_p50"])
+
+    def test_usage_and_cost_without_streaming(self):
+        result = compare(
+            self.client,
+            ["openai:gpt-4o"],
+            ["Hi"],
+            stream=False,
+            prices={"openai:gpt-4o": (2.5, 10.0)},
+        )
+        row = result.rows()[0]
+        self.assertEqual(row["response"], "openai says hi")
+        self.assertEqual(row["total_tokens"], 15)
+        self.assertAlmostEqual(row["cost"], (10 * 2.5 + 5 * 10.0) / 1_000_000)
+
+    def test_streams_collect_ttft_and_usage(self):
+        result = compare(Client(), ["fake:echo"], ["Hi there"])
+        row = result.rows()[0]
+        self.assertEqual(row["response"], "Hi there")
+        self.assertIsNotNone(row["ttft"])
+        self.assertEqual(row["prompt_tokens"], 2)
+        self.assertEqual(row["completion_tokens"], 2)
+
+    def test_client_scheduler_is_used(self):
+        scheduler = Scheduler({"fake": 1})
+        client = Client(scheduler=scheduler)
+        with patch("aisuite.compare.Scheduler") as compare_scheduler:
+            result = compare(client, ["fake:echo?latency=0.01"], ["Hi"], repeats=4)
+
+        compare_scheduler.assert_not_called()
+        self.assertEqual(len(result), 4)
+        self.assertEqual(scheduler.stats("fake")["active"], 0)
+
+    def test_default_limit_applies_without_a_client_scheduler(self):
+        with patch("aisuite.compare.Scheduler", wraps=Scheduler) as compare_scheduler:
+            result = compare(Client(), ["fake:echo"], ["Hi"], default_limit=2)
+
+        compare_scheduler.assert_called_once_with(None, default_limit=2)
+        self.assertEqual(len(result), 1)
+
+    def test_csv(self):
+        result = compare(self.client, ["ollama:llama3"], ["Hi"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "result.csv")
+            result.to_csv(path)
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["model"], "ollama:llama3")
+        self.assertEqual(rows[0]["response"], "ollama says hi")
+
+
+if __name__ == "__main__":
+    unittest.main()
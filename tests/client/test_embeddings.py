@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from aisuite import Client
+
+
+class TestEmbeddings(unittest.TestCase):
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.embeddings_create")
+    def test_embeddings_are_batched_and_stacked(self, mock_embed):
+        # Each text is embedded as [index, index] so the output order can be checked.
+        mock_embed.side_effect = lambda model, batch, **kwargs: [
+            [float(text), float(text)] for text in batch
+        ]
+
+        client = Client({"openai": {"api_key": "test_openai_api_key"}})
+        texts = [str(i) for i in range(10)]
+        result = client.embeddings.create(
+            "openai:text-embedding-3-small", texts, batch_size=3
+        )
+
+        self.assertEqual(mock_embed.call_count, 4)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertEqual(result.shape, (10, 2))
+        self.assertTrue(result.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(result[:, 0], np.arange(10, dtype=np.float32))
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.embeddings_create")
+    def test_single_string_input(self, mock_embed):
+        mock_embed.return_value = [[0.5, 0.25]]
+
+        client = Client({"openai": {"api_key": "test_openai_api_key"}})
+        result = client.embeddings.create("openai:text-embedding-3-small", "hello")
+
+        mock_embed.assert_called_once_with("text-embedding-3-small", ["hello"])
+        self.assertEqual(result.shape, (1, 2))
+
+    def test_provider_without_embeddings(self):
+        client = Client({"groq": {"api_key": "groq-api-key"}})
+        with self.assertRaisesRegex(ValueError, "does not support embeddings"):
+            client.embeddings.create("groq:some-model", ["hello"])
+
+
+if __name__ == "__main__":
+    unittest.main()
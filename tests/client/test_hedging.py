@@ -0,0 +1,87 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from aisuite import Client, Hedge
+
+
+class TestHedging(unittest.TestCase):
+    def test_backup_wins_when_primary_is_slow(self):
+        release = threading.Event()
+        hedge = Hedge(delay=0.01, budget=1.0)
+
+        def primary():
+            release.wait(5)
+            return "primary"
+
+        try:
+            self.assertEqual(hedge.run(primary, lambda: "backup"), "backup")
+        finally:
+            release.set()
+        self.assertEqual((hedge.calls, hedge.hedged, hedge.backup_wins), (1, 1, 1))
+
+    def test_fast_primary_is_not_hedged(self):
+        hedge = Hedge(delay=5, budget=1.0)
+        self.assertEqual(hedge.run(lambda: "primary", lambda: "backup"), "primary")
+        self.assertEqual(hedge.hedged, 0)
+
+    def test_budget_limits_hedging(self):
+        hedge = Hedge(delay=0.01, budget=0.0)
+        backup_calls = []
+
+        def primary():
+            threading.Event().wait(0.05)
+            return "primary"
+
+        result = hedge.run(primary, lambda: backup_calls.append(1))
+        self.assertEqual(result, "primary")
+        self.assertEqual(backup_calls, [])
+
+    def test_failed_backup_falls_back_to_primary(self):
+        hedge = Hedge(delay=0.01, budget=1.0)
+
+        def primary():
+            threading.Event().wait(0.05)
+            return "primary"
+
+        def backup():
+            raise RuntimeError("backup failed")
+
+        self.assertEqual(hedge.run(primary, backup), "primary")
+
+    def test_learned_delay(self):
+        hedge = Hedge(percentile=50, min_samples=3, initial_delay=7.0)
+        self.assertEqual(hedge.current_delay(), 7.0)
+        for _ in range(3):
+            hedge.run(lambda: "primary", lambda: "backup")
+        self.assertLess(hedge.current_delay(), 1.0)
+
+    @patch(
+        "aisuite.providers.anthropic_provider.AnthropicProvider.chat_completions_create"
+    )
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_client_hedges_to_backup_model(self, mock_openai, mock_anthropic):
+        release = threading.Event()
+        mock_openai.side_effect = lambda *args, **kwargs: release.wait(5)
+        mock_anthropic.return_value = "Anthropic Response"
+        client = Client({"openai": {"api_key": "key"}, "anthropic": {"api_key": "key"}})
+        hedge = Hedge(backup="anthropic:claude-3-5-sonnet", delay=0.01, budget=1.0)
+
+        try:
+            response = client.chat.completions.create(
+                "openai:gpt-4o",
+                [{"role": "user", "content": "Hi"}],
+                hedge=hedge,
+                temperature=0.2,
+            )
+        finally:
+            release.set()
+
+        self.assertEqual(response, "Anthropic Response")
+        mock_anthropic.assert_called_once_with(
+            "claude-3-5-sonnet", [{"role": "user", "content": "Hi"}], temperature=0.2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import base64
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from aisuite import Client, ImagePreprocessor
+from aisuite import images
+from aisuite.images import ImageData
+
+
+def png_bytes(size=(8, 8), color=(255, 0, 0)):
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestImageData(unittest.TestCase):
+    def test_media_type_is_sniffed(self):
+        self.assertEqual(ImageData.from_source(png_bytes()).media_type, "image/png")
+
+    def test_base64_is_cached_by_content(self):
+        data = png_bytes(color=(1, 2, 3))
+        with patch("aisuite.images.base64.b64encode", wraps=base64.b64encode) as encode:
+            first = ImageData.from_source(data).base64()
+            second = ImageData.from_source(bytes(data)).base64()
+        self.assertEqual(first, second)
+        self.assertEqual(encode.call_count, 1)
+
+    def test_data_url_round_trip(self):
+        image = ImageData.from_source(png_bytes())
+        self.assertEqual(ImageData.from_source(image.data_url()).data, image.data)
+
+    def test_string_paths_are_read_only_when_allowed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "red.png")
+            with open(path, "wb") as f:
+                f.write(png_bytes())
+
+            with self.assertRaises(ValueError):
+                ImageData.from_source(path)
+            with self.assertRaises(ValueError):
+                images.to_openai_messages(
+                    [
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "image_url", "image_url": {"url": path}}
+                            ],
+                        }
+                    ]
+                )
+            self.assertEqual(
+                ImageData.from_source(path, allow_paths=True).data, png_bytes()
+            )
+            self.assertEqual(ImageData.from_source(Path(path)).media_type, "image/png")
+
+
+class TestTranslation(unittest.TestCase):
+    def setUp(self):
+        self.data = png_bytes()
+        self.messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "What is this?"},
+                    {"type": "image", "image": self.data, "detail": "low"},
+                ],
+            }
+        ]
+
+    def test_openai(self):
+        content = images.to_openai_messages(self.messages)[0]["content"]
+        self.assertEqual(content[0], {"type": "text", "text": "What is this?"})
+        self.assertEqual(content[1]["type"], "image_url")
+        self.assertTrue(
+            content[1]["image_url"]["url"].startswith("data:image/png;base64,")
+        )
+        self.assertEqual(content[1]["image_url"]["detail"], "low")
+
+    def test_openai_leaves_text_messages_untouched(self):
+        messages = [{"role": "user", "content": "Hi"}]
+        self.assertIs(images.to_openai_messages(messages), messages)
+
+    def test_openai_keeps_remote_urls(self):
+        url = "https://example.com/cat.png"
+        messages = [
+            {"role": "user", "content": [{"type": "image_url", "image_url": url}]}
+        ]
+        content = images.to_openai_messages(messages)[0]["content"]
+        self.assertEqual(content[0]["image_url"]["url"], url)
+
+    def test_anthropic(self):
+        blocks = images.to_anthropic_content(self.messages[0]["content"])
+        self.assertEqual(blocks[1]["source"]["media_type"], "image/png")
+        self.assertEqual(base64.b64decode(blocks[1]["source"]["data"]), self.data)
+
+    def test_bedrock(self):
+        blocks = images.to_bedrock_content(self.messages[0]["content"])
+        self.assertEqual(blocks[0], {"text": "What is this?"})
+        self.assertEqual(
+            blocks[1], {"image": {"format": "png", "source": {"bytes": self.data}}}
+        )
+
+    def test_ollama(self):
+        message = images.to_ollama_message(self.messages[0])
+        self.assertEqual(message["content"], "What is this?")
+        self.assertEqual(base64.b64decode(message["images"][0]), self.data)
+
+
+class TestImagePreprocessor(unittest.TestCase):
+    def test_downscales_to_provider_limit(self):
+        messages = [
+            {
+                "role": "user",
+                "content": [{"type": "image", "image": png_bytes((400, 200))}],
+            }
+        ]
+        prepared = ImagePreprocessor(max_dimension=1000).prepare(messages, 100)
+        image = prepared[0]["content"][0]["image"]
+        self.assertEqual(image.media_type, "image/jpeg")
+        with Image.open(io.BytesIO(image.data)) as img:
+            self.assertEqual(img.size, (100, 50))
+
+    def test_small_images_are_kept(self):
+        data = png_bytes((10, 10))
+        messages = [{"role": "user", "content": [{"type": "image", "image": data}]}]
+        prepared = ImagePreprocessor(max_dimension=100).prepare(messages)
+        self.assertEqual(prepared[0]["content"][0]["image"].data, data)
+
+    @patch("aisuite.providers.openai_provider.openai.OpenAI")
+    def test_client_prepares_images(self, mock_openai):
+        mock_create = mock_openai.return_value.chat.completions.create
+        client = Client(
+            {"openai": {"api_key": "test-key"}},
+            image_preprocessor=ImagePreprocessor(max_dimension=64),
+        )
+        messages = [
+            {
+                "role": "user",
+                "content": [{"type": "image", "image": png_bytes((256, 256))}],
+            }
+        ]
+        client.chat.completions.create("openai:gpt-4o", messages)
+
+        sent = mock_create.call_args.kwargs["messages"][0]["content"][0]
+        url = sent["image_url"]["url"]
+        self.assertTrue(url.startswith("data:image/jpeg;base64,"))
+        data = base64.b64decode(url.partition(",")[2])
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.size, (64, 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+from openai.types.chat import ChatCompletion
+
+from aisuite.framework import ChatCompletionResponse
+from aisuite.logprobs import Logprobs, from_choice, stack
+
+
+def chat_logprobs(tokens, top=()):
+    return {
+        "content": [
+            {
+                "token": token,
+                "logprob": logprob,
+                "top_logprobs": [
+                    {"token": t, "logprob": lp} for t, lp in (top[i] if top else ())
+                ],
+            }
+            for i, (token, logprob) in enumerate(tokens)
+        ]
+    }
+
+
+class TestLogprobs(unittest.TestCase):
+    def test_from_chat_format(self):
+        logprobs = Logprobs.from_openai(
+            chat_logprobs(
+                [("yes", -0.1), ("!", -2.0)],
+                top=[[("yes", -0.1), ("no", -2.4)], [("!", -2.0)]],
+            )
+        )
+
+        np.testing.assert_array_equal(logprobs.tokens, ["yes", "!"])
+        self.assertEqual(logprobs.logprobs.dtype, np.float32)
+        np.testing.assert_allclose(logprobs.logprobs, [-0.1, -2.0])
+        np.testing.assert_array_equal(logprobs.top_tokens, [["yes", "no"], ["!", ""]])
+        np.testing.assert_allclose(
+            logprobs.top_logprobs, [[-0.1, -2.4], [-2.0, -np.inf]]
+        )
+
+    def test_from_completions_format(self):
+        logprobs = Logprobs.from_openai(
+            {
+                "tokens": ["A", "B"],
+                "token_logprobs": [-0.5, None],
+                "top_logprobs": [{"C": -3.0, "A": -0.5}, {"B": -1.0}],
+            }
+        )
+
+        np.testing.assert_allclose(logprobs.logprobs, [-0.5, -np.inf])
+        np.testing.assert_array_equal(logprobs.top_tokens, [["A", "C"], ["B", ""]])
+
+    def test_from_sdk_response(self):
+        response = ChatCompletion.model_validate(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": "no"},
+                        "logprobs": chat_logprobs([("no", -0.7)], top=[[("no", -0.7)]]),
+                    }
+                ],
+            }
+        )
+
+        logprobs = from_choice(response.choices[0])
+        np.testing.assert_array_equal(logprobs.tokens, ["no"])
+        np.testing.assert_allclose(logprobs.top_logprobs, [[-0.7]])
+
+    def test_stack_pads_completions(self):
+        first = ChatCompletionResponse()
+        first.choices[0].logprobs = Logprobs.from_openai(
+            chat_logprobs([("a", -1.0), ("b", -2.0)])
+        )
+        second = Logprobs.from_openai(
+            chat_logprobs([("c", -0.5)], top=[[("c", -0.5), ("d", -1.5)]])
+        )
+
+        batch = stack([first, second])
+
+        np.testing.assert_array_equal(batch.lengths, [2, 1])
+        np.testing.assert_array_equal(batch.tokens, [["a", "b"], ["c", ""]])
+        np.testing.assert_allclose(batch.logprobs.sum(axis=1), [-3.0, -0.5])
+        self.assertEqual(batch.top_logprobs.shape, (2, 2, 2))
+        np.testing.assert_array_equal(batch.top_tokens[1, 0], ["c", "d"])
+        self.assertTrue(np.isneginf(batch.top_logprobs[0]).all())
+
+    def test_stack_requires_logprobs(self):
+        with self.assertRaises(ValueError):
+            stack([ChatCompletionResponse()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import threading
+import unittest
+
+import httpx
+
+from aisuite import Client, MapReduce
+from aisuite.map_reduce import chunk_text
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class TestChunkText(unittest.TestCase):
+    def test_chunks_fit_budget_and_rejoin(self):
+        text = "\n\n".join(
+            " ".join(f"word{p}_{i}." for i in range(25)) for p in range(6)
+        )
+        chunks = chunk_text(text, 10, count_words)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(count_words(chunk) <= 10 for chunk in chunks))
+
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(chunk_text("short text", 100), ["short text"])
+
+
+class TestMapReduce(unittest.TestCase):
+    def setUp(self):
+        self.prompts = []
+        lock = threading.Lock()
+
+        def server(request):
+            prompt = json.loads(request.content)["messages"][0]["content"]
+            with lock:
+                self.prompts.append(prompt)
+            if prompt.startswith("MAP "):
+                reply = "m" + prompt.split()[1]
+            else:
+                reply = "+".join(prompt[len("REDUCE\n") :].split("\n\n"))
+            return httpx.Response(200, json={"message": {"content": reply}})
+
+        self.client = Client(transport=httpx.MockTransport(server))
+
+    def test_hierarchical_reduce(self):
+        document = " ".join(f"p{i}" for i in range(8))
+        map_reduce = MapReduce(
+            self.client,
+            "ollama:llama3",
+            map_prompt="MAP {chunk}",
+            reduce_prompt="REDUCE\n{results}",
+            chunk_tokens=1,
+            reduce_tokens=2,
+            count_tokens=count_words,
+        )
+        partials = list(map_reduce.stream(document))
+
+        maps = [p for p in partials if p.stage == "map"]
+        self.assertEqual(len(maps), 8)
+        self.assertEqual(sorted(p.text for p in maps), [f"mp{i}" for i in range(8)])
+        self.assertEqual(
+            [p.level for p in partials if p.stage == "reduce"], [1] * 4 + [2] * 2 + [3]
+        )
+        self.assertTrue(partials[-1].final)
+        self.assertEqual(partials[-1].text, "+".join(f"mp{i}" for i in range(8)))
+
+    def test_run_returns_final_result(self):
+        map_reduce = MapReduce(
+            self.client,
+            "ollama:llama3",
+            map_prompt="MAP {chunk}",
+            reduce_prompt="REDUCE\n{results}",
+        )
+        self.assertEqual(map_reduce.run("short document"), "mshort")
+        # A document in one chunk needs no reduce step.
+        self.assertEqual(len(self.prompts), 1)
+
+    def test_prompts_may_contain_braces(self):
+        map_reduce = MapReduce(
+            self.client,
+            "ollama:llama3",
+            map_prompt='MAP {chunk} as {"summary": "..."}',
+            reduce_prompt='REDUCE\n{results}\n{"summary": "..."}',
+            chunk_tokens=1,
+            count_tokens=count_words,
+        )
+        map_reduce.run("a b")
+        self.assertIn('MAP a  as {"summary": "..."}', self.prompts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from aisuite import Client
+from aisuite.framework import ChatCompletionResponse
+from aisuite.framework.choice import Choice
+from aisuite.middleware import Request, compile_async_chain, compile_chain
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def completion(content):
+    choice = Choice()
+    choice.message.content = content
+    return ChatCompletionResponse([choice])
+
+
+class TestMiddlewareChain(unittest.TestCase):
+    def test_empty_chain_is_the_handler(self):
+        def handler(request):
+            return "response"
+
+        self.assertIs(compile_chain([], handler), handler)
+
+    def test_middlewares_run_in_order(self):
+        order = []
+
+        def outer(request, call_next):
+            order.append("outer")
+            return call_next(request) + "!"
+
+        async def inner(request, call_next):
+            order.append("inner")
+            return (await call_next(request)).upper()
+
+        def handler(request):
+            order.append("handler")
+            return request.model
+
+        chain = compile_chain([outer, inner], handler)
+        request = Request("openai:gpt-4o", MESSAGES, {}, {})
+
+        self.assertEqual(chain(request), "OPENAI:GPT-4O!")
+        self.assertEqual(order, ["outer", "inner", "handler"])
+
+        order.clear()
+        async_chain = compile_async_chain([outer, inner], handler)
+        self.assertEqual(asyncio.run(async_chain(request)), "OPENAI:GPT-4O!")
+        self.assertEqual(order, ["outer", "inner", "handler"])
+
+    def test_replacing_the_model_clears_the_provider(self):
+        request = Request("openai:gpt-4o", MESSAGES, {}, {}, provider=object())
+        self.assertIsNotNone(request.replace(kwargs={"seed": 1}).provider)
+
+        rerouted = request.replace(model="groq:llama3-8b-8192")
+        self.assertIsNone(rerouted.provider)
+        self.assertEqual(rerouted.provider_key, "groq")
+        self.assertEqual(rerouted.model_name, "llama3-8b-8192")
+
+        with self.assertRaises(TypeError):
+            request.replace(temperature=0.5)
+
+
+class TestClientMiddlewares(unittest.TestCase):
+    def setUp(self):
+        self.client = Client({"openai": {"api_key": "key"}})
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_middleware_transforms_request_and_response(self, mock_create):
+        mock_create.return_value = completion("hello")
+
+        def defaults(request, call_next):
+            request = request.replace(kwargs={"temperature": 0, **request.kwargs})
+            response = call_next(request)
+            response.choices[0].message.content += " (checked)"
+            return response
+
+        self.client.add_middleware(defaults)
+        response = self.client.chat.completions.create("openai:gpt-4o", MESSAGES)
+
+        self.assertEqual(response.choices[0].message.content, "hello (checked)")
+        mock_create.assert_called_once_with("gpt-4o", MESSAGES, temperature=0)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_middleware_can_short_circuit(self, mock_create):
+        def blocked(request, call_next):
+            if request.provider_key == "openai":
+                return completion("blocked")
+            return call_next(request)
+
+        client = Client({"openai": {"api_key": "key"}}, middlewares=[blocked])
+        response = client.chat.completions.create("openai:gpt-4o", MESSAGES)
+
+        self.assertEqual(response.choices[0].message.content, "blocked")
+        mock_create.assert_not_called()
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_acreate_runs_async_middlewares(self, mock_create):
+        mock_create.return_value = completion("hello")
+        seen = []
+
+        async def record(request, call_next):
+            seen.append(request.options["priority"])
+            return await call_next(request)
+
+        self.client.add_middleware(record)
+        response = asyncio.run(
+            self.client.chat.completions.acreate(
+                "openai:gpt-4o", MESSAGES, priority="interactive"
+            )
+        )
+
+        self.assertEqual(response.choices[0].message.content, "hello")
+        self.assertEqual(seen, ["interactive"])
+
+    def test_concurrent_acreate_with_blocking_middleware(self):
+        def passthrough(request, call_next):
+            return call_next(request)
+
+        async def inner(request, call_next):
+            return await call_next(request)
+
+        client = Client(middlewares=[passthrough, inner, passthrough])
+
+        async def main():
+            # More concurrent calls than executor threads.
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=2)
+            )
+            calls = [
+                client.chat.completions.acreate("fake:echo?latency=0.01", MESSAGES)
+                for _ in range(8)
+            ]
+            return await asyncio.wait_for(asyncio.gather(*calls), 10)
+
+        responses = asyncio.run(main())
+
+        self.assertEqual(
+            [response.choices[0].message.content for response in responses],
+            ["Hi"] * 8,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from aisuite import Client, SlowCallProfiler
+from aisuite.framework import ChatCompletionResponse
+
+MESSAGES = [{"role": "user", "content": "A long conversation"}]
+
+
+def busy(seconds):
+    """Keep the calling thread on the CPU for the given time."""
+
+    def create(*args, **kwargs):
+        end = time.thread_time() + seconds
+        while time.thread_time() < end:
+            pass
+        return ChatCompletionResponse()
+
+    return create
+
+
+class TestSlowCallProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def files(self, suffix):
+        return sorted(f for f in os.listdir(self.directory) if f.endswith(suffix))
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_slow_call_is_profiled_without_content(self, mock_create):
+        mock_create.side_effect = busy(0.2)
+        profiler = SlowCallProfiler(threshold=0.1, directory=self.directory)
+        client = Client({"openai": {"api_key": "key"}}, profiler=profiler)
+
+        client.chat.completions.create("openai:gpt-4o", MESSAGES, temperature=0.2)
+
+        [metadata_file] = self.files(".json")
+        [profile_file] = self.files(".folded")
+        with open(os.path.join(self.directory, metadata_file)) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata["model"], "openai:gpt-4o")
+        self.assertEqual(metadata["kwargs"], {"temperature": 0.2})
+        self.assertEqual(metadata["message_count"], 1)
+        self.assertGreaterEqual(metadata["cpu_seconds"], 0.1)
+        self.assertNotIn("messages", metadata)
+        self.assertNotIn("A long conversation", json.dumps(metadata))
+        with open(os.path.join(self.directory, profile_file)) as f:
+            self.assertIn("create", f.read())
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_waiting_for_the_provider_is_not_client_time(self, mock_create):
+        samples = []
+
+        def wait(*args, **kwargs):
+            time.sleep(0.2)
+            samples.extend(
+                sum(call.stacks.values()) for call in profiler._calls.values()
+            )
+            return ChatCompletionResponse()
+
+        mock_create.side_effect = wait
+        profiler = SlowCallProfiler(threshold=0.1, directory=self.directory)
+        client = Client({"openai": {"api_key": "key"}}, profiler=profiler)
+
+        client.chat.completions.create("openai:gpt-4o", MESSAGES)
+
+        self.assertEqual(self.files(".json"), [])
+        if hasattr(time, "pthread_getcpuclockid"):
+            # The waiting call was not sampled either.
+            self.assertEqual(samples, [0])
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_deterministic_profiles_rotate(self, mock_create):
+        mock_create.side_effect = busy(0.05)
+        profiler = SlowCallProfiler(
+            threshold=0.01,
+            directory=self.directory,
+            max_files=2,
+            mode="deterministic",
+            include_content=True,
+        )
+        client = Client({"openai": {"api_key": "key"}}, profiler=profiler)
+
+        for _ in range(3):
+            client.chat.completions.create("openai:gpt-4o", MESSAGES)
+
+        self.assertEqual(len(self.files(".json")), 2)
+        self.assertEqual(len(self.files(".prof")), 2)
+        with open(os.path.join(self.directory, self.files(".json")[0])) as f:
+            self.assertEqual(json.load(f)["messages"], MESSAGES)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_deterministic_mode_never_fails_calls(self, mock_create):
+        mock_create.side_effect = busy(0.05)
+        profiler = SlowCallProfiler(
+            threshold=0.01, directory=self.directory, mode="deterministic"
+        )
+        client = Client({"openai": {"api_key": "key"}}, profiler=profiler)
+
+        class ActiveProfile:
+            def enable(self):
+                raise ValueError("Another profiling tool is already active")
+
+        # Another tool holds the process-wide profiler, as cProfile does on 3.12.
+        with patch("aisuite.profiling.cProfile.Profile", ActiveProfile):
+            client.chat.completions.create("openai:gpt-4o", MESSAGES)
+        # Another call is being profiled.
+        with profiler._profile_lock:
+            client.chat.completions.create("openai:gpt-4o", MESSAGES)
+
+        self.assertEqual(self.files(".json"), [])
+        client.chat.completions.create("openai:gpt-4o", MESSAGES)
+        self.assertEqual(len(self.files(".prof")), 1)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_content_in_kwargs_is_not_written(self, mock_create):
+        mock_create.side_effect = busy(0.05)
+        profiler = SlowCallProfiler(threshold=0.01, directory=self.directory)
+        client = Client({"openai": {"api_key": "key"}}, profiler=profiler)
+
+        client.chat.completions.create(
+            "openai:gpt-4o", MESSAGES, max_tokens=10, system="Secret instructions"
+        )
+
+        [metadata_file] = self.files(".json")
+        with open(os.path.join(self.directory, metadata_file)) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata["kwargs"], {"max_tokens": 10, "system": "<str>"})
+
+    def test_enabled_by_environment(self):
+        with patch.dict(
+            os.environ,
+            {
+                "AISUITE_PROFILE_SLOW_CALLS": "0.25",
+                "AISUITE_PROFILE_DIR": self.directory,
+            },
+        ):
+            profiler = Client().profiler
+        self.assertEqual(profiler.threshold, 0.25)
+        self.assertEqual(profiler.directory, self.directory)
+        self.assertIsNone(Client().profiler)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import httpx
+
+from aisuite import Client
+from aisuite.provider import LLMError, is_rate_limit_error
+from aisuite.provider_pool import ProviderPool
+
+
+def rate_limit_error():
+    """An LLMError wrapping an httpx 429, the way the HTTP providers raise it."""
+    request = httpx.Request("POST", "https://example.com")
+    response = httpx.Response(429, request=request)
+    try:
+        raise httpx.HTTPStatusError(
+            "Too Many Requests", request=request, response=response
+        )
+    except httpx.HTTPStatusError as http_err:
+        try:
+            raise LLMError(f"request failed: {http_err}")
+        except LLMError as e:
+            return e
+
+
+class TestProviderPool(unittest.TestCase):
+    def test_pool_created_from_config(self):
+        client = Client(
+            {
+                "openai": {
+                    "pool": [{"api_key": "key-1"}, {"api_key": "key-2", "weight": 2}],
+                    "timeout": 10,
+                }
+            }
+        )
+
+        pool = client.providers["openai"]
+        self.assertIsInstance(pool, ProviderPool)
+        self.assertEqual(len(pool.members), 2)
+        self.assertEqual(pool.members[1].weight, 2)
+        self.assertEqual(pool.members[1].provider.client.api_key, "key-2")
+        self.assertEqual(pool.members[0].provider.client.timeout, 10)
+        self.assertTrue(pool.SUPPORTS_N)
+        # Images are downscaled to the members' limit.
+        self.assertEqual(pool.IMAGE_MAX_DIMENSION, 2048)
+
+    def test_weights_must_be_positive(self):
+        for weights in ([0], [1, 0], [1, -1]):
+            with self.assertRaisesRegex(ValueError, "must be positive"):
+                ProviderPool([(MagicMock(), weight) for weight in weights])
+
+    def test_spills_over_on_rate_limit(self):
+        throttled, healthy = MagicMock(), MagicMock()
+        throttled.chat_completions_create.side_effect = rate_limit_error()
+        healthy.chat_completions_create.return_value = "response"
+        pool = ProviderPool([(throttled, 1), (healthy, 1)])
+
+        self.assertEqual(pool.chat_completions_create("model", []), "response")
+        self.assertEqual(pool.chat_completions_create("model", []), "response")
+
+        # The throttled member is cooling down, so it is only tried once.
+        throttled.chat_completions_create.assert_called_once()
+        self.assertEqual(healthy.chat_completions_create.call_count, 2)
+
+    def test_raises_when_all_members_are_throttled(self):
+        members = [MagicMock(), MagicMock()]
+        for member in members:
+            member.chat_completions_create.side_effect = rate_limit_error()
+        pool = ProviderPool([(member, 1) for member in members])
+
+        with self.assertRaises(LLMError):
+            pool.chat_completions_create("model", [])
+
+    def test_other_errors_are_not_retried(self):
+        failing, healthy = MagicMock(), MagicMock()
+        failing.chat_completions_create.side_effect = ValueError("bad request")
+        pool = ProviderPool([(failing, 1), (healthy, 1)])
+
+        with self.assertRaises(ValueError):
+            pool.chat_completions_create("model", [])
+        healthy.chat_completions_create.assert_not_called()
+
+    def test_least_outstanding(self):
+        busy, idle = MagicMock(), MagicMock()
+        release = threading.Event()
+        busy.chat_completions_create.side_effect = lambda *args: release.wait(5)
+        idle.chat_completions_create.return_value = "idle"
+        pool = ProviderPool([(busy, 1), (idle, 1)])
+
+        thread = threading.Thread(target=pool.chat_completions_create, args=("m", []))
+        thread.start()
+        while busy.chat_completions_create.call_count == 0:
+            pass
+        try:
+            self.assertEqual(pool.chat_completions_create("m", []), "idle")
+        finally:
+            release.set()
+            thread.join()
+
+    def test_is_rate_limit_error(self):
+        throttling = Exception("throttled")
+        throttling.response = {"Error": {"Code": "ThrottlingException"}}
+        self.assertTrue(is_rate_limit_error(throttling))
+        self.assertTrue(is_rate_limit_error(rate_limit_error()))
+        self.assertFalse(is_rate_limit_error(LLMError("boom")))
+
+
+if __name__ == "__main__":
+    unittest.main()
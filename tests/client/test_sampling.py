@@ -0,0 +1,85 @@
+import itertools
+import threading
+import unittest
+from unittest.mock import patch
+
+from aisuite import Client
+from aisuite.framework import ChatCompletionResponse
+
+
+def make_response(content):
+    response = ChatCompletionResponse()
+    response.choices[0].message.content = content
+    return response
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.client = Client({"anthropic": {"api_key": "anthropic-api-key"}})
+        self.messages = [{"role": "user", "content": "What is 2 + 2?"}]
+
+    @patch(
+        "aisuite.providers.anthropic_provider.AnthropicProvider.chat_completions_create"
+    )
+    def test_n_without_native_support(self, mock_create):
+        mock_create.return_value = make_response("4")
+
+        response = self.client.chat.completions.create(
+            "anthropic:claude-3-5-sonnet", self.messages, n=3, temperature=1.0
+        )
+
+        self.assertEqual(mock_create.call_count, 3)
+        mock_create.assert_called_with(
+            "claude-3-5-sonnet", self.messages, temperature=1.0
+        )
+        self.assertEqual([c.message.content for c in response.choices], ["4"] * 3)
+
+    @patch(
+        "aisuite.providers.anthropic_provider.AnthropicProvider.chat_completions_create"
+    )
+    def test_consensus_stops_at_majority(self, mock_create):
+        counter = itertools.count()
+        release = threading.Event()
+
+        def create(model, messages, **kwargs):
+            # The first three samples agree; later ones block until the test ends.
+            if next(counter) < 3:
+                return make_response(" 4 ")
+            release.wait(5)
+            return make_response("5")
+
+        mock_create.side_effect = create
+        try:
+            response = self.client.chat.completions.create(
+                "anthropic:claude-3-5-sonnet", self.messages, n=5, consensus=True
+            )
+        finally:
+            release.set()
+
+        self.assertEqual([c.message.content for c in response.choices], [" 4 "] * 3)
+
+    @patch(
+        "aisuite.providers.anthropic_provider.AnthropicProvider.chat_completions_create"
+    )
+    def test_consensus_orders_winner_first(self, mock_create):
+        answers = iter(["The answer is 5", "So it is 4", "Therefore 4"])
+        lock = threading.Lock()
+
+        def create(model, messages, **kwargs):
+            with lock:
+                return make_response(next(answers))
+
+        mock_create.side_effect = create
+        response = self.client.chat.completions.create(
+            "anthropic:claude-3-5-sonnet",
+            self.messages,
+            n=3,
+            consensus=lambda content: content.split()[-1],
+        )
+
+        votes = [c.message.content.split()[-1] for c in response.choices]
+        self.assertEqual(votes[:2], ["4", "4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
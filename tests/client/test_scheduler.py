@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from aisuite import Client, RequestShedError, Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    def test_higher_priority_overtakes_queued_requests(self):
+        scheduler = Scheduler(default_limit=1)
+        order = []
+
+        def run(name, priority):
+            with scheduler.slot("openai", priority):
+                order.append(name)
+
+        with scheduler.slot("openai"):
+            batch = threading.Thread(target=run, args=("batch", "batch"))
+            batch.start()
+            while scheduler.stats("openai")["queued"] < 1:
+                time.sleep(0.001)
+            interactive = threading.Thread(
+                target=run, args=("interactive", "interactive")
+            )
+            interactive.start()
+            while scheduler.stats("openai")["queued"] < 2:
+                time.sleep(0.001)
+
+        batch.join()
+        interactive.join()
+        self.assertEqual(order, ["interactive", "batch"])
+        self.assertEqual(scheduler.stats("openai"), {"active": 0, "queued": 0})
+
+    def test_request_is_shed_after_queue_timeout(self):
+        scheduler = Scheduler(limits={"openai": 1})
+
+        with scheduler.slot("openai"):
+            with self.assertRaises(RequestShedError):
+                with scheduler.slot("openai", queue_timeout=0.01):
+                    pass
+
+        # The shed request does not hold on to the slot.
+        with scheduler.slot("openai", queue_timeout=0.01):
+            self.assertEqual(scheduler.stats("openai")["active"], 1)
+
+    def test_full_queue_sheds_immediately(self):
+        scheduler = Scheduler(default_limit=1, max_queue=0)
+
+        with scheduler.slot("groq"):
+            with self.assertRaises(RequestShedError):
+                with scheduler.slot("groq"):
+                    pass
+
+    def test_unknown_priority(self):
+        scheduler = Scheduler(default_limit=1)
+
+        with self.assertRaisesRegex(ValueError, "'interactive'"):
+            with scheduler.slot("openai", "interactve"):
+                pass
+        self.assertEqual(scheduler.stats("openai"), {"active": 0, "queued": 0})
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_client_calls_go_through_scheduler(self, mock_create):
+        scheduler = Scheduler(limits={"openai": 2})
+        active = []
+        mock_create.side_effect = lambda *args, **kwargs: active.append(
+            scheduler.stats("openai")["active"]
+        )
+
+        client = Client({"openai": {"api_key": "key"}}, scheduler=scheduler)
+        client.chat.completions.create(
+            "openai:gpt-4o",
+            [{"role": "user", "content": "Hi"}],
+            priority="interactive",
+            queue_timeout=1.0,
+            temperature=0.5,
+        )
+
+        self.assertEqual(active, [1])
+        mock_create.assert_called_once_with(
+            "gpt-4o", [{"role": "user", "content": "Hi"}], temperature=0.5
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import httpx
+import numpy as np
+
+from aisuite import Client, SemanticCache
+
+# Toy embeddings: questions about the same topic point in the same direction.
+TOPICS = {"refund": [1.0, 0.0, 0.0], "shipping": [0.0, 1.0, 0.0]}
+
+
+def embed(text):
+    for word, vector in TOPICS.items():
+        if word in text.lower():
+            return vector
+    return [0.0, 0.0, 1.0]
+
+
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+        def server(request):
+            self.calls += 1
+            return httpx.Response(
+                200, json={"message": {"content": f"answer {self.calls}"}}
+            )
+
+        self.cache = SemanticCache(embed=embed, threshold=0.9, max_entries=2)
+        self.client = Client(
+            transport=httpx.MockTransport(server), semantic_cache=self.cache
+        )
+
+    def ask(self, question, history=()):
+        messages = list(history) + [{"role": "user", "content": question}]
+        response = self.client.chat.completions.create("ollama:llama3", messages)
+        return response.choices[0].message.content
+
+    def test_similar_questions_are_served_from_cache(self):
+        self.assertEqual(self.ask("How do I get a refund?"), "answer 1")
+        self.assertEqual(self.ask("Refund policy please"), "answer 1")
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+    def test_context_must_match(self):
+        self.ask("How do I get a refund?")
+        history = [{"role": "system", "content": "Answer in French."}]
+        self.assertEqual(self.ask("How do I get a refund?", history), "answer 2")
+
+    def test_consensus_calls_are_not_served_plain_answers(self):
+        messages = [{"role": "user", "content": "How do I get a refund?"}]
+        self.client.chat.completions.create("ollama:llama3", messages, n=3)
+        self.client.chat.completions.create(
+            "ollama:llama3", messages, n=3, consensus=True
+        )
+        self.assertEqual(self.calls, 6)
+
+    def test_embedding_failures_skip_the_cache(self):
+        def unavailable(text):
+            raise ConnectionError("embedding provider is down")
+
+        self.cache.embed = unavailable
+        self.assertEqual(self.ask("How do I get a refund?"), "answer 1")
+        self.assertEqual(self.ask("How do I get a refund?"), "answer 2")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.ask("refund?")
+        self.ask("shipping?")
+        self.ask("refund again?")  # hit, so shipping is now least recently used
+        self.ask("something else")
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.ask("refund!"), "answer 1")
+        self.assertEqual(self.ask("shipping!"), "answer 4")
+
+    def test_save_and_load(self):
+        self.ask("refund?")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "faq")
+            self.cache.save(path)
+            loaded = SemanticCache.load(path, embed=embed, threshold=0.9)
+            self.assertIsInstance(loaded._vectors, np.memmap)
+            key = loaded.key(
+                self.client,
+                "ollama:llama3",
+                [{"role": "user", "content": "A refund"}],
+                {},
+            )
+            self.assertEqual(loaded.get(key).choices[0].message.content, "answer 1")
+            del loaded
+
+
+if __name__ == "__main__":
+    unittest.main()
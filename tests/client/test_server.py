@@ -0,0 +1,144 @@
+import asyncio
+import json
+import unittest
+
+import httpx
+
+from aisuite import Client, ResponseCache
+from aisuite.server import Gateway, GatewayMetrics
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def ollama_server(request):
+    return httpx.Response(200, json={"message": {"content": "Hello from the gateway"}})
+
+
+class TestGateway(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        client = Client(
+            transport=httpx.MockTransport(ollama_server), cache=ResponseCache()
+        )
+        self.gateway = await Gateway(client, port=0).start()
+        self.http = httpx.AsyncClient(base_url=f"http://127.0.0.1:{self.gateway.port}")
+
+    async def asyncTearDown(self):
+        await self.http.aclose()
+        await self.gateway.close()
+
+    async def test_chat_completion(self):
+        response = await self.http.post(
+            "/v1/chat/completions",
+            json={"model": "ollama:llama3", "messages": MESSAGES},
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["object"], "chat.completion")
+        self.assertEqual(
+            body["choices"][0]["message"],
+            {"role": "assistant", "content": "Hello from the gateway"},
+        )
+
+    async def test_streaming(self):
+        async with self.http.stream(
+            "POST",
+            "/v1/chat/completions",
+            json={"model": "ollama:llama3", "messages": MESSAGES, "stream": True},
+        ) as response:
+            self.assertEqual(response.headers["content-type"], "text/event-stream")
+            events = [
+                line[len("data: ") :]
+                async for line in response.aiter_lines()
+                if line.startswith("data: ")
+            ]
+
+        self.assertEqual(events[-1], "[DONE]")
+        chunks = [json.loads(event) for event in events[:-1]]
+        content = "".join(
+            chunk["choices"][0]["delta"].get("content", "") for chunk in chunks
+        )
+        self.assertEqual(content, "Hello from the gateway")
+        self.assertEqual(chunks[-1]["choices"][0]["finish_reason"], "stop")
+
+    async def test_errors_use_openai_format(self):
+        response = await self.http.post(
+            "/v1/chat/completions",
+            json={"model": "not-a-provider-model", "messages": MESSAGES},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("message", response.json()["error"])
+
+        response = await self.http.post("/v1/chat/completions", content=b"not json")
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.http.get("/nowhere")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_metrics(self):
+        for _ in range(2):
+            await self.http.post(
+                "/v1/chat/completions",
+                json={"model": "ollama:llama3", "messages": MESSAGES},
+            )
+        response = await self.http.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'aisuite_requests_total{model="ollama:llama3",status="200"} 2',
+            response.text,
+        )
+        self.assertIn("aisuite_cache_hits_total 1", response.text)
+
+    async def test_image_sources_must_be_data_urls(self):
+        for source in ("/etc/passwd", "http://169.254.169.254/latest"):
+            messages = [
+                {
+                    "role": "user",
+                    "content": [{"type": "image_url", "image_url": {"url": source}}],
+                }
+            ]
+            response = await self.http.post(
+                "/v1/chat/completions",
+                json={"model": "ollama:llama3", "messages": messages},
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(
+                response.json()["error"]["message"], "Images must be data URLs."
+            )
+
+    async def test_malformed_content_length(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.gateway.port)
+        writer.write(
+            b"POST /v1/chat/completions HTTP/1.1\r\nContent-Length: ten\r\n\r\n"
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        writer.close()
+        self.assertEqual(status_line, b"HTTP/1.1 400 Bad Request\r\n")
+
+
+class TestGatewayMetrics(unittest.TestCase):
+    def test_model_labels_are_escaped_and_bounded(self):
+        metrics = GatewayMetrics(max_model_labels=2)
+        for model in [
+            'ollama:a"} 1\nfake_series{x="',
+            "ollama:b",
+            "ollama:c",
+            "nope:x",
+            ["ollama:d"],
+        ]:
+            metrics.start()
+            metrics.finish(model, 200, 0.1)
+
+        text = metrics.render(Client())
+        self.assertIn(
+            'aisuite_requests_total{model="ollama:a\\"} 1\\nfake_series{x=\\"",status="200"} 1',
+            text,
+        )
+        self.assertNotIn("\nfake_series", text)
+        self.assertIn('aisuite_requests_total{model="ollama:b",status="200"} 1', text)
+        self.assertIn('aisuite_requests_total{model="other",status="200"} 1', text)
+        self.assertIn('aisuite_requests_total{model="invalid",status="200"} 2', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
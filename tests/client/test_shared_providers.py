@@ -0,0 +1,50 @@
+import unittest
+
+from aisuite import Client, ProviderFactory
+
+
+class TestSharedProviders(unittest.TestCase):
+    def setUp(self):
+        ProviderFactory.clear_shared_providers()
+
+    def tearDown(self):
+        ProviderFactory.clear_shared_providers()
+
+    def test_equal_configs_share_provider_instances(self):
+        configs = {"openai": {"api_key": "key"}}
+        first = Client(configs, share_providers=True)
+        second = Client({"openai": {"api_key": "key"}}, share_providers=True)
+        other = Client({"openai": {"api_key": "other-key"}}, share_providers=True)
+        unshared = Client(configs)
+
+        self.assertIs(first.providers["openai"], second.providers["openai"])
+        self.assertIsNot(first.providers["openai"], other.providers["openai"])
+        self.assertIsNot(first.providers["openai"], unshared.providers["openai"])
+        # The caller's config is left untouched.
+        self.assertEqual(configs, {"openai": {"api_key": "key"}})
+
+    def test_providers_are_recreated_after_fork(self):
+        client = Client(share_providers=True)
+        provider, _ = client._get_provider("ollama:llama3")
+
+        # Simulate running in a forked child process.
+        ProviderFactory.clear_shared_providers()
+        client._pid = -1
+
+        forked_provider, _ = client._get_provider("ollama:llama3")
+        self.assertIsNot(provider, forked_provider)
+        self.assertIs(
+            forked_provider,
+            Client(share_providers=True)._get_provider("ollama:llama3")[0],
+        )
+
+    def test_bedrock_max_pool_connections(self):
+        client = Client(
+            {"aws": {"region_name": "us-east-1", "max_pool_connections": 64}}
+        )
+        config = client.providers["aws"].client.meta.config
+        self.assertEqual(config.max_pool_connections, 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from aisuite import (
+    Client,
+    MemoryStateBackend,
+    RateLimiter,
+    ResponseCache,
+    SQLiteStateBackend,
+)
+from aisuite.framework import ChatCompletionResponse
+
+
+class TestSharedState(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "state.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sqlite_buckets_are_shared_between_backends(self):
+        # Two backends on one file behave like two worker processes.
+        first = SQLiteStateBackend(self.path)
+        second = SQLiteStateBackend(self.path)
+
+        self.assertEqual(first.take_token("openai", rate=1.0, capacity=2), 0)
+        self.assertEqual(second.take_token("openai", rate=1.0, capacity=2), 0)
+        self.assertGreater(first.take_token("openai", rate=1.0, capacity=2), 0)
+
+    def test_memory_bucket(self):
+        backend = MemoryStateBackend()
+        self.assertEqual(backend.take_token("groq", rate=10.0, capacity=1), 0)
+        wait = backend.take_token("groq", rate=10.0, capacity=1)
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.1)
+
+    def test_invalid_rate_limits(self):
+        with self.assertRaisesRegex(ValueError, "must be positive"):
+            RateLimiter({"openai": -60})
+        with self.assertRaisesRegex(ValueError, "at least 1"):
+            RateLimiter({"openai": 60}, burst={"openai": 0.5})
+
+    def test_sqlite_cache_is_shared_between_backends(self):
+        first = ResponseCache(SQLiteStateBackend(self.path), ttl=60)
+        second = ResponseCache(SQLiteStateBackend(self.path), ttl=60)
+
+        response = ChatCompletionResponse()
+        response.choices[0].message.content = "cached"
+        first.set("key", response)
+
+        self.assertEqual(second.get("key").choices[0].message.content, "cached")
+        self.assertIsNone(second.get("missing"))
+        self.assertEqual(second.hit_rate, 0.5)
+
+    def test_expired_entries_are_not_returned(self):
+        backend = SQLiteStateBackend(self.path)
+        backend.cache_set("key", b"value", ttl=-1)
+        self.assertIsNone(backend.cache_get("key"))
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_client_uses_cache_and_rate_limiter(self, mock_create):
+        mock_create.return_value = "OpenAI Response"
+        backend = SQLiteStateBackend(self.path)
+        limiter = RateLimiter({"openai": 600}, backend=backend)
+        client = Client(
+            {"openai": {"api_key": "key"}},
+            rate_limiter=limiter,
+            cache=ResponseCache(backend),
+        )
+        messages = [{"role": "user", "content": "Hi"}]
+
+        first = client.chat.completions.create("openai:gpt-4o", messages)
+        second = client.chat.completions.create("openai:gpt-4o", messages)
+        client.chat.completions.create("openai:gpt-4o", messages, temperature=0.1)
+
+        self.assertEqual(first, "OpenAI Response")
+        self.assertEqual(second, "OpenAI Response")
+        self.assertEqual(mock_create.call_count, 2)
+
+    def test_cache_key_includes_options_that_change_the_response(self):
+        cache = ResponseCache()
+        client = Client(cache=cache)
+        messages = [{"role": "user", "content": "Hi"}]
+
+        plain = client.chat.completions.create("fake:lorem", messages, n=3)
+        voted = client.chat.completions.create(
+            "fake:lorem", messages, n=3, consensus=True
+        )
+        batch = client.chat.completions.create(
+            "fake:lorem", messages, n=3, priority="batch"
+        )
+
+        self.assertIsNot(voted, plain)
+        self.assertEqual(
+            batch.choices[0].message.content, plain.choices[0].message.content
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
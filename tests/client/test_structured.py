@@ -0,0 +1,97 @@
+import json
+import unittest
+
+import httpx
+
+from aisuite import Client, StructuredOutputError
+from aisuite.structured import JSONStreamParser, iter_json
+
+DOCUMENT = (
+    "Here you go:\n```json\n"
+    '{"results": [{"name": "a,]}"}, 2, "quote \\" inside", [1, [2]],'
+    ' {"nested": {"list": [3]}}], "count": 5}\n```'
+)
+ITEMS = [{"name": "a,]}"}, 2, 'quote " inside', [1, [2]], {"nested": {"list": [3]}}]
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestJSONStreamParser(unittest.TestCase):
+    def test_items_for_any_chunking(self):
+        for size in (1, 2, 5, 17, len(DOCUMENT)):
+            parser = JSONStreamParser(path=("results",))
+            items = []
+            for chunk in chunked(DOCUMENT, size):
+                items.extend(parser.feed(chunk))
+            self.assertEqual(items, ITEMS)
+            self.assertEqual(parser.close(), {"results": ITEMS, "count": 5})
+
+    def test_items_are_reported_when_they_close(self):
+        parser = JSONStreamParser()
+        self.assertEqual(parser.feed('[{"a": 1}'), [{"a": 1}])
+        self.assertEqual(parser.feed(", 10"), [])
+        self.assertEqual(parser.feed("0, "), [100])
+        self.assertEqual(parser.feed("true]"), [True])
+
+    def test_decoded_text_is_not_kept(self):
+        results = [{"id": i, "text": "x" * 50} for i in range(2000)]
+        document = json.dumps({"results": results, "count": 2000})
+        parser = JSONStreamParser(path=("results",))
+        items = []
+        for chunk in chunked(document, 4):
+            items.extend(parser.feed(chunk))
+            # Only the chunks of the item being streamed are kept.
+            self.assertLess(len(parser._chunks) - parser._first, 100)
+        self.assertEqual(items, results)
+        self.assertEqual(parser.close(), {"results": results, "count": 2000})
+
+    def test_incomplete_document(self):
+        parser = JSONStreamParser()
+        parser.feed("[1, 2")
+        with self.assertRaises(StructuredOutputError):
+            parser.close()
+
+
+class TestIterJSON(unittest.TestCase):
+    def test_top_level_object_is_yielded_whole(self):
+        self.assertEqual(list(iter_json(['{"a":', " 1}"])), [{"a": 1}])
+
+    def test_schema_validation(self):
+        schema = {"type": "object", "required": ["id"]}
+        items = iter_json(['[{"id": 1}, {"name": "x"}]'], schema=schema)
+        self.assertEqual(next(items), {"id": 1})
+        with self.assertRaises(StructuredOutputError):
+            next(items)
+
+    def test_invalid_item(self):
+        with self.assertRaises(StructuredOutputError):
+            list(iter_json(["[1, tru, 3]"]))
+
+
+class TestStreamJSON(unittest.TestCase):
+    def test_ollama_stream(self):
+        def server(request):
+            self.assertTrue(json.loads(request.content)["stream"])
+            lines = [
+                json.dumps({"message": {"content": chunk}, "done": False})
+                for chunk in chunked(DOCUMENT, 7)
+            ]
+            lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+            return httpx.Response(200, content="\n".join(lines).encode())
+
+        client = Client(transport=httpx.MockTransport(server))
+        messages = [{"role": "user", "content": "List them as JSON"}]
+
+        self.assertEqual(
+            "".join(client.chat.completions.stream("ollama:llama3", messages)), DOCUMENT
+        )
+        items = client.chat.completions.stream_json(
+            "ollama:llama3", messages, path="results"
+        )
+        self.assertEqual(list(items), ITEMS)
+
+
+if __name__ == "__main__":
+    unittest.main()
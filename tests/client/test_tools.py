@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+import unittest
+from typing import List, Literal, Optional
+from unittest.mock import patch
+
+from aisuite import Client
+from aisuite.framework import ChatCompletionResponse, ToolCall
+from aisuite.provider import LLMError
+from aisuite.tools import arun_tools, run_tools, tool_spec
+
+MESSAGES = [{"role": "user", "content": "Weather in Paris and Rome?"}]
+
+
+def completion(content=None, tool_calls=None):
+    response = ChatCompletionResponse()
+    response.choices[0].message.content = content
+    response.choices[0].message.tool_calls = tool_calls
+    return response
+
+
+def weather_calls():
+    return [
+        ToolCall("call_1", "get_weather", json.dumps({"city": "Paris"})),
+        ToolCall("call_2", "get_weather", json.dumps({"city": "Rome"})),
+    ]
+
+
+class TestToolSpec(unittest.TestCase):
+    def test_spec_from_signature_and_docstring(self):
+        def search(
+            query: str,
+            limit: int = 10,
+            tags: Optional[List[str]] = None,
+            order: Literal["asc", "desc"] = "asc",
+        ):
+            """
+            Search the knowledge base.
+
+            Args:
+                query (str): Words to look for.
+                limit: Maximum number of results.
+            """
+
+        self.assertEqual(
+            tool_spec(search),
+            {
+                "type": "function",
+                "function": {
+                    "name": "search",
+                    "description": "Search the knowledge base.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Words to look for.",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of results.",
+                            },
+                            "tags": {"type": "array", "items": {"type": "string"}},
+                            "order": {"enum": ["asc", "desc"]},
+                        },
+                        "required": ["query"],
+                    },
+                },
+            },
+        )
+
+
+class TestRunTools(unittest.TestCase):
+    def setUp(self):
+        self.client = Client({"openai": {"api_key": "key"}})
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_tool_calls_of_a_turn_run_concurrently(self, mock_create):
+        mock_create.side_effect = [
+            completion(tool_calls=weather_calls()),
+            completion("Sunny in both."),
+        ]
+        # Both calls must be running at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_weather(city: str) -> dict:
+            """Return the current weather in a city."""
+            barrier.wait()
+            return {"city": city, "sky": "sunny"}
+
+        run = run_tools(self.client, "openai:gpt-4o", MESSAGES, [get_weather])
+
+        self.assertEqual(run.response.choices[0].message.content, "Sunny in both.")
+        self.assertEqual(run.steps, 2)
+        self.assertEqual(len(MESSAGES), 1)
+        self.assertEqual(run.messages[1]["tool_calls"][1]["id"], "call_2")
+        self.assertEqual(
+            run.messages[2:],
+            [
+                {
+                    "role": "tool",
+                    "tool_call_id": "call_1",
+                    "content": '{"city": "Paris", "sky": "sunny"}',
+                },
+                {
+                    "role": "tool",
+                    "tool_call_id": "call_2",
+                    "content": '{"city": "Rome", "sky": "sunny"}',
+                },
+            ],
+        )
+        _, kwargs = mock_create.call_args
+        self.assertEqual(kwargs["tools"], [tool_spec(get_weather)])
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_tool_errors_are_reported_to_the_model(self, mock_create):
+        mock_create.side_effect = [
+            completion(
+                tool_calls=[
+                    ToolCall("call_1", "get_weather", '{"city": "Atlantis"}'),
+                    ToolCall("call_2", "book_flight", "{}"),
+                ]
+            ),
+            completion("Sorry."),
+        ]
+
+        def get_weather(city: str):
+            raise KeyError(city)
+
+        run = run_tools(self.client, "openai:gpt-4o", MESSAGES, [get_weather])
+
+        self.assertEqual(
+            [message["content"] for message in run.messages[2:]],
+            ["Error: KeyError: 'Atlantis'", "Error: unknown tool 'book_flight'."],
+        )
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_step_limit(self, mock_create):
+        mock_create.side_effect = lambda *args, **kwargs: completion(
+            tool_calls=weather_calls()[:1]
+        )
+
+        def get_weather(city: str):
+            return "sunny"
+
+        with self.assertRaises(LLMError):
+            run_tools(
+                self.client, "openai:gpt-4o", MESSAGES, [get_weather], max_steps=3
+            )
+        self.assertEqual(mock_create.call_count, 3)
+
+    @patch("aisuite.providers.openai_provider.OpenaiProvider.chat_completions_create")
+    def test_arun_tools_awaits_tools_together(self, mock_create):
+        mock_create.side_effect = [
+            completion(tool_calls=weather_calls()),
+            completion("Sunny in both."),
+        ]
+
+        async def main():
+            barrier = asyncio.Barrier(2)
+
+            async def get_weather(city: str):
+                await asyncio.wait_for(barrier.wait(), 5)
+                return f"sunny in {city}"
+
+            return await arun_tools(
+                self.client, "openai:gpt-4o", MESSAGES, [get_weather]
+            )
+
+        run = asyncio.run(main())
+
+        self.assertEqual(run.steps, 2)
+        self.assertEqual(
+            [message["content"] for message in run.messages[2:]],
+            ["sunny in Paris", "sunny in Rome"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aisuite.providers.anthropic_provider import AnthropicProvider
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather",
+            "description": "Return the current weather in a city.",
+            "parameters": {
+                "type": "object",
+                "properties": {"city": {"type": "string"}},
+                "required": ["city"],
+            },
+        },
+    }
+]
+
+
+def test_tool_calls_are_translated():
+    provider = AnthropicProvider(api_key="anthropic-api-key")
+    messages = [
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "Weather in Paris and Rome?"},
+        {
+            "role": "assistant",
+            "content": "Checking.",
+            "tool_calls": [
+                {
+                    "id": f"toolu_{i}",
+                    "type": "function",
+                    "function": {
+                        "name": "get_weather",
+                        "arguments": json.dumps({"city": city}),
+                    },
+                }
+                for i, city in enumerate(["Paris", "Rome"])
+            ],
+        },
+        {"role": "tool", "tool_call_id": "toolu_0", "content": "sunny"},
+        {"role": "tool", "tool_call_id": "toolu_1", "content": "rainy"},
+    ]
+    response = SimpleNamespace(
+        content=[
+            SimpleNamespace(type="text", text="One more."),
+            SimpleNamespace(
+                type="tool_use",
+                id="toolu_2",
+                name="get_weather",
+                input={"city": "Oslo"},
+            ),
+        ]
+    )
+
+    with patch.object(
+        provider.client.messages, "create", return_value=response
+    ) as mock_create:
+        result = provider.chat_completions_create(
+            "claude-3-5-sonnet", messages, tools=TOOLS, tool_choice="required"
+        )
+
+    kwargs = mock_create.call_args.kwargs
+    assert kwargs["system"] == "Be brief."
+    assert kwargs["tools"] == [
+        {
+            "name": "get_weather",
+            "description": "Return the current weather in a city.",
+            "input_schema": TOOLS[0]["function"]["parameters"],
+        }
+    ]
+    assert kwargs["tool_choice"] == {"type": "any"}
+    assert kwargs["messages"][1:] == [
+        {
+            "role": "assistant",
+            "content": [
+                {"type": "text", "text": "Checking."},
+                {
+                    "type": "tool_use",
+                    "id": "toolu_0",
+                    "name": "get_weather",
+                    "input": {"city": "Paris"},
+                },
+                {
+                    "type": "tool_use",
+                    "id": "toolu_1",
+                    "name": "get_weather",
+                    "input": {"city": "Rome"},
+                },
+            ],
+        },
+        {
+            "role": "user",
+            "content": [
+                {"type": "tool_result", "tool_use_id": "toolu_0", "content": "sunny"},
+                {"type": "tool_result", "tool_use_id": "toolu_1", "content": "rainy"},
+            ],
+        },
+    ]
+
+    choice = result.choices[0]
+    assert choice.message.content == "One more."
+    assert choice.finish_reason == "tool_calls"
+    assert choice.message.tool_calls[0].id == "toolu_2"
+    assert json.loads(choice.message.tool_calls[0].function.arguments) == {
+        "city": "Oslo"
+    }
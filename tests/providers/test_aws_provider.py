@@ -0,0 +1,107 @@
+import json
+from unittest.mock import patch
+
+from aisuite.providers.aws_provider import AwsProvider
+
+
+def test_tool_calls_are_translated():
+    provider = AwsProvider(region_name="us-west-2")
+    messages = [
+        {"role": "user", "content": "Weather in Paris?"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": "tooluse_1",
+                    "type": "function",
+                    "function": {
+                        "name": "get_weather",
+                        "arguments": '{"city": "Paris"}',
+                    },
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": "tooluse_1", "content": "sunny"},
+    ]
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "get_weather",
+                "description": "Return the current weather in a city.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {"city": {"type": "string"}},
+                },
+            },
+        }
+    ]
+    response = {
+        "output": {
+            "message": {
+                "content": [
+                    {
+                        "toolUse": {
+                            "toolUseId": "tooluse_2",
+                            "name": "get_weather",
+                            "input": {"city": "Rome"},
+                        }
+                    }
+                ]
+            }
+        }
+    }
+
+    with patch.object(provider.client, "converse", return_value=response) as converse:
+        result = provider.chat_completions_create(
+            "anthropic.claude-3-haiku", messages, tools=tools, temperature=0
+        )
+
+    kwargs = converse.call_args.kwargs
+    assert kwargs["toolConfig"] == {
+        "tools": [
+            {
+                "toolSpec": {
+                    "name": "get_weather",
+                    "description": "Return the current weather in a city.",
+                    "inputSchema": {"json": tools[0]["function"]["parameters"]},
+                }
+            }
+        ]
+    }
+    assert kwargs["inferenceConfig"] == {"temperature": 0}
+    assert kwargs["additionalModelRequestFields"] == {}
+    assert kwargs["messages"][1:] == [
+        {
+            "role": "assistant",
+            "content": [
+                {
+                    "toolUse": {
+                        "toolUseId": "tooluse_1",
+                        "name": "get_weather",
+                        "input": {"city": "Paris"},
+                    }
+                }
+            ],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "toolResult": {
+                        "toolUseId": "tooluse_1",
+                        "content": [{"text": "sunny"}],
+                    }
+                }
+            ],
+        },
+    ]
+
+    choice = result.choices[0]
+    assert choice.message.content is None
+    assert choice.finish_reason == "tool_calls"
+    assert choice.message.tool_calls[0].function.name == "get_weather"
+    assert json.loads(choice.message.tool_calls[0].function.arguments) == {
+        "city": "Rome"
+    }
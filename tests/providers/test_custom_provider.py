@@ -0,0 +1,183 @@
+import json
+
+import httpx
+import pytest
+
+from aisuite.provider import LLMError
+from aisuite.providers.custom_provider import CustomProvider
+from aisuite.providers.huggingface_provider import HuggingfaceProvider
+from aisuite.providers.openai_compatible import shared_transport
+from aisuite.providers.together_provider import TogetherProvider
+
+MESSAGES = [{"role": "user", "content": "Hello!"}]
+
+
+def completion(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def test_custom_provider_chat():
+    requests = []
+
+    def server(request):
+        requests.append(request)
+        return httpx.Response(200, json=completion("Hi from vLLM"))
+
+    provider = CustomProvider(
+        base_url="http://gpu-01:8000/v1/",
+        api_key="secret",
+        auth_header="X-Api-Key",
+        auth_scheme="",
+        headers={"X-Team": "search"},
+        transport=httpx.MockTransport(server),
+    )
+    response = provider.chat_completions_create("llama3", MESSAGES, temperature=0.5)
+
+    assert response.choices[0].message.content == "Hi from vLLM"
+    request = requests[0]
+    assert str(request.url) == "http://gpu-01:8000/v1/chat/completions"
+    assert request.headers["X-Api-Key"] == "secret"
+    assert request.headers["X-Team"] == "search"
+    assert "Authorization" not in request.headers
+    assert json.loads(request.content) == {
+        "model": "llama3",
+        "messages": MESSAGES,
+        "temperature": 0.5,
+    }
+
+
+def test_custom_provider_tool_calls():
+    tool_call = {
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "get_weather", "arguments": '{"city": "Paris"}'},
+    }
+
+    def server(request):
+        return httpx.Response(
+            200,
+            json={
+                "choices": [
+                    {
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "tool_calls": [tool_call],
+                        },
+                        "finish_reason": "tool_calls",
+                    }
+                ]
+            },
+        )
+
+    provider = CustomProvider(
+        base_url="http://gpu-01:8000/v1", transport=httpx.MockTransport(server)
+    )
+    choice = provider.chat_completions_create("llama3", MESSAGES).choices[0]
+
+    assert choice.finish_reason == "tool_calls"
+    assert choice.message.content is None
+    assert choice.message.tool_calls[0].id == "call_1"
+    assert choice.message.tool_calls[0].function.name == "get_weather"
+    assert choice.message.tool_calls[0].function.arguments == '{"city": "Paris"}'
+
+
+def test_custom_provider_logprobs():
+    def server(request):
+        response = completion("yes")
+        response["choices"][0]["logprobs"] = {
+            "content": [
+                {
+                    "token": "yes",
+                    "logprob": -0.25,
+                    "top_logprobs": [
+                        {"token": "yes", "logprob": -0.25},
+                        {"token": "no", "logprob": -1.5},
+                    ],
+                }
+            ]
+        }
+        return httpx.Response(200, json=response)
+
+    provider = CustomProvider(
+        base_url="http://gpu-01:8000/v1", transport=httpx.MockTransport(server)
+    )
+    response = provider.chat_completions_create(
+        "llama3", MESSAGES, logprobs=True, top_logprobs=2
+    )
+
+    logprobs = response.choices[0].logprobs
+    assert list(logprobs.tokens) == ["yes"]
+    assert list(logprobs.top_tokens[0]) == ["yes", "no"]
+    assert logprobs.top_logprobs.tolist() == [[-0.25, -1.5]]
+
+
+def test_custom_provider_stream():
+    def server(request):
+        body = json.loads(request.content)
+        assert body["stream"] is True
+        assert body["stream_options"] == {"include_usage": True}
+        events = [
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Hel"}}]},
+            {"choices": [{"delta": {"content": "lo"}}]},
+            {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}},
+        ]
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+        return httpx.Response(200, text=body + "data: [DONE]\n\n")
+
+    provider = CustomProvider(
+        base_url="http://gpu-01:8000/v1", transport=httpx.MockTransport(server)
+    )
+    deltas = provider.chat_completions_stream("llama3", MESSAGES)
+    assert list(deltas) == ["Hel", "lo"]
+
+    # The stream returns its usage.
+    deltas = provider.chat_completions_stream("llama3", MESSAGES)
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            next(deltas)
+    assert stop.value.value == {
+        "prompt_tokens": 3,
+        "completion_tokens": 2,
+        "total_tokens": 5,
+    }
+
+
+def test_errors_are_raised_as_llm_errors():
+    provider = CustomProvider(
+        base_url="http://gpu-01:8000/v1",
+        transport=httpx.MockTransport(lambda request: httpx.Response(429)),
+    )
+    with pytest.raises(LLMError):
+        provider.chat_completions_create("llama3", MESSAGES)
+    with pytest.raises(LLMError):
+        provider.chat_completions_stream("llama3", MESSAGES)
+
+
+def test_custom_provider_requires_base_url():
+    with pytest.raises(ValueError):
+        CustomProvider()
+
+
+def test_hosted_providers_share_one_transport(monkeypatch):
+    monkeypatch.setenv("TOGETHER_API_KEY", "together-key")
+    monkeypatch.setenv("HUGGINGFACE_TOKEN", "hf-token")
+    together = TogetherProvider()
+    huggingface = HuggingfaceProvider()
+
+    assert together.client._transport is shared_transport()
+    assert huggingface.client._transport is shared_transport()
+    assert together.client.headers["Authorization"] == "Bearer together-key"
+    assert together.chat_url("m") == "https://api.together.xyz/v1/chat/completions"
+
+
+def test_huggingface_urls():
+    serverless = HuggingfaceProvider(token="hf-token")
+    assert (
+        serverless.chat_url("org/model")
+        == "https://api-inference.huggingface.co/models/org/model/v1/chat/completions"
+    )
+
+    tgi = HuggingfaceProvider(base_url="http://tgi.internal:8080/v1")
+    assert tgi.chat_url("tgi") == "http://tgi.internal:8080/v1/chat/completions"
@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+import pytest
+
+from aisuite import Client
+from aisuite.provider import is_rate_limit_error
+from aisuite.providers.fake_provider import FakeProvider, FakeProviderError
+
+MESSAGES = [{"role": "user", "content": "Hello there, fake model"}]
+
+
+def test_echo_and_usage():
+    response = FakeProvider().chat_completions_create("echo", MESSAGES, n=2)
+
+    assert [choice.message.content for choice in response.choices] == [
+        "Hello there, fake model"
+    ] * 2
+    assert response.choices[0].finish_reason == "stop"
+    assert response.usage == {
+        "prompt_tokens": 4,
+        "completion_tokens": 8,
+        "total_tokens": 12,
+    }
+
+
+def test_model_string_overrides_config():
+    provider = FakeProvider(content="from config", completion_tokens=3)
+
+    assert (
+        provider.chat_completions_create("any", MESSAGES).choices[0].message.content
+        == "from config"
+    )
+    response = provider.chat_completions_create(
+        "any?content=one%20two%20three&tokens=2", MESSAGES, max_tokens=2
+    )
+    assert response.choices[0].message.content == "one two"
+    assert response.choices[0].finish_reason == "length"
+
+    with pytest.raises(ValueError, match="latncy"):
+        provider.chat_completions_create("any?latncy=1", MESSAGES)
+
+
+def test_latency_and_streaming_pace():
+    provider = FakeProvider(content="a b c d e")
+
+    start = time.monotonic()
+    provider.chat_completions_create("m?latency=0.05&tps=100", MESSAGES)
+    assert time.monotonic() - start >= 0.1
+
+    start = time.monotonic()
+    stream = provider.chat_completions_stream("m?latency=0.05&tps=50", MESSAGES)
+    tokens = []
+    for token in stream:
+        tokens.append((token, time.monotonic() - start))
+    assert [token for token, _ in tokens] == ["a", " b", " c", " d", " e"]
+    assert 0.05 <= tokens[0][1] < tokens[-1][1]
+    assert tokens[-1][1] >= 0.05 + 4 / 50
+
+
+def test_failures_are_seeded_and_recognized():
+    provider = FakeProvider(seed=1)
+
+    outcomes = []
+    for _ in range(200):
+        try:
+            provider.chat_completions_create(
+                "m?rate_limit_rate=0.2&error_rate=0.2", MESSAGES
+            )
+            outcomes.append(200)
+        except FakeProviderError as e:
+            assert is_rate_limit_error(e) == (e.status_code == 429)
+            outcomes.append(e.status_code)
+
+    assert {200, 429, 500} == set(outcomes)
+    assert 20 < outcomes.count(429) < 60
+
+    with pytest.raises(FakeProviderError):
+        FakeProvider().chat_completions_stream("m?rate_limit_rate=1", MESSAGES)
+
+
+def test_client_surfaces():
+    client = Client({"fake": {"completion_tokens": 5}})
+
+    response = client.chat.completions.create("fake:lorem", MESSAGES, n=3)
+    assert len(response.choices) == 3
+    assert len(response.choices[0].message.content.split()) == 5
+
+    assert "".join(client.chat.completions.stream("fake:echo", MESSAGES)) == (
+        MESSAGES[0]["content"]
+    )
+
+    embeddings = client.embeddings.create(
+        "fake:embed?dimensions=8", ["a", "b", "a"], batch_size=2
+    )
+    assert embeddings.shape == (3, 8)
+    np.testing.assert_array_equal(embeddings[0], embeddings[2])
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, rtol=1e-5)
@@ -1,5 +1,10 @@
 import pytest
+import json
+import threading
+import time
 from unittest.mock import patch, MagicMock
+
+import httpx
 from aisuite.providers.ollama_provider import OllamaProvider
 
 
@@ -21,9 +26,12 @@ def test_completion():
     ollama = OllamaProvider()
     mock_response = {"message": {"content": response_text_content}}
 
-    with patch(
-        "httpx.post",
-        return_value=MagicMock(status_code=200, json=lambda: mock_response),
+    with patch.object(
+        ollama.client,
+        "post",
+        return_value=MagicMock(
+            status_code=200, content=json.dumps(mock_response).encode()
+        ),
     ) as mock_post:
         response = ollama.chat_completions_create(
             messages=message_history,
@@ -31,15 +39,244 @@ def test_completion():
             temperature=chosen_temperature,
         )
 
-        mock_post.assert_called_once_with(
-            "http://localhost:11434/api/chat",
-            json={
-                "model": selected_model,
-                "messages": message_history,
-                "stream": False,
-                "temperature": chosen_temperature,
-            },
-            timeout=30,
-        )
+        mock_post.assert_called_once()
+        args, kwargs = mock_post.call_args
+        assert args == ("http://localhost:11434/api/chat",)
+        assert kwargs["headers"] == {"Content-Type": "application/json"}
+        assert json.loads(kwargs["content"]) == {
+            "model": selected_model,
+            "messages": message_history,
+            "stream": False,
+            "temperature": chosen_temperature,
+        }
 
         assert response.choices[0].message.content == response_text_content
+
+
+def test_embeddings():
+    """Test that embeddings request successfully."""
+
+    ollama = OllamaProvider()
+    mock_response = {"embeddings": [[0.1, 0.2], [0.3, 0.4]]}
+
+    with patch.object(
+        ollama.client,
+        "post",
+        return_value=MagicMock(
+            status_code=200, content=json.dumps(mock_response).encode()
+        ),
+    ) as mock_post:
+        response = ollama.embeddings_create("embed-model", ["a", "b"])
+
+        args, kwargs = mock_post.call_args
+        assert args == ("http://localhost:11434/api/embed",)
+        assert json.loads(kwargs["content"]) == {
+            "model": "embed-model",
+            "input": ["a", "b"],
+        }
+
+        assert response == mock_response["embeddings"]
+
+
+def test_warmup_preloads_model():
+    """Test that warmup loads the model with the requested keep_alive."""
+
+    ollama = OllamaProvider(keep_alive="5m")
+
+    with patch.object(
+        ollama.client, "post", return_value=MagicMock(status_code=200)
+    ) as mock_post:
+        ollama.warmup("best-model-ever", keep_alive="1h")
+
+        args, kwargs = mock_post.call_args
+        assert args == ("http://localhost:11434/api/chat",)
+        assert json.loads(kwargs["content"]) == {
+            "model": "best-model-ever",
+            "messages": [],
+            "stream": False,
+            "keep_alive": "1h",
+        }
+
+
+def test_tool_calls():
+    """Test that tool calls are sent with object arguments and normalized back."""
+
+    ollama = OllamaProvider()
+    mock_response = {
+        "message": {
+            "content": "",
+            "tool_calls": [
+                {"function": {"name": "get_weather", "arguments": {"city": "Paris"}}}
+            ],
+        }
+    }
+    messages = [
+        {"role": "user", "content": "Weather?"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {
+                        "name": "get_weather",
+                        "arguments": '{"city": "Rome"}',
+                    },
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": "call_1", "content": "sunny"},
+    ]
+
+    with patch.object(
+        ollama.client,
+        "post",
+        return_value=MagicMock(
+            status_code=200, content=json.dumps(mock_response).encode()
+        ),
+    ) as mock_post:
+        response = ollama.chat_completions_create("best-model-ever", messages)
+
+        sent = json.loads(mock_post.call_args.kwargs["content"])["messages"]
+        assert sent[1]["tool_calls"] == [
+            {"function": {"name": "get_weather", "arguments": {"city": "Rome"}}}
+        ]
+        assert sent[2] == messages[2]
+
+        tool_call = response.choices[0].message.tool_calls[0]
+        assert tool_call.id.startswith("call_")
+        assert tool_call.function.name == "get_weather"
+        assert json.loads(tool_call.function.arguments) == {"city": "Paris"}
+        assert response.choices[0].finish_reason == "tool_calls"
+
+
+def fleet(loaded, chats, fail=(), refuse_chats=()):
+    """A mock transport for several Ollama hosts with the given loaded models."""
+
+    def handler(request):
+        host = request.url.host
+        if host in fail or (host in refuse_chats and request.url.path == "/api/chat"):
+            raise httpx.ConnectError("connection refused")
+        if request.url.path == "/api/ps":
+            return httpx.Response(
+                200, json={"models": [{"name": m, "model": m} for m in loaded[host]]}
+            )
+        chats.append((host, json.loads(request.content)["model"]))
+        body = {"message": {"content": host}}
+        if json.loads(request.content).get("stream"):
+            return httpx.Response(200, content=json.dumps(body).encode() + b"\n")
+        return httpx.Response(200, json=body)
+
+    return httpx.MockTransport(handler)
+
+
+HOSTS = ["http://gpu-a:11434", "http://gpu-b:11434", "http://gpu-c:11434"]
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def test_requests_go_to_hosts_with_the_model_loaded():
+    chats = []
+    loaded = {
+        "gpu-a": ["mistral:latest", "phi3:latest"],
+        "gpu-b": ["llama3:latest"],
+        "gpu-c": ["llama3:latest", "qwen2:7b"],
+    }
+    ollama = OllamaProvider(hosts=HOSTS, transport=fleet(loaded, chats))
+
+    # Requests for llama3 are spread over the two hosts that hold it.
+    first = ollama.chat_completions_stream("llama3", MESSAGES)
+    ollama.chat_completions_create("llama3", MESSAGES)
+    ollama.chat_completions_create("qwen2:7b", MESSAGES)
+    first.close()
+
+    assert chats == [
+        ("gpu-b", "llama3"),
+        ("gpu-c", "llama3"),
+        ("gpu-c", "qwen2:7b"),
+    ]
+    assert [host["in_flight"] for host in ollama.host_stats()] == [0, 0, 0]
+
+
+def test_cold_models_load_on_the_emptiest_host_and_stay_there():
+    chats = []
+    loaded = {
+        "gpu-a": ["mistral:latest", "phi3:latest"],
+        "gpu-b": ["llama3:latest"],
+        "gpu-c": [],
+    }
+    ollama = OllamaProvider(hosts=HOSTS, transport=fleet(loaded, chats))
+
+    streams = [ollama.chat_completions_stream("gemma2", MESSAGES) for _ in range(3)]
+    for stream in streams:
+        assert list(stream) == ["gpu-c"]
+
+    assert chats == [("gpu-c", "gemma2")] * 3
+    assert "gemma2:latest" in ollama.host_stats()[2]["models"]
+
+
+def test_busy_hosts_spill_to_another_host():
+    chats = []
+    loaded = {"gpu-a": ["llama3:latest"], "gpu-b": [], "gpu-c": ["mistral:latest"]}
+    ollama = OllamaProvider(
+        hosts=HOSTS, spill_threshold=2, transport=fleet(loaded, chats)
+    )
+
+    streams = [ollama.chat_completions_stream("llama3", MESSAGES) for _ in range(3)]
+    assert [host for host, _ in chats] == ["gpu-a", "gpu-a", "gpu-b"]
+    for stream in streams:
+        stream.close()
+
+
+def test_unreachable_hosts_are_skipped():
+    chats = []
+    loaded = {"gpu-a": [], "gpu-b": ["llama3:latest"], "gpu-c": ["llama3:latest"]}
+    ollama = OllamaProvider(hosts=HOSTS, transport=fleet(loaded, chats, fail={"gpu-b"}))
+
+    ollama.chat_completions_create("llama3", MESSAGES)
+
+    assert chats == [("gpu-c", "llama3")]
+    assert [host["down"] for host in ollama.host_stats()] == [False, True, False]
+
+
+def test_failed_connections_are_retried_on_another_host():
+    chats = []
+    loaded = {"gpu-a": [], "gpu-b": ["llama3:latest"], "gpu-c": ["llama3:latest"]}
+    ollama = OllamaProvider(
+        hosts=HOSTS, transport=fleet(loaded, chats, refuse_chats={"gpu-b"})
+    )
+
+    ollama.chat_completions_create("llama3", MESSAGES)
+    assert list(ollama.chat_completions_stream("llama3", MESSAGES)) == ["gpu-c"]
+
+    assert chats == [("gpu-c", "llama3")] * 2
+    assert [host["down"] for host in ollama.host_stats()] == [False, True, False]
+    assert [host["in_flight"] for host in ollama.host_stats()] == [0, 0, 0]
+
+
+def test_requests_do_not_wait_for_refreshes():
+    chats = []
+    loaded = {"gpu-a": ["llama3:latest"], "gpu-b": [], "gpu-c": []}
+    transport = fleet(loaded, chats)
+    hanging = threading.Event()
+    release = threading.Event()
+
+    def handler(request):
+        if request.url.path == "/api/ps" and chats:
+            # The refresh after the first request hangs, like a host that is down.
+            hanging.set()
+            release.wait(5)
+        return transport.handle_request(request)
+
+    ollama = OllamaProvider(
+        hosts=HOSTS, refresh_interval=0, transport=httpx.MockTransport(handler)
+    )
+    ollama.chat_completions_create("llama3", MESSAGES)
+    start = time.monotonic()
+    ollama.chat_completions_create("llama3", MESSAGES)
+    ollama.chat_completions_create("llama3", MESSAGES)
+
+    assert time.monotonic() - start < 1
+    assert hanging.wait(5)
+    assert chats == [("gpu-a", "llama3")] * 3
+    release.set()
@@ -0,0 +1,49 @@
+import gzip
+import json
+
+import pytest
+
+from aisuite.utils import json_codec
+
+
+def test_roundtrip():
+    data = {"model": "m", "messages": [{"role": "user", "content": "héllo"}]}
+    assert json_codec.loads(json_codec.dumps(data)) == data
+
+
+def test_schema_keeps_normalized_fields():
+    body = json.dumps(
+        {
+            "id": "chatcmpl-1",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "hi"},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+    )
+    result = json_codec.loads(body, json_codec.ChatCompletionSchema)
+    assert result["choices"][0]["message"]["content"] == "hi"
+
+
+def test_invalid_documents_raise_value_error():
+    with pytest.raises(ValueError):
+        json_codec.loads('{"choices": [', json_codec.ChatCompletionSchema)
+    if json_codec.msgspec is not None:
+        # A document that does not match the schema.
+        with pytest.raises(ValueError):
+            json_codec.loads('{"choices": "none"}', json_codec.ChatCompletionSchema)
+
+
+def test_encode_request_compresses_large_bodies():
+    data = {"messages": [{"role": "user", "content": "x" * 1000}]}
+
+    body, headers = json_codec.encode_request(data, compress_threshold=100)
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == data
+
+    body, headers = json_codec.encode_request(data)
+    assert "Content-Encoding" not in headers
+    assert json.loads(body) == data